@@ -0,0 +1,171 @@
+"""
+Benchmarks for the core game paths of The Farmer.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_core [--sizes 1000,100000,1000000] [--output results.json]
+                                    [--compare old.json] [--threshold 0.2]
+
+Results are printed (or written) as JSON. With --compare, any benchmark whose
+mean got slower than the threshold exits with status 1.
+"""
+
+import argparse
+import json
+import marshal
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+import engine
+from config import DataConfig
+from config.snapshot import get_snapshot
+from utils import database
+from benchmarks.synthetic import make_population
+
+def summarize(name: str, users: int, durations: list) -> dict:
+    durations = sorted(durations)
+    return {
+        "benchmark": name,
+        "users": users,
+        "iterations": len(durations),
+        "mean_s": statistics.fmean(durations),
+        "p50_s": durations[len(durations) // 2],
+        "p95_s": durations[min(len(durations) - 1, int(len(durations) * 0.95))],
+        "min_s": durations[0]
+    }
+
+def time_calls(func, args_list) -> list:
+    durations = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+def run_size(count: int, iterations: int, repeats: int) -> list:
+    results = []
+    now = time.time()
+    rng = random.Random(count)
+
+    population = make_population(count, now)
+    database.write_data_file(population)
+
+    # Load and save the whole data file through the user store
+    durations = []
+    for _ in range(repeats):
+        database.configure_storage()
+        start = time.perf_counter()
+        database.warm_storage()
+        durations.append(time.perf_counter() - start)
+    results.append(summarize("load_data", count, durations))
+
+    store = database.get_store()
+    some_user = next(iter(store.users))
+    durations = []
+    for _ in range(repeats):
+        store.touched.add(some_user)
+        start = time.perf_counter()
+        store.flush()
+        durations.append(time.perf_counter() - start)
+    results.append(summarize("save_data", count, durations))
+
+    # Leaderboard sorting over every user
+    durations = time_calls(
+        lambda users: sorted(users.items(), key=lambda x: x[1].get("balance", 0), reverse=True),
+        [(store,)] * repeats
+    )
+    results.append(summarize("leaderboard_sort", count, durations))
+
+    # Per-user game rules on copies of random users
+    config = get_snapshot()
+    user_ids = list(store.users)
+    sample = [rng.choice(user_ids) for _ in range(iterations)]
+    copies = lambda: [marshal.loads(marshal.dumps(store.users[user_id])) for user_id in sample]
+
+    users = copies()
+    durations = time_calls(engine.harvest_biome, [(user, "grassland", now, config) for user in users])
+    results.append(summarize("harvest_biome", count, durations))
+
+    users = copies()
+    for user in users:
+        user["plantings"]["grassland"] = {}
+        user["seeds"]["wheat_seed"] = user["seeds"].get("wheat_seed", 0) + 1
+    durations = time_calls(engine.plant_all, [(user, "grassland", now, config) for user in users])
+    results.append(summarize("plant_all", count, durations))
+
+    users = copies()
+    durations = time_calls(engine.roll_seed, [(user, now, config, rng) for user in users])
+    results.append(summarize("roll_seed", count, durations))
+
+    users = copies()
+    durations = time_calls(engine.sale_quote, [(user, config) for user in users])
+    results.append(summarize("sale_quote", count, durations))
+
+    return results
+
+def compare(results: list, baseline_path: str, threshold: float) -> list:
+    """List benchmarks that got slower than the baseline by more than threshold"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {
+            (r["benchmark"], r["users"]): r for r in json.load(f)["results"]
+        }
+    regressions = []
+    for result in results:
+        old = baseline.get((result["benchmark"], result["users"]))
+        if old and old["mean_s"] > 0:
+            change = result["mean_s"] / old["mean_s"] - 1
+            if change > threshold:
+                regressions.append({
+                    "benchmark": result["benchmark"],
+                    "users": result["users"],
+                    "old_mean_s": old["mean_s"],
+                    "new_mean_s": result["mean_s"],
+                    "change": change
+                })
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark core game paths")
+    parser.add_argument("--sizes", default="1000,100000", help="Comma separated user counts, e.g. 1000,100000,1000000")
+    parser.add_argument("--iterations", type=int, default=1000, help="Calls per per-user benchmark")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs of whole-population benchmarks")
+    parser.add_argument("--output", help="Write results JSON to this file instead of stdout")
+    parser.add_argument("--compare", help="Baseline results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before failing (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    # Keep benchmark data away from the real farm data
+    workdir = Path(tempfile.mkdtemp(prefix="farmer-bench-"))
+    DataConfig.DATA_DIR = workdir
+    DataConfig.FARM_DATA_FILE = workdir / "farm_data.json"
+
+    results = []
+    for size in [int(s) for s in args.sizes.split(",") if s]:
+        print(f"Benchmarking {size:,} users...", file=sys.stderr)
+        results.extend(run_size(size, args.iterations, args.repeats))
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results
+    }
+    if args.compare:
+        report["regressions"] = compare(results, args.compare, args.threshold)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if report.get("regressions"):
+        print(f"{len(report['regressions'])} benchmark(s) regressed", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+Offline load generator for The Farmer.
+Loads the real cogs into a bot that never connects to Discord and drives them
+with stub contexts from many simulated users at once.
+
+Usage (from the repository root):
+    python -m benchmarks.loadgen [--users 1000] [--population 10000] [--commands 20000]
+                                 [--concurrency 200] [--mix roll=35,plant=15,garden=15,harvest=15,sell=10,leaderboard=10]
+                                 [--storage-socket data/storage.sock] [--cache-mb 64] [--outbox] [--output results.json]
+
+Reports throughput, latency percentiles per command and lost updates: users
+whose final balance doesn't match their starting balance plus every sale the
+bot confirmed to them. With --outbox, replies go through the outbound queue
+into a fake HTTP sink, and the report counts the requests Discord would have
+received.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+import discord
+from discord.ext import commands
+from config import DataConfig
+from config.rate_limiter import RateLimiter
+from utils import database, metrics
+from utils.outbox import FakeHTTPSink, Outbox
+from utils.storage_client import StorageClient
+from utils.user_lookup import UserLookup
+from utils.views import ConfirmView
+from benchmarks.synthetic import make_population
+
+DEFAULT_MIX = "roll=35,plant=15,garden=15,harvest=15,sell=10,leaderboard=10"
+
+# Command name -> (positional args, keyword args) passed to the command callback
+COMMAND_ARGS = {
+    "roll": ((), {}),
+    "plant": (("all",), {}),
+    "garden": ((), {}),
+    "harvest": (("all",), {}),
+    "sell": ((), {"args": "all"}),
+    "leaderboard": ((), {})
+}
+
+SALE_TOTAL = re.compile(r"\*\*Total Earned:\*\* \$([\d,]+)")
+
+class StubUser:
+    """Stands in for discord.Member / discord.User"""
+
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.name = f"farmer{user_id % 100000}"
+        self.display_name = self.name
+        self.bot = False
+        self.mention = f"<@{user_id}>"
+
+    async def send(self, *args, **kwargs):
+        return StubMessage(kwargs.get("content"), kwargs.get("embed"))
+
+class StubMessage:
+    """Stands in for a sent discord.Message"""
+
+    def __init__(self, content=None, embed=None):
+        self.content = content
+        self.embed = embed
+
+    async def edit(self, **kwargs):
+        return self
+
+    async def delete(self):
+        return None
+
+class StubContext:
+    """Stands in for commands.Context, recording everything sent"""
+
+    def __init__(self, bot, author: StubUser, command_name: str):
+        self.bot = bot
+        self.author = author
+        self.command = bot.get_command(command_name)
+        self.message = StubMessage(f"!{command_name}")
+        self.channel = author
+        self.guild = None
+        self.interaction = None
+        self.sent = []
+
+    async def send(self, content=None, *, embed=None, view=None, **kwargs):
+        self.sent.append((content, embed))
+        if isinstance(view, ConfirmView):
+            # Press ✅ right away
+            view.confirmed = True
+            view.stop()
+        elif view is not None:
+            # Nobody pages through results here; don't leave timeouts running
+            view.stop()
+        elif self.bot.outbox is not None:
+            return await self.bot.outbox.send(self.channel, content, embed=embed)
+        return StubMessage(content, embed)
+
+    async def typing(self):
+        return None
+
+    async def defer(self):
+        return None
+
+class LoadGenerator:
+    def __init__(self, bot, user_ids, mix, seed=0):
+        self.bot = bot
+        self.user_ids = user_ids
+        self.commands = list(mix)
+        self.weights = list(mix.values())
+        self.rng = random.Random(seed)
+        self.latencies = {name: [] for name in mix}
+        self.errors = {name: 0 for name in mix}
+        self.earned = {user_id: 0 for user_id in user_ids}
+
+    async def run_command(self, user_id: str, name: str):
+        ctx = StubContext(self.bot, StubUser(int(user_id)), name)
+        args, kwargs = COMMAND_ARGS[name]
+        metrics.start_command(name)
+        start = time.perf_counter()
+        failed = False
+        try:
+            await ctx.command.callback(ctx.command.cog, ctx, *args, **kwargs)
+        except Exception as e:
+            failed = True
+            self.errors[name] += 1
+            if self.errors[name] <= 3:
+                print(f"Error in {name}: {e!r}", file=sys.stderr)
+        finally:
+            # What the bot's after_invoke hook does
+            database.release_users()
+        elapsed = time.perf_counter() - start
+        metrics.finish_command(name, elapsed, failed)
+        self.latencies[name].append(elapsed)
+
+        for _, embed in ctx.sent:
+            if embed is not None and embed.description:
+                match = SALE_TOTAL.search(embed.description)
+                if match:
+                    self.earned[user_id] += int(match.group(1).replace(",", ""))
+
+    async def worker(self, queue: asyncio.Queue):
+        while True:
+            item = await queue.get()
+            try:
+                await self.run_command(*item)
+            finally:
+                queue.task_done()
+
+    async def run(self, total: int, concurrency: int) -> float:
+        queue = asyncio.Queue()
+        for _ in range(total):
+            name = self.rng.choices(self.commands, self.weights)[0]
+            queue.put_nowait((self.rng.choice(self.user_ids), name))
+
+        start = time.perf_counter()
+        workers = [asyncio.create_task(self.worker(queue)) for _ in range(concurrency)]
+        await queue.join()
+        elapsed = time.perf_counter() - start
+        for task in workers:
+            task.cancel()
+        return elapsed
+
+def percentile(values: list, fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for part in value.split(","):
+        name, weight = part.split("=")
+        name = name.strip()
+        if name not in COMMAND_ARGS:
+            raise SystemExit(f"Unknown command in mix: {name} (choose from {', '.join(COMMAND_ARGS)})")
+        mix[name] = float(weight)
+    return mix
+
+async def make_bot():
+    """Build a bot with every cog loaded that never logs in"""
+    bot = commands.Bot(command_prefix="!", intents=discord.Intents.default(), help_command=None)
+    bot.rate_limiter = RateLimiter()
+    bot.outbox = None
+    # Commands that look at the bot's own account or other users get stubs
+    bot._connection.user = StubUser(1)
+
+    async def fetch_user(user_id):
+        return StubUser(user_id)
+    bot.fetch_user = fetch_user
+    bot.get_user = StubUser
+    bot.user_lookup = UserLookup(bot)
+
+    for filename in sorted(os.listdir("cogs")):
+        if filename.endswith(".py") and not filename.startswith("__"):
+            await bot.load_extension(f"cogs.{filename[:-3]}")
+    return bot
+
+async def main():
+    parser = argparse.ArgumentParser(description="Drive the cogs with simulated users")
+    parser.add_argument("--users", type=int, default=1000, help="Simulated active users")
+    parser.add_argument("--population", type=int, default=10000, help="Users in the synthetic data file")
+    parser.add_argument("--commands", type=int, default=20000, help="Total commands to run")
+    parser.add_argument("--concurrency", type=int, default=200, help="Commands in flight at once")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Command weights, e.g. roll=50,sell=50")
+    parser.add_argument("--storage-socket", help="Run against a storage service on this socket instead of a local data file")
+    parser.add_argument("--cache-mb", type=float, help="Keep only this many MB of recently used users in memory")
+    parser.add_argument("--outbox", action="store_true", help="Send replies through the outbound queue into a fake HTTP sink")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report JSON to this file instead of stdout")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    now = time.time()
+    population = make_population(max(args.population, args.users), now, args.seed)
+    user_ids = list(population["users"])[:args.users]
+    for user_id in user_ids:
+        # "plant all" and "harvest all" need a biome to work in
+        population["users"][user_id]["preferred_biome"] = "grassland"
+
+    if args.storage_socket:
+        # The service owns its data file; push the simulated users into it
+        client = StorageClient(args.storage_socket)
+        client.transaction((user_id, None, population["users"][user_id]) for user_id in user_ids)
+        database.configure_storage(client=StorageClient(args.storage_socket))
+    else:
+        # Keep load test data away from the real farm data
+        workdir = Path(tempfile.mkdtemp(prefix="farmer-load-"))
+        DataConfig.DATA_DIR = workdir
+        DataConfig.FARM_DATA_FILE = workdir / "farm_data.json"
+        database.write_data_file(population)
+        database.configure_storage(budget=int(args.cache_mb * 1024 * 1024) if args.cache_mb else None)
+    database.warm_storage()
+
+    initial = {user_id: population["users"][user_id]["balance"] for user_id in user_ids}
+    del population
+
+    bot = await make_bot()
+    if args.outbox:
+        bot.outbox = Outbox(FakeHTTPSink())
+    generator = LoadGenerator(bot, user_ids, mix, args.seed)
+    print(f"Running {args.commands:,} commands from {args.users:,} users...", file=sys.stderr)
+    elapsed = await generator.run(args.commands, args.concurrency)
+
+    users = await database.read_users(["balance"])
+    lost = {}
+    for user_id in user_ids:
+        expected = initial[user_id] + generator.earned[user_id]
+        actual = users[user_id]["balance"]
+        if actual != expected:
+            lost[user_id] = expected - actual
+
+    per_command = {}
+    for name, latencies in generator.latencies.items():
+        if not latencies:
+            continue
+        latencies.sort()
+        per_command[name] = {
+            "count": len(latencies),
+            "errors": generator.errors[name],
+            "mean_s": statistics.fmean(latencies),
+            "p50_s": percentile(latencies, 0.50),
+            "p95_s": percentile(latencies, 0.95),
+            "p99_s": percentile(latencies, 0.99),
+            "max_s": latencies[-1]
+        }
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "users": args.users,
+        "population": max(args.population, args.users),
+        "concurrency": args.concurrency,
+        "storage": "service" if args.storage_socket else "file",
+        "commands": args.commands,
+        "elapsed_s": elapsed,
+        "throughput_per_s": args.commands / elapsed if elapsed else 0,
+        "per_command": per_command,
+        "lost_updates": {
+            "users": len(lost),
+            "balance": sum(lost.values())
+        }
+    }
+    if bot.outbox is not None:
+        report["outbound"] = bot.outbox.sink.summary()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+"""
+Synthetic farm data for benchmarks and load tests.
+Builds user records with the same shape as real ones: seeds, crops with
+mutations, items, skills, active effects and plantings in unlocked biomes.
+"""
+
+import marshal
+import random
+import uuid
+from config import BiomeConfig, DataConfig, ItemConfig, MutationConfig, SeedConfig
+
+def make_user(rng: random.Random, now: float) -> dict:
+    """Build one synthetic user record"""
+    user = DataConfig.get_default_user_data()
+    user["last_rolled"] = now - rng.uniform(0, 86400)
+    # Wealth is heavily skewed, like a real leaderboard
+    user["balance"] = int(rng.lognormvariate(7, 2))
+    user["xp"] = round(rng.uniform(0, 500), 1)
+    user["skills"] = {
+        "grow_rate": rng.randint(0, 20),
+        "crop_yield": rng.randint(0, 20),
+        "roll_luck": rng.randint(0, 20),
+        "xp_per_harvest": rng.randint(0, 10)
+    }
+
+    for seed in user["seeds"]:
+        user["seeds"][seed] = rng.choice([0, 0, 1, 3, 10, 50])
+
+    for crop in user["inventory"]:
+        user["inventory"][crop]["amount"] = rng.choice([0, 5, 20, 200])
+        for mutation in MutationConfig.MUTATIONS:
+            if rng.random() < 0.2:
+                user["inventory"][crop]["mutations"][mutation] = rng.randint(1, 5)
+
+    user["items"] = {item: rng.randint(0, 5) for item in ItemConfig.ITEMS if rng.random() < 0.5}
+
+    user["active_effects"] = {}
+    for item_id, item in ItemConfig.ITEMS.items():
+        if rng.random() < 0.1:
+            start = now - rng.uniform(0, item["effect"]["duration"] * 2)
+            user["active_effects"][str(uuid.UUID(int=rng.getrandbits(128)))] = {
+                "type": item["effect"]["type"],
+                "multiplier": item["effect"]["multiplier"],
+                "start_time": start,
+                "end_time": start + item["effect"]["duration"],
+                "name": item["name"],
+                "emoji": item["emoji"]
+            }
+
+    seeds = list(SeedConfig.PLANT_TIMES)
+    for index, biome in enumerate(BiomeConfig.BIOMES):
+        unlocked = index == 0 or rng.random() < 0.5 / index
+        user["biomes"][biome]["unlocked"] = unlocked
+        if not unlocked:
+            continue
+        capacity = user["biomes"][biome]["capacity"] + rng.choice([0, 0, 1, 5, 20])
+        user["biomes"][biome]["capacity"] = capacity
+        for plot in range(rng.randint(0, capacity)):
+            seed = rng.choice(seeds)
+            duration = SeedConfig.PLANT_TIMES[seed]
+            user["plantings"][biome][f"bench-{index}-{plot}"] = {
+                "seed_type": seed,
+                "start_time": now - rng.uniform(0, duration * 2),
+                "duration": duration,
+                "amount": 1,
+                "is_fertilized": rng.random() < 0.1
+            }
+    return user
+
+def make_population(count: int, now: float, seed: int = 0) -> dict:
+    """Build {"users": {...}} with `count` synthetic users.
+
+    Records are generated from a small pool of templates (copied per user) so
+    large populations build quickly while still varying between users.
+    """
+    rng = random.Random(seed)
+    pool = [marshal.dumps(make_user(rng, now)) for _ in range(min(count, 500))]
+    users = {}
+    for index in range(count):
+        user = marshal.loads(pool[index % len(pool)])
+        user["balance"] = int(rng.lognormvariate(7, 2))
+        users[str(100000000000000000 + index)] = user
+    return {"users": users}
@@ -0,0 +1,86 @@
+import discord
+from discord.ext import commands
+from config import DataConfig
+from config.snapshot import reload_config
+from utils.embeds import error_embed, success_embed, info_embed
+from utils.profiling import profiler
+
+class Admin(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.command(name="reloadconfig")
+    @commands.is_owner()
+    async def reload_config(self, ctx):
+        """Reload game values from the config override file (owner only)"""
+        try:
+            snapshot = reload_config()
+        except (ValueError, OSError) as e:
+            await ctx.send(embed=error_embed(
+                "❌ Config Not Reloaded",
+                f"The current config is still active.\n```\n{str(e)[:1500]}\n```"
+            ))
+            return
+
+        source = DataConfig.GAME_CONFIG_FILE if DataConfig.GAME_CONFIG_FILE.exists() else "built-in defaults"
+        await ctx.send(embed=success_embed(
+            "🔄 Config Reloaded",
+            f"Loaded config version {snapshot.version} from `{source}`.\n"
+            "Commands already running finish with the previous values."
+        ))
+
+    @commands.command()
+    @commands.is_owner()
+    async def profile(self, ctx, command_name: str = None, count: int = 5):
+        """Profile the next runs of a command with cProfile (owner only)"""
+        if not command_name:
+            await ctx.send(embed=error_embed(
+                "❌ Missing Arguments",
+                "**Usage:** `!profile <command> [count]`\n"
+                "Example: `!profile harvest 5`"
+            ))
+            return
+
+        command = self.bot.get_command(command_name)
+        if command is None:
+            await ctx.send(embed=error_embed(
+                "❌ Invalid Command",
+                f"There's no `{command_name}` command!"
+            ))
+            return
+        if count <= 0:
+            await ctx.send(embed=error_embed(
+                "❌ Invalid Amount",
+                "Count must be a positive number!"
+            ))
+            return
+
+        channel = ctx.channel
+
+        async def report(run):
+            path, summary = profiler.save(run)
+            await channel.send(
+                content=f"📊 Profile of {run.count} `{run.command}` run(s), saved to `{path}`\n```\n{summary[:1800]}\n```",
+                file=discord.File(str(path))
+            )
+
+        profiler.arm(command.qualified_name, count, report)
+        await ctx.send(embed=info_embed(
+            "📊 Profiler Armed",
+            f"The next {count} run(s) of `{command.qualified_name}` will be profiled.\n"
+            f"Use `!profilestop {command.qualified_name}` to cancel."
+        ))
+
+    @commands.command(name="profilestop")
+    @commands.is_owner()
+    async def profile_stop(self, ctx, command_name: str):
+        """Cancel profiling of a command (owner only)"""
+        command = self.bot.get_command(command_name)
+        name = command.qualified_name if command else command_name
+        if profiler.disarm(name):
+            await ctx.send(embed=success_embed("📊 Profiler Stopped", f"`{name}` is no longer being profiled."))
+        else:
+            await ctx.send(embed=error_embed("❌ Not Profiling", f"`{name}` isn't being profiled."))
+
+async def setup(bot):
+    await bot.add_cog(Admin(bot))
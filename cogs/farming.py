@@ -1,128 +1,31 @@
 import discord
+from discord import app_commands
 from discord.ext import commands
-import random
 import time
-from utils.database import load_data, save_data, get_user_data
-from config import (
-    BiomeConfig,
-    SeedConfig,
-    CropConfig,
-    MutationConfig,
-    EmojiConfig,
-    Colors,
-    GameConstants,
-    ItemConfig
-)
-from utils.embeds import error_embed, success_embed, confirmation_embed
+from functools import partial
+import engine
+from engine import GameError
+from utils.database import load_data, save_data, get_user_data, read_user_data
+from config import EmojiConfig, Colors
+from config.snapshot import get_snapshot
+from utils.embeds import error_embed, success_embed
+from utils.coalesce import Coalescer
+from utils.garden import GardenSummary
+from utils.views import PageView
 
 class Farming(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.roll_batches = Coalescer("roll")
+        self.plant_batches = Coalescer("plant")
 
-    def get_active_effects(self, user_data: dict, now: float) -> dict:
-        """Get all active effects and clean up expired ones"""
-        if "active_effects" not in user_data:
-            user_data["active_effects"] = {}
-        
-        # Clean up expired effects
-        expired = []
-        for effect_id, effect in user_data["active_effects"].items():
-            if now > effect["end_time"]:
-                expired.append(effect_id)
-        
-        for effect_id in expired:
-            del user_data["active_effects"][effect_id]
-        
-        return user_data["active_effects"]
-
-    def get_current_luck_factor(self, user_data: dict, now: float) -> float:
-        """Calculate current luck factor based on active effects and skills"""
-        luck_factor = GameConstants.BASE_LUCK_FACTOR
-        active_effects = self.get_active_effects(user_data, now)
-        
-        # Apply skill bonus
-        if "skills" in user_data and "roll_luck" in user_data["skills"]:
-            skill_level = user_data["skills"]["roll_luck"]
-            luck_factor *= (1 + min(skill_level * 0.01, 0.20))  # 1% per level, max 20%
-        
-        # Apply active effects
-        for effect in active_effects.values():
-            if effect["type"] == "luck_boost":
-                luck_factor *= effect["multiplier"]
-        
-        return luck_factor
-
-    def get_growth_speed_multiplier(self, user_data: dict, now: float) -> float:
-        """Calculate current growth speed multiplier based on active effects and skills"""
-        multiplier = 1.0
-        active_effects = self.get_active_effects(user_data, now)
-        
-        # Apply skill bonus
-        if "skills" in user_data and "grow_rate" in user_data["skills"]:
-            skill_level = user_data["skills"]["grow_rate"]
-            multiplier *= (1 + min(skill_level * 0.005, 0.10))  # 0.5% per level, max 10%
-        
-        # Apply active effects
-        for effect in active_effects.values():
-            if effect["type"] == "growth_speed":
-                multiplier = max(multiplier, effect["multiplier"])
-                break
-        
-        return multiplier
-
-    def has_active_fertilizer(self, user_data: dict, now: float) -> bool:
-        """Check if there's an active fertilizer effect"""
-        active_effects = self.get_active_effects(user_data, now)
-        for effect in active_effects.values():
-            if effect["type"] == "yield_boost":
-                return True
-        return False
-
-    def get_yield_multiplier(self, user_data: dict, now: float, is_fertilized: bool = False) -> float:
-        """Calculate current yield multiplier based on active effects, fertilized status, and skills"""
-        multiplier = 1.0
-        
-        # Apply skill bonus
-        if "skills" in user_data and "crop_yield" in user_data["skills"]:
-            skill_level = user_data["skills"]["crop_yield"]
-            multiplier *= (1 + min(skill_level * 0.005, 0.10))  # 0.5% per level, max 10%
-        
-        # If the crop was fertilized when planted, always apply the fertilizer multiplier
-        if is_fertilized:
-            # Get the fertilizer multiplier from config
-            fertilizer_multiplier = ItemConfig.ITEMS["fertilizer"]["effect"]["multiplier"]
-            multiplier *= fertilizer_multiplier
-        
-        # Check for other active yield effects
-        active_effects = self.get_active_effects(user_data, now)
-        for effect in active_effects.values():
-            if effect["type"] == "yield_boost":
-                multiplier *= effect["multiplier"]
-        
-        return multiplier
-
-    def calculate_growth_progress(self, planting: dict, now: float, growth_multiplier: float) -> float:
-        """Calculate growth progress for a planting, accounting for dynamic growth speed"""
-        base_duration = planting["duration"]
-        elapsed = now - planting["start_time"]
-        
-        # Apply current growth multiplier to elapsed time
-        effective_elapsed = elapsed * growth_multiplier
-        
-        return effective_elapsed / base_duration
+    def track_notifications(self, user_id: str, user_data: dict, biome: str = None):
+        """Let the notification scheduler know a user's gardens changed"""
+        notifications = self.bot.get_cog("Notifications")
+        if notifications is not None:
+            notifications.track(user_id, user_data, biome)
 
-    def calculate_xp_gain(self, user_data: dict, seed_amount: int) -> float:
-        """Calculate XP gain from harvesting crops (1 XP per seed planted)"""
-        base_xp = 1.0  # Base XP per seed planted
-        
-        # Apply XP per harvest skill bonus
-        if "skills" in user_data and "xp_per_harvest" in user_data["skills"]:
-            skill_level = user_data["skills"]["xp_per_harvest"]
-            base_xp += min(skill_level * 0.5, 5.0)  # +0.5 per level, max +5
-        
-        return base_xp * seed_amount
-
-    @commands.command()
+    @commands.hybrid_command()
     async def set(self, ctx, biome: str = None):
         """Set your preferred biome for planting"""
         if not biome:
@@ -132,40 +35,29 @@ class Farming(commands.Cog):
             ))
             return
 
-        biome = biome.lower()
-        if biome not in BiomeConfig.BIOMES:
-            await ctx.send(embed=error_embed(
-                "❌ Invalid Biome",
-                f"Available biomes:\n" + 
-                "\n".join([f"{BiomeConfig.BIOMES[b]['emoji']} {b}" for b in BiomeConfig.BIOMES.keys()])
-            ))
-            return
-
         user_id = str(ctx.author.id)
-        data = load_data()
+        data = await load_data(user_id)
         user = get_user_data(user_id, data)
 
-        # Check if biome is unlocked
-        if not user["biomes"][biome]["unlocked"] and biome != "grassland":
-            await ctx.send(embed=error_embed(
-                "🔒 Biome Locked",
-                f"You haven't unlocked the {biome} biome yet!\nUse `!shop biomes` to view unlock costs."
-            ))
+        try:
+            biome = engine.check_biome(user, biome)
+        except GameError as e:
+            await ctx.send(embed=error_embed(e.title, e.message))
             return
 
         user["preferred_biome"] = biome
-        save_data(data)
+        await save_data(data)
 
         await ctx.send(embed=success_embed(
-            f"{BiomeConfig.BIOMES[biome]['emoji']} Biome Set",
+            f"{get_snapshot().biomes[biome]['emoji']} Biome Set",
             f"Your preferred biome has been set to {biome}.\nYou can now use `!plant <seed> [amount]` without specifying the biome!"
         ))
 
-    @commands.command()
+    @commands.hybrid_command()
     async def unset(self, ctx):
         """Remove your preferred biome setting"""
         user_id = str(ctx.author.id)
-        data = load_data()
+        data = await load_data(user_id)
         user = get_user_data(user_id, data)
 
         if user["preferred_biome"] is None:
@@ -177,86 +69,149 @@ class Farming(commands.Cog):
 
         old_biome = user["preferred_biome"]
         user["preferred_biome"] = None
-        save_data(data)
+        await save_data(data)
 
         await ctx.send(embed=success_embed(
             "🔄 Biome Unset",
             f"Your preferred biome ({old_biome}) has been unset.\nYou'll need to specify the biome when using `!plant` again."
         ))
 
-    @commands.command()
+    @commands.hybrid_command()
     async def roll(self, ctx):
         """Roll for seeds"""
-        user_id = str(ctx.author.id)
-        data = load_data()
-        now = time.time()
-        
-        user = get_user_data(user_id, data)
-        time_since_last = now - user["last_rolled"]
-
-        # 1 second cooldown
-        if time_since_last < 1:
-            remaining = 1 - time_since_last
+        # 1 second cooldown, checked against the rate limiter so rejections never load farm data
+        remaining = await self.bot.rate_limiter.check_cooldown(ctx.author.id, "roll", 1)
+        if remaining > 0:
             await ctx.send(embed=error_embed(
                 "⏳ Rolling Cooldown",
                 f"You need to wait {int(remaining)} seconds!"
             ))
             return
 
-        seed, amount, rarity = self.get_random_seed()
-        user["last_rolled"] = now
-        user["seeds"][seed] = user["seeds"].get(seed, 0) + amount
-        save_data(data)
+        try:
+            if ctx.interaction is not None:
+                # Every slash command needs its own response, so they aren't merged
+                await self.roll_batch([ctx], None)
+            else:
+                # Rolls that arrive while an earlier one is being answered share its reply
+                await self.roll_batches.submit(ctx.author.id, ctx, self.roll_batch)
+        except Exception:
+            # The cooldown keeps concurrent rolls out; a roll that failed doesn't use it up
+            await self.bot.rate_limiter.clear_cooldown(ctx.author.id, "roll")
+            raise
+
+    async def roll_batch(self, batch: list, state):
+        """Roll once per queued command with a single save, then send or edit one reply"""
+        ctx = batch[0]
+        user_id = str(ctx.author.id)
+        data = await load_data(user_id)
+        now = time.time()
+        config = get_snapshot()
+        user = get_user_data(user_id, data)
+        results = [engine.roll(user, now, config) for _ in batch]
+        await save_data(data)
+
+        message, rolled = state or (None, [])
+        rolled = rolled + results
+        embed = self.roll_embed(rolled)
+        if message is None:
+            message = await ctx.send(embed=embed)
+        else:
+            await message.edit(embed=embed)
+        return message, rolled
+
+    def roll_embed(self, rolled: list) -> discord.Embed:
+        if len(rolled) == 1:
+            result = rolled[0]
+            return success_embed(
+                f"{EmojiConfig.EMOJI_MAP[result.seed]} {result.rarity.title()} Seed Roll!",
+                f"You obtained **{result.amount}** {result.seed.replace('_', ' ').title()}!"
+            )
 
-        await ctx.send(embed=success_embed(
-            f"{EmojiConfig.EMOJI_MAP[seed]} {rarity.title()} Seed Roll!",
-            f"You obtained **{amount}** {seed.replace('_', ' ').title()}!"
-        ))
+        counts = {}
+        for result in rolled:
+            counts[result.seed] = counts.get(result.seed, 0) + result.amount
+        return success_embed(
+            f"🎲 {len(rolled)} Seed Rolls!",
+            "You obtained:\n" + "\n".join(
+                f"{EmojiConfig.EMOJI_MAP[seed]} **{amount}** {seed.replace('_', ' ').title()}"
+                for seed, amount in counts.items()
+            )
+        )
 
-    @commands.command()
+    @commands.hybrid_command()
+    @app_commands.describe(
+        arg1="Seed type, or the biome if you have no preferred biome, or \"all\"",
+        arg2="Amount, or the seed type if arg1 is a biome, or \"all\"",
+        arg3="Amount when arg1 is a biome"
+    )
     async def plant(self, ctx, arg1: str = None, arg2: str = None, arg3: int = None):
         """Plant seeds in a biome"""
+        args = (arg1, arg2, arg3)
+        if ctx.interaction is not None:
+            # Every slash command needs its own response, so they aren't merged
+            await self.plant_batch([ctx], None, args)
+            return
+
+        # Repeats of the same plant command that arrive while one is being answered share its reply
+        await self.plant_batches.submit((ctx.author.id, args), ctx, partial(self.plant_batch, args=args))
+
+    async def plant_batch(self, batch: list, state, args: tuple):
+        """Run each queued plant command with a single save, then send or edit one reply"""
+        ctx = batch[0]
         user_id = str(ctx.author.id)
-        data = load_data()
+        data = await load_data(user_id)
         now = time.time()
-        
+        config = get_snapshot()
         user = get_user_data(user_id, data)
+
+        results = []
+        failed = None  # (ctx, error) of the first command that failed
+        for command_ctx in batch:
+            try:
+                results.append(self.plant_from_args(user, *args, now, config))
+            except GameError as e:
+                failed = failed or (command_ctx, e)
+
+        message, planted = state or (None, None)
+        if not results:
+            # Every command in the batch failed, e.g. the seeds ran out after an earlier batch
+            await ctx.send(embed=error_embed(failed[1].title, failed[1].message))
+            return state
+
+        await save_data(data)
+        self.track_notifications(user_id, user, results[-1].biome)
+        for result in results:
+            planted = planted.merged(result) if planted else result
+
+        plant_all = "all" in [arg.lower() for arg in args[:2] if arg]
+        embed = self.mass_plant_embed(planted) if plant_all else self.plant_embed(planted)
+        if message is None:
+            message = await ctx.send(embed=embed)
+        else:
+            await message.edit(embed=embed)
+        if failed:
+            # Some repeats failed, e.g. the seeds ran out partway through the batch
+            failed_ctx, error = failed
+            await failed_ctx.send(embed=error_embed(error.title, error.message))
+        return message, planted
+
+    def plant_from_args(self, user: dict, arg1, arg2, arg3, now: float, config):
+        """Parse !plant arguments and plant, raising GameError for bad arguments"""
         # Handle case where preferred_biome doesn't exist in user data
         preferred_biome = user.get("preferred_biome")
 
-        # Check for active fertilizer effect
-        is_fertilized = self.has_active_fertilizer(user, now)
-
-        # Handle "plant all" command
+        # Handle "plant all" and "plant <biome> all"
         if arg1 and arg1.lower() == "all":
-            if preferred_biome:
-                await self.plant_all_seeds(ctx, preferred_biome, user, data, now, is_fertilized)
-            else:
-                await ctx.send(embed=error_embed(
+            if not preferred_biome:
+                raise GameError(
+                    "no_biome",
                     "❌ No Biome Set",
                     "You need to set a preferred biome with `!set <biome>` first!"
-                ))
-            return
+                )
+            return engine.plant_all(user, preferred_biome, now, config)
         elif arg2 and arg2.lower() == "all":
-            biome = arg1.lower()
-            if biome not in BiomeConfig.BIOMES:
-                await ctx.send(embed=error_embed(
-                    "❌ Invalid Biome",
-                    f"Available biomes:\n" + 
-                    "\n".join([f"{BiomeConfig.BIOMES[b]['emoji']} {b}" for b in BiomeConfig.BIOMES.keys()])
-                ))
-                return
-            
-            # Check if biome is unlocked
-            if not user["biomes"][biome]["unlocked"] and biome != "grassland":
-                await ctx.send(embed=error_embed(
-                    "🔒 Biome Locked",
-                    f"You haven't unlocked the {biome} biome yet!\nUse `!shop biomes` to view unlock costs."
-                ))
-                return
-                
-            await self.plant_all_seeds(ctx, biome, user, data, now, is_fertilized)
-            return
+            return engine.plant_all(user, arg1, now, config)
 
         # Parse arguments based on whether a preferred biome is set
         if preferred_biome is not None:
@@ -278,123 +233,52 @@ class Farming(commands.Cog):
         if not biome or not seed_type:
             usage = "`!plant <seed> [amount]`" if preferred_biome else "`!plant <biome> <seed> [amount]`"
             example = f"`!plant wheat 2`" if preferred_biome else "`!plant grassland wheat 2`"
-            await ctx.send(embed=error_embed(
+            raise GameError(
+                "missing_arguments",
                 "❌ Missing Arguments",
                 f"**Usage:** {usage}\nExample: {example}"
-            ))
-            return
-
-        biome = biome.lower()
-        seed_type = seed_type.lower() + "_seed"
-
-        # Validate biome
-        if biome not in BiomeConfig.BIOMES:
-            await ctx.send(embed=error_embed(
-                "❌ Invalid Biome",
-                f"Available biomes:\n" + 
-                "\n".join([f"{BiomeConfig.BIOMES[b]['emoji']} {b}" for b in BiomeConfig.BIOMES.keys()])
-            ))
-            return
-
-        # Check if biome is unlocked
-        if not user["biomes"][biome]["unlocked"] and biome != "grassland":
-            await ctx.send(embed=error_embed(
-                "🔒 Biome Locked",
-                f"You haven't unlocked the {biome} biome yet!\nUse `!shop biomes` to view unlock costs."
-            ))
-            return
-
-        # Validation
-        if seed_type not in SeedConfig.PLANT_TIMES:
-            await ctx.send(embed=error_embed(
-                "❌ Invalid Seed Type",
-                f"`{seed_type.replace('_seed', '')}` isn't a plantable seed!"
-            ))
-            return
-
-        available_seeds = user["seeds"].get(seed_type, 0)
-        if available_seeds <= 0:
-            await ctx.send(embed=error_embed(
-                "❌ No Seeds Available",
-                f"You don't have any {seed_type.replace('_seed', '')} seeds!"
-            ))
-            return
-
-        # Calculate remaining planter capacity
-        used_capacity = len(user["plantings"][biome])
-        current_capacity = user["biomes"][biome]["capacity"]
-        remaining_capacity = current_capacity - used_capacity
-
-        # Determine planting amount
-        if amount is None:
-            plant_amount = min(available_seeds, remaining_capacity)
-        else:
-            plant_amount = min(amount, available_seeds, remaining_capacity)
-
-        if amount is not None and amount <= 0:
-            await ctx.send(embed=error_embed(
-                "❌ Invalid Planting",
-                "Can't plant 0 or negative seeds!"
-            ))
-            return
-
-        if plant_amount <= 0:
-            await ctx.send(embed=error_embed(
-                "❌ Garden Full",
-                f"Not enough space in your {biome} garden! (Capacity: {current_capacity}, Used: {used_capacity})"
-            ))
-            return
+            )
 
-        # Create individual plantings
-        base_id = f"{user_id}-{int(now*1000)}"
-        for i in range(plant_amount):
-            planting_id = f"{base_id}-{i}"
-            user["plantings"][biome][planting_id] = {
-                "seed_type": seed_type,
-                "start_time": now,
-                "duration": SeedConfig.PLANT_TIMES[seed_type],
-                "amount": 1,
-                "is_fertilized": is_fertilized  # Mark if planted during fertilizer effect
-            }
-
-        # Update seeds inventory
-        user["seeds"][seed_type] -= plant_amount
-        save_data(data)
-
-        # Calculate updated capacity after planting
-        updated_used_capacity = len(user["plantings"][biome])
-
-        # Add fertilizer status to message if active
-        status_msg = ""
-        if is_fertilized:
-            status_msg = "\nPlanted with Fertilizer effect active!"
+        return engine.plant(user, biome, seed_type.lower() + "_seed", amount, now, config)
 
-        await ctx.send(embed=success_embed(
-            f"{BiomeConfig.BIOMES[biome]['emoji']} Planting Started!",
-            f"Planting {plant_amount} {seed_type.replace('_seed', '')} seed{'s' if plant_amount > 1 else ''} in {biome}\n" +
-            f"Plots used: {updated_used_capacity}/{current_capacity}" +
+    def plant_embed(self, result) -> discord.Embed:
+        seed_type, plant_amount = next(iter(result.planted.items()))
+        status_msg = "\nPlanted with Fertilizer effect active!" if result.fertilized else ""
+        return success_embed(
+            f"{get_snapshot().biomes[result.biome]['emoji']} Planting Started!",
+            f"Planting {plant_amount} {seed_type.replace('_seed', '')} seed{'s' if plant_amount > 1 else ''} in {result.biome}\n" +
+            f"Plots used: {result.used}/{result.capacity}" +
             status_msg +
-            f"\nUse `!garden {biome}` to track your plantings"
-        ))
+            f"\nUse `!garden {result.biome}` to track your plantings"
+        )
+
+    def mass_plant_embed(self, result) -> discord.Embed:
+        to_plant = [
+            f"{EmojiConfig.EMOJI_MAP[seed_type]} {seed_type.replace('_seed', '').title()}: {amount}"
+            for seed_type, amount in result.planted.items()
+        ]
+        status_msg = "\nPlanted with Fertilizer effect active!" if result.fertilized else ""
+        return success_embed(
+            f"{get_snapshot().biomes[result.biome]['emoji']} Mass Planting Success!",
+            f"Successfully planted in {result.biome}:\n" + "\n".join(to_plant) +
+            f"\n\nPlots used: {result.total}/{result.free}" +
+            status_msg
+        )
 
-    @commands.command()
+    @commands.hybrid_command()
     async def garden(self, ctx, biome: str = None):
         """View your gardens"""
-        user_id = str(ctx.author.id)
-        data = load_data()
         now = time.time()
-
-        user = get_user_data(user_id, data)
+        user = await read_user_data(str(ctx.author.id))
         # Handle case where preferred_biome doesn't exist in user data
         preferred_biome = user.get("preferred_biome")
 
-        # Get current growth multiplier for progress calculation
-        growth_multiplier = self.get_growth_speed_multiplier(user, now)
-
         # If no biome specified, try to use preferred biome
         if not biome and preferred_biome:
             biome = preferred_biome
 
+        biomes = get_snapshot().biomes
+
         # If still no biome specified, show overview
         if not biome:
             embed = discord.Embed(
@@ -403,7 +287,7 @@ class Farming(commands.Cog):
                 color=Colors.EMBED
             )
             
-            for biome_name, biome_data in BiomeConfig.BIOMES.items():
+            for biome_name, biome_data in biomes.items():
                 if user["biomes"][biome_name]["unlocked"]:
                     active_plantings = len(user["plantings"][biome_name])
                     capacity = user["biomes"][biome_name]["capacity"]
@@ -437,76 +321,92 @@ class Farming(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        # Show specific biome garden
-        plantings = []
-        biome_data = BiomeConfig.BIOMES[biome]
-        
-        for planting_id, details in user["plantings"][biome].items():
-            seed_type = details["seed_type"]
-            crop_name = seed_type.replace("_seed", "")
-            
-            # Calculate progress using dynamic growth speed
-            progress = self.calculate_growth_progress(details, now, growth_multiplier)
-            
-            if progress >= 1.0:
-                status = "✅ Ready to harvest!"
-            else:
-                remaining = int((1.0 - progress) * details["duration"] / growth_multiplier)
-                status = f"⏳ {remaining}s remaining"
-            
-            plantings.append(
-                f"{EmojiConfig.EMOJI_MAP[crop_name]} {crop_name.title()} x{details['amount']} - {status}"
-            )
+        biome = biome.lower()
+        if biome not in biomes:
+            await ctx.send(embed=error_embed(
+                "❌ Invalid Biome",
+                f"Available biomes:\n" + 
+                "\n".join([f"{biomes[b]['emoji']} {b}" for b in biomes.keys()])
+            ))
+            return
 
-        embed = discord.Embed(
-            title=f"{biome_data['emoji']} {ctx.author.display_name}'s {biome.title()} Garden",
-            description="\n".join(plantings) or f"No active plantings in {biome} garden",
-            color=biome_data['color']
-        )
+        # Show specific biome garden, grouped by seed and readiness
+        biome_data = biomes[biome]
+        summary = GardenSummary()
         
+        plantings = user["plantings"][biome]
+        for planting_id, ripen_time in engine.ripen_times(user, biome, now):
+            details = plantings[planting_id]
+            summary.add(details["seed_type"], ripen_time - now, details.get("amount", 1))
+
+        pages = summary.pages() or [f"No active plantings in {biome} garden"]
         used_capacity = len(user["plantings"][biome])
         current_capacity = user["biomes"][biome]["capacity"]
-        embed.add_field(
-            name="Garden Capacity",
-            value=f"{used_capacity}/{current_capacity} plots used",
-            inline=False
-        )
         
         # Show active effects if any
-        active_effects = self.get_active_effects(user, now)
-        if active_effects:
-            effects_text = []
-            for effect in active_effects.values():
-                remaining = int(effect["end_time"] - now)
-                effects_text.append(f"{effect['emoji']} {effect['name']} - ⏳ {remaining}s")
-            
+        effects_text = []
+        for _, effect in engine.current_effects(user, now):
+            remaining = int(effect["end_time"] - now)
+            effects_text.append(f"{effect['emoji']} {effect['name']} - ⏳ {remaining}s")
+
+        embeds = []
+        for page_number, page in enumerate(pages, start=1):
+            embed = discord.Embed(
+                title=f"{biome_data['emoji']} {ctx.author.display_name}'s {biome.title()} Garden",
+                description=(summary.header() + "\n\n" + page) if summary.total else page,
+                color=biome_data['color']
+            )
             embed.add_field(
-                name="Active Effects",
-                value="\n".join(effects_text),
+                name="Garden Capacity",
+                value=f"{used_capacity}/{current_capacity} plots used",
                 inline=False
             )
-        
-        await ctx.send(embed=embed)
+            if effects_text:
+                embed.add_field(
+                    name="Active Effects",
+                    value="\n".join(effects_text),
+                    inline=False
+                )
+            if len(pages) > 1:
+                embed.set_footer(text=f"Page {page_number}/{len(pages)}")
+            embeds.append(embed)
+
+        if len(embeds) == 1:
+            await ctx.send(embed=embeds[0])
+        else:
+            view = PageView(embeds)
+            view.message = await ctx.send(embed=embeds[0], view=view)
 
-    @commands.command()
-    async def harvest(self, ctx, biome: str = None):
+    @commands.hybrid_command()
+    async def harvest(self, ctx, biome: str = None, mode: str = None):
         """Harvest your crops"""
+        if biome and biome.lower() == "all":
+            # Harvesting every biome can take a while; acknowledge slash commands first
+            await ctx.defer()
+
         user_id = str(ctx.author.id)
-        data = load_data()
+        data = await load_data(user_id)
         now = time.time()
+        config = get_snapshot()
         
         user = get_user_data(user_id, data)
+
+        # "!harvest replant" harvests and replants the preferred biome
+        if biome and biome.lower() == "replant" and mode is None:
+            biome, mode = None, "replant"
+
+        if mode and mode.lower() != "replant":
+            await ctx.send(embed=error_embed(
+                "❌ Invalid Option",
+                "**Usage:** `!harvest [biome|all] [replant]`\nExample: `!harvest all replant`"
+            ))
+            return
         
         # Handle biome selection
-        if biome:
-            biome = biome.lower()
-            if biome not in BiomeConfig.BIOMES:
-                await ctx.send(embed=error_embed(
-                    "❌ Invalid Biome",
-                    f"Available biomes:\n" + 
-                    "\n".join([f"{BiomeConfig.BIOMES[b]['emoji']} {b}" for b in BiomeConfig.BIOMES.keys()])
-                ))
-                return
+        if biome and biome.lower() == "all":
+            biomes = engine.open_biomes(user, config)
+        elif biome:
+            biomes = [biome]
         else:
             biome = user.get("preferred_biome")
             if not biome:
@@ -515,214 +415,68 @@ class Farming(commands.Cog):
                     "Please specify a biome or set a preferred biome using `!set <biome>`"
                 ))
                 return
+            biomes = [biome]
 
-        # Check if biome is unlocked
-        if not user["biomes"][biome]["unlocked"] and biome != "grassland":
-            await ctx.send(embed=error_embed(
-                "🔒 Biome Locked",
-                f"You haven't unlocked the {biome} biome yet!\nUse `!shop biomes` to view unlock costs."
-            ))
+        # Harvest (and replant) every biome in memory, then save once
+        try:
+            result = engine.harvest(user, biomes, now, bool(mode), config)
+        except GameError as e:
+            await ctx.send(embed=error_embed(e.title, e.message))
             return
 
-        # Harvest crops
-        harvested, total_xp_gained = await self.harvest_from_biome(user, biome, now)
-        
-        if not harvested:
-            await ctx.send(embed=error_embed(
-                "🌱 Nothing to Harvest",
-                f"You don't have any ready crops in the {biome} biome!"
-            ))
-            return
+        await save_data(data)
+        self.track_notifications(user_id, user)
 
-        # Create harvest message
+        # Create harvest message, one line per crop
         summary_lines = []
-        for item in harvested:
+        for crop, amount in sorted(result.crops.items(), key=lambda x: -x[1]):
             summary_lines.append(
-                f"{EmojiConfig.EMOJI_MAP[item['crop']]} {item['crop'].replace('_', ' ').title()} x{item['amount']}"
+                f"{EmojiConfig.EMOJI_MAP.get(crop, '🌱')} {crop.replace('_', ' ').title()} x{amount}"
             )
 
+        biomes = result.biomes
+        title_emoji = "🧺" if len(biomes) > 1 else get_snapshot().biomes[biomes[0]]['emoji']
         embed = discord.Embed(
-            title=f"{BiomeConfig.BIOMES[biome]['emoji']} Harvest Complete!",
+            title=f"{title_emoji} Harvest Complete!",
             description=f"Successfully harvested:\n" + "\n".join(summary_lines),
             color=Colors.EMBED
         )
 
-        if total_xp_gained > 0:
+        if len(biomes) > 1:
             embed.add_field(
-                name="✨ XP Gained",
-                value=f"{total_xp_gained:.1f}",
+                name="🌍 Plots Harvested",
+                value="\n".join(
+                    f"{get_snapshot().biomes[b]['emoji']} {b.title()}: {count}" for b, count in result.biome_counts.items()
+                ),
                 inline=False
             )
 
-        save_data(data)
-        await ctx.send(embed=embed)
-
-    def get_random_seed(self):
-        """Get a random seed based on rarity tiers and luck factor."""
-        user_id = str(self.bot.user.id)  # Get the current user's ID
-        data = load_data()
-        now = time.time()
-        user = get_user_data(user_id, data)
-        
-        # Get current luck factor
-        luck_factor = self.get_current_luck_factor(user, now)
-        
-        # Apply luck factor to roll chances
-        roll = random.uniform(0, 100)
-        roll *= luck_factor  # Higher luck means higher effective roll
-        
-        cumulative = 0
-        selected_tier = None
-        
-        for tier, values in SeedConfig.SEEDS.items():
-            cumulative += values["chance"]
-            if roll <= cumulative:
-                selected_tier = tier
-                break
-        
-        # If no tier was selected (due to high luck), pick legendary
-        if selected_tier is None:
-            selected_tier = "legendary"
-        
-        seed = random.choice(SeedConfig.SEEDS[selected_tier]["seeds"])
-        return seed, 1, selected_tier
-
-    async def harvest_from_biome(self, user, biome, now):
-        """Harvest crops from a specific biome"""
-        plantings = user["plantings"][biome]
-        harvested = []
-        total_xp_gained = 0
-
-        # Initialize inventory if it doesn't exist
-        if "inventory" not in user:
-            user["inventory"] = {}
-
-        for planting_id, planting in list(plantings.items()):
-            if self.calculate_growth_progress(planting, now, self.get_growth_speed_multiplier(user, now)) >= 1.0:
-                seed_type = planting["seed_type"]
-                crop_type = seed_type.replace("_seed", "")
-                amount = planting["amount"]
-                is_fertilized = planting.get("is_fertilized", False)
-
-                # Find crop tier and base yield
-                crop_tier = next(
-                    (tier for tier, values in CropConfig.CROPS.items() 
-                     if crop_type in values["crops"]),
-                    "common"  # Default to common if not found
-                )
-                base_yield = CropConfig.CROPS[crop_tier]["base_yield"]
-                yield_multiplier = self.get_yield_multiplier(user, now, is_fertilized)
-                final_yield = int(base_yield * amount * yield_multiplier)
-
-                # Initialize crop in inventory if it doesn't exist
-                if crop_type not in user["inventory"]:
-                    user["inventory"][crop_type] = {"amount": 0, "mutations": {}}
-                elif isinstance(user["inventory"][crop_type], int):
-                    # Convert old format to new format
-                    old_amount = user["inventory"][crop_type]
-                    user["inventory"][crop_type] = {"amount": old_amount, "mutations": {}}
-
-                # Add to inventory
-                user["inventory"][crop_type]["amount"] += final_yield
-
-                # Calculate and add XP (1 XP per seed planted)
-                xp_gained = self.calculate_xp_gain(user, amount)  # Pass amount instead of final_yield
-                if "xp" not in user:
-                    user["xp"] = 0
-                user["xp"] += xp_gained
-                total_xp_gained += xp_gained
-
-                harvested.append({
-                    "crop": crop_type,
-                    "amount": final_yield,
-                    "xp": xp_gained
-                })
-
-                # Remove the planting
-                del plantings[planting_id]
-
-        return harvested, total_xp_gained
-
-    async def plant_all_seeds(self, ctx, biome: str, user_data: dict, data: dict, now: float, is_fertilized: bool):
-        """Plant all available seeds in a biome, prioritizing rarest seeds first"""
-        # Get available planter capacity
-        used_capacity = len(user_data["plantings"][biome])
-        current_capacity = user_data["biomes"][biome]["capacity"]
-        remaining_capacity = current_capacity - used_capacity
-
-        if remaining_capacity <= 0:
-            await ctx.send(embed=error_embed(
-                "❌ No Space Available",
-                f"Your {biome} planters are full! Use `!harvest {biome}` to free up space."
-            ))
-            return
-
-        # Get all seed types sorted by rarity (legendary to common)
-        rarity_order = ["legendary", "epic", "rare", "uncommon", "common"]
-        all_seeds = []
-        for rarity in rarity_order:
-            all_seeds.extend(SeedConfig.SEEDS[rarity]["seeds"])
-
-        # Track what we're going to plant
-        to_plant = []
-        spaces_used = 0
-
-        # Try to plant seeds in order of rarity
-        for seed_type in all_seeds:
-            if spaces_used >= remaining_capacity:
-                break
-
-            available_seeds = user_data["seeds"].get(seed_type, 0)
-            if available_seeds > 0:
-                plant_amount = min(available_seeds, remaining_capacity - spaces_used)
-                if plant_amount > 0:
-                    # Generate unique IDs for each planting
-                    for _ in range(plant_amount):
-                        planting_id = f"{ctx.author.id}-{now}-{spaces_used}"
-                        user_data["plantings"][biome][planting_id] = {
-                            "seed_type": seed_type,
-                            "start_time": now,
-                            "duration": SeedConfig.PLANT_TIMES[seed_type],
-                            "amount": 1,
-                            "is_fertilized": is_fertilized  # Mark if planted during fertilizer effect
-                        }
-                        spaces_used += 1
-                    
-                    # Update seed count
-                    user_data["seeds"][seed_type] -= plant_amount
-                    to_plant.append(f"{EmojiConfig.EMOJI_MAP[seed_type]} {seed_type.replace('_seed', '').title()}: {plant_amount}")
-
-        if not to_plant:
-            await ctx.send(embed=error_embed(
-                "❌ No Seeds Available",
-                "You don't have any seeds to plant!"
-            ))
-            return
+        if mode:
+            replant_lines = [
+                f"{EmojiConfig.EMOJI_MAP.get(seed, '🌱')} {seed.replace('_seed', '').title()}: {amount}"
+                for seed, amount in result.replanted.items()
+            ]
+            embed.add_field(
+                name="🌱 Replanted",
+                value="\n".join(replant_lines) if replant_lines else "No matching seeds left to replant",
+                inline=False
+            )
 
-        save_data(data)
-        
-        # Add fertilizer status to message if active
-        status_msg = ""
-        if is_fertilized:
-            status_msg = "\nPlanted with Fertilizer effect active!"
+        if result.xp > 0:
+            embed.add_field(
+                name="✨ XP Gained",
+                value=f"{result.xp:.1f}",
+                inline=False
+            )
 
-        # Send success message
-        await ctx.send(embed=success_embed(
-            f"{BiomeConfig.BIOMES[biome]['emoji']} Mass Planting Success!",
-            f"Successfully planted in {biome}:\n" + "\n".join(to_plant) +
-            f"\n\nPlots used: {spaces_used}/{remaining_capacity}" +
-            status_msg
-        ))
+        await ctx.send(embed=embed)
 
-    @commands.command()
+    @commands.hybrid_command()
     async def effects(self, ctx):
         """View your active effects"""
-        user_id = str(ctx.author.id)
-        data = load_data()
         now = time.time()
-        
-        user = get_user_data(user_id, data)
-        active_effects = self.get_active_effects(user, now)
+        user = await read_user_data(str(ctx.author.id))
+        active_effects = dict(engine.current_effects(user, now))
         
         if not active_effects:
             await ctx.send(embed=error_embed(
@@ -748,4 +502,4 @@ class Farming(commands.Cog):
         await ctx.send(embed=embed)
 
 async def setup(bot):
-    await bot.add_cog(Farming(bot)) 
\ No newline at end of file
+    await bot.add_cog(Farming(bot))
\ No newline at end of file
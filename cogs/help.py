@@ -1,14 +1,19 @@
 import discord
 from discord.ext import commands
 from config import Colors
+from utils.embeds import embed_cache
 
 class Help(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    @commands.command(name="farmhelp", aliases=["fhelp"])
+    @commands.hybrid_command(name="farmhelp", aliases=["fhelp"])
     async def farm_help(self, ctx):
         """Shows all available farming commands and their usage"""
+        await ctx.send(embed=embed_cache.get("help", self.build_help_embed))
+
+    def build_help_embed(self) -> discord.Embed:
+        """Build the help page"""
         embed = discord.Embed(
             title="🌾 Farming Bot Commands",
             description="Here are all the available commands:",
@@ -26,7 +31,9 @@ class Help(commands.Cog):
             "  Example: `!plant grassland all`\n"
             "`!plant all` - Plant all seeds in preferred biome\n"
             "`!garden [biome]` - View your gardens or a specific biome\n"
-            "`!harvest [biome]` - Harvest all ready crops or from specific biome"
+            "`!harvest [biome]` - Harvest all ready crops or from specific biome\n"
+            "`!harvest all` - Harvest every unlocked biome at once\n"
+            "`!harvest <biome|all> replant` - Harvest, then replant the same seeds"
         )
         embed.add_field(
             name="🌱 Basic Commands",
@@ -73,6 +80,7 @@ class Help(commands.Cog):
             "`!use <item>` - Use an item from your inventory\n"
             "  Example: `!use watering_can`\n"
             "`!effects` - View your active effects\n"
+            "`!notify [dm|here|off]` - Get pinged when a garden is fully grown\n"
         )
         embed.add_field(
             name="🎒 Items & Effects",
@@ -105,7 +113,7 @@ class Help(commands.Cog):
         )
 
         embed.set_footer(text="Use !farmhelp or !fhelp to see this message again")
-        await ctx.send(embed=embed)
+        return embed
 
 async def setup(bot):
     await bot.add_cog(Help(bot)) 
\ No newline at end of file
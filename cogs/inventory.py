@@ -1,21 +1,25 @@
 import discord
+from discord import app_commands
 from discord.ext import commands
-from utils.database import load_data, save_data, get_user_data
-from config import CropConfig, MutationConfig, EmojiConfig, ItemConfig
+import engine
+from engine import GameError
+from utils.database import claim_user, load_data, save_data, read_user, unpinned
+from config import EmojiConfig, GameConstants
+from config.snapshot import get_snapshot
 from utils.embeds import error_embed, success_embed, confirmation_embed
+from utils.views import ConfirmView
 
 class Inventory(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    @commands.command(name="inventory", aliases=["inv"])
-    async def inventory(self, ctx, user: discord.Member = None):
+    @commands.hybrid_command(name="inventory", aliases=["inv"])
+    async def inventory(self, ctx, user: discord.User = None):
         """Check your or another user's inventory"""
         target_user = user or ctx.author
-        user_id = str(target_user.id)
-        data = load_data()
+        user_data = await read_user(str(target_user.id))
 
-        if user_id not in data["users"]:
+        if user_data is None:
             description = (f"{target_user.mention} hasn't farmed yet!" 
                         if user else "You haven't farmed yet! Use `!roll` to get started.")
             await ctx.send(embed=error_embed(
@@ -24,7 +28,7 @@ class Inventory(commands.Cog):
             ))
             return
 
-        user_data = data["users"][user_id]
+        config = get_snapshot()
         crops = user_data["inventory"]
         seeds = user_data["seeds"]
         balance = user_data.get("balance", 0)
@@ -40,13 +44,10 @@ class Inventory(commands.Cog):
         )
         
         # Items Section
-        if "items" not in user_data:
-            user_data["items"] = {}
-        
         items_lines = []
-        for item_name, quantity in user_data["items"].items():
-            if item_name in ItemConfig.ITEMS:
-                item = ItemConfig.ITEMS[item_name]
+        for item_name, quantity in user_data.get("items", {}).items():
+            if item_name in config.items:
+                item = config.items[item_name]
                 items_lines.append(
                     f"{item['emoji']} {item['name']}: {quantity}\n"
                     f"└ {item['description']}"
@@ -64,19 +65,19 @@ class Inventory(commands.Cog):
             # Handle old inventory structure
             if isinstance(data, int):
                 if data > 0:
-                    crop_lines.append(f"{EmojiConfig.EMOJI_MAP[crop]} {crop.title()}: {data} (${CropConfig.PRICES[crop]}/ea)")
+                    crop_lines.append(f"{EmojiConfig.EMOJI_MAP[crop]} {crop.title()}: {data} (${config.prices[crop]}/ea)")
             else:
                 # Handle normal crops
                 if data["amount"] > 0:
-                    crop_lines.append(f"{EmojiConfig.EMOJI_MAP[crop]} {crop.title()}: {data['amount']} (${CropConfig.PRICES[crop]}/ea)")
+                    crop_lines.append(f"{EmojiConfig.EMOJI_MAP[crop]} {crop.title()}: {data['amount']} (${config.prices[crop]}/ea)")
                 
                 # Handle mutations
                 if "mutations" in data:
                     for mutation, amount in data["mutations"].items():
                         if amount > 0:
-                            price = CropConfig.PRICES[crop] * MutationConfig.MUTATIONS[mutation]["price_multiplier"]
+                            price = config.prices[crop] * config.mutations[mutation]["price_multiplier"]
                             crop_lines.append(
-                                f"{MutationConfig.MUTATIONS[mutation]['emoji']} {mutation.title()} {crop.title()}: {amount} (${price}/ea)"
+                                f"{config.mutations[mutation]['emoji']} {mutation.title()} {crop.title()}: {amount} (${price}/ea)"
                             )
         
         embed.add_field(
@@ -99,11 +100,12 @@ class Inventory(commands.Cog):
         embed.set_thumbnail(url=target_user.display_avatar.url)
         await ctx.send(embed=embed)
 
-    @commands.command()
-    async def sell(self, ctx, *, args=None):
+    @commands.hybrid_command()
+    @app_commands.describe(args="Crop to sell, e.g. wheat, wheat 5 or wheat:golden 5. Leave empty to sell everything")
+    async def sell(self, ctx, *, args: str = None):
         """Handle selling of crops"""
         user_id = str(ctx.author.id)
-        data = load_data()
+        data = await load_data(user_id)
         
         if user_id not in data["users"]:
             await ctx.send(embed=error_embed(
@@ -117,42 +119,23 @@ class Inventory(commands.Cog):
         else:
             await self.sell_specific(ctx, data, args)
 
+    def format_sale_line(self, crop: str, mutation: str, amount: int, value: int) -> str:
+        if mutation:
+            return f"{get_snapshot().mutations[mutation]['emoji']} {mutation.title()} {crop.title()}: {amount} (${value:,})"
+        return f"{EmojiConfig.EMOJI_MAP[crop]} {crop.title()}: {amount} (${value:,})"
+
     async def sell_all(self, ctx, data):
         """Sell all crops"""
         user_id = str(ctx.author.id)
         user = data["users"][user_id]
         
-        # Calculate total value including mutations
-        total = 0
-        sale_summary = []
-        
-        for crop, crop_data in user["inventory"].items():
-            if crop not in CropConfig.PRICES:
-                continue
-                
-            # Handle old inventory structure
-            if isinstance(crop_data, int):
-                if crop_data > 0:
-                    value = crop_data * CropConfig.PRICES[crop]
-                    total += value
-                    sale_summary.append(f"{EmojiConfig.EMOJI_MAP[crop]} {crop.title()}: {crop_data} (${value:,})")
-            else:
-                # Normal crops
-                if crop_data["amount"] > 0:
-                    value = crop_data["amount"] * CropConfig.PRICES[crop]
-                    total += value
-                    sale_summary.append(f"{EmojiConfig.EMOJI_MAP[crop]} {crop.title()}: {crop_data['amount']} (${value:,})")
-                
-                # Mutated crops
-                if "mutations" in crop_data:
-                    for mutation, amount in crop_data["mutations"].items():
-                        if amount > 0:
-                            mut_price = CropConfig.PRICES[crop] * MutationConfig.MUTATIONS[mutation]["price_multiplier"]
-                            value = amount * mut_price
-                            total += value
-                            sale_summary.append(
-                                f"{MutationConfig.MUTATIONS[mutation]['emoji']} {mutation.title()} {crop.title()}: {amount} (${value:,})"
-                            )
+        # Price everything now; the confirmation only holds this quote
+        quote = engine.sale_quote(user, get_snapshot())
+        total = sum(amount * unit_price for _, _, amount, unit_price in quote)
+        sale_summary = [
+            self.format_sale_line(crop, mutation, amount, amount * unit_price)
+            for crop, mutation, amount, unit_price in quote
+        ]
         
         if total == 0:
             await ctx.send(embed=error_embed(
@@ -161,52 +144,51 @@ class Inventory(commands.Cog):
             ))
             return
 
-        # Confirmation embed
-        confirm_msg = await ctx.send(embed=confirmation_embed(
+        # Confirmation embed with buttons only the seller can press
+        view = ConfirmView(ctx.author.id, timeout=GameConstants.CONFIRMATION_TIMEOUT)
+        view.message = await ctx.send(embed=confirmation_embed(
             "⚠️ Confirm Bulk Sale",
             f"Are you sure you want to sell **ALL** crops?\n\n**Sale Summary:**\n" + "\n".join(sale_summary),
             total
-        ))
-        await confirm_msg.add_reaction("✅")
-        await confirm_msg.add_reaction("❌")
-
-        def check(reaction, user):
-            return user == ctx.author and str(reaction.emoji) in ["✅", "❌"]
+        ), view=view)
 
-        try:
-            reaction, _ = await self.bot.wait_for("reaction_add", timeout=30.0, check=check)
-            
-            if str(reaction.emoji) == "✅":
-                # Reset inventory and add balance
-                for crop in user["inventory"]:
-                    if isinstance(user["inventory"][crop], int):
-                        user["inventory"][crop] = 0
-                    else:
-                        user["inventory"][crop] = {
-                            "amount": 0,
-                            "mutations": {}
-                        }
-                user["balance"] += total
-                save_data(data)
-                
-                await ctx.send(embed=success_embed(
-                    "💰 Bulk Sale Complete!",
-                    f"Successfully sold all crops!\n\n**Sale Summary:**\n" + 
-                    "\n".join(sale_summary) +
-                    f"\n\n**Total Earned:** ${total:,}\n**New Balance:** ${user['balance']:,}"
-                ))
-                
-            else:
-                await ctx.send(embed=error_embed(
-                    "🚫 Sale Canceled",
-                    "Your crops remain in your inventory."
-                ))
-
-        except TimeoutError:
+        # Another shard may take the farm over while the player decides
+        async with unpinned(user_id):
+            timed_out = await view.wait()
+        if timed_out:
             await ctx.send(embed=error_embed(
                 "⏳ Sale Expired",
-                "Confirmation timed out after 30 seconds."
+                f"Confirmation timed out after {GameConstants.CONFIRMATION_TIMEOUT} seconds."
+            ))
+            return
+
+        if not view.confirmed:
+            await ctx.send(embed=error_embed(
+                "🚫 Sale Canceled",
+                "Your crops remain in your inventory."
             ))
+            return
+
+        if not await claim_user(user_id):
+            await ctx.send("⚠️ Your farm is busy on another shard. Please try again in a moment.")
+            return
+
+        # Re-read the current state; crops sold or spent meanwhile are not sold twice
+        data = await load_data(user_id)
+        user = data["users"][user_id]
+        try:
+            result = engine.sell_all(user, quote)
+        except GameError as e:
+            await ctx.send(embed=error_embed(e.title, e.message))
+            return
+        await save_data(data)
+        
+        await ctx.send(embed=success_embed(
+            "💰 Bulk Sale Complete!",
+            f"Successfully sold all crops!\n\n**Sale Summary:**\n" + 
+            "\n".join(self.format_sale_line(*line) for line in result.lines) +
+            f"\n\n**Total Earned:** ${result.total:,}\n**New Balance:** ${result.balance:,}"
+        ))
 
     async def sell_specific(self, ctx, data, args):
         """Sell specific crops"""
@@ -218,73 +200,28 @@ class Inventory(commands.Cog):
             if len(args) not in [1, 2]:
                 raise ValueError
             
-            crop = args[0].lower()
-            mutation = None
-            
-            # Check if selling a specific mutation
-            if ":" in crop:
-                crop, mutation = crop.split(":", 1)
-                if mutation not in MutationConfig.MUTATIONS:
-                    await ctx.send(embed=error_embed(
-                        "❌ Invalid Mutation",
-                        "That mutation type doesn't exist!"
-                    ))
-                    return
-            
-            if crop not in CropConfig.PRICES:
-                await ctx.send(embed=error_embed(
-                    "❌ Invalid Crop",
-                    f"That's not a sellable crop!\n\nAvailable Crops:\n{', '.join(CropConfig.PRICES.keys())}"
-                ))
-                return
-                
-            # Get available amount based on mutation
-            if mutation:
-                available = user["inventory"].get(crop, {}).get("mutations", {}).get(mutation, 0)
-            else:
-                available = user["inventory"].get(crop, {}).get("amount", 0)
-            
-            amount = int(args[1]) if len(args) == 2 else available
-                
-            if amount <= 0:
-                await ctx.send(embed=error_embed(
-                    "❌ Invalid Amount",
-                    "Amount must be a positive number!"
-                ))
-                return
-                
-            if available < amount:
-                await ctx.send(embed=error_embed(
-                    "❌ Insufficient Quantity",
-                    f"You only have {available} {mutation + ' ' if mutation else ''}{crop}!"
-                ))
-                return
-
-            # Calculate value with mutation multiplier
-            base_value = CropConfig.PRICES[crop]
-            if mutation:
-                base_value *= MutationConfig.MUTATIONS[mutation]["price_multiplier"]
-            value = amount * base_value
-
-            # Process sale
-            if mutation:
-                user["inventory"][crop]["mutations"][mutation] -= amount
-            else:
-                user["inventory"][crop]["amount"] -= amount
-            user["balance"] += value
-            save_data(data)
-
-            await ctx.send(embed=success_embed(
-                "💰 Sale Complete!",
-                f"Successfully sold {amount} {mutation + ' ' if mutation else ''}{crop}!\n\n" +
-                f"**Earned:** ${value:,}\n**New Balance:** ${user['balance']:,}"
-            ))
-
+            # "crop:mutation" sells a specific mutation
+            crop, _, mutation = args[0].lower().partition(":")
+            amount = int(args[1]) if len(args) == 2 else None
         except (ValueError, IndexError):
             await ctx.send(embed=error_embed(
                 "❌ Invalid Format",
                 "**Usage:**\n`!sell <crop> [amount]` - Sell normal crops\n`!sell <crop:mutation> [amount]` - Sell mutated crops"
             ))
+            return
+
+        try:
+            result = engine.sell(user, crop, mutation or None, amount, get_snapshot())
+        except GameError as e:
+            await ctx.send(embed=error_embed(e.title, e.message))
+            return
+        await save_data(data)
+
+        await ctx.send(embed=success_embed(
+            "💰 Sale Complete!",
+            f"Successfully sold {result.lines[0][2]} {mutation + ' ' if mutation else ''}{crop}!\n\n" +
+            f"**Earned:** ${result.total:,}\n**New Balance:** ${result.balance:,}"
+        ))
 
 async def setup(bot):
     await bot.add_cog(Inventory(bot)) 
\ No newline at end of file
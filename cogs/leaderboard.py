@@ -1,17 +1,18 @@
 import discord
 from discord.ext import commands
-from utils.database import load_data
+from utils.database import read_users
 from utils.views import LeaderboardView
 
 class Leaderboard(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    @commands.command()
+    @commands.hybrid_command()
     async def leaderboard(self, ctx):
         """View the richest farmers"""
-        data = load_data()
-        users = data["users"]
+        # Sorting every user and fetching names takes a while; acknowledge slash commands first
+        await ctx.defer()
+        users = await read_users(["balance"])
 
         sorted_users = sorted(
             users.items(),
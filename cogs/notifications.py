@@ -0,0 +1,211 @@
+import asyncio
+import heapq
+import time
+import discord
+import engine
+from discord.ext import commands
+from utils.database import get_store, load_data, save_data, get_user_data, read_user, read_users
+from config.snapshot import get_snapshot
+from utils.embeds import error_embed, success_embed
+from utils.outbox import NOTIFICATION
+from utils.readonly import ReadOnlyView
+
+class Notifications(commands.Cog):
+    """Opt-in "your crops are ready" pings.
+
+    One background task serves every user from a heap keyed on the time each
+    biome becomes fully ready, so nobody needs to poll !garden. With several
+    processes each one only notifies the users it owns.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.heap = []  # (ready_at, user_id, biome)
+        self.scheduled = {}  # (user_id, biome) -> ready_at of the live heap entry
+        self.wakeup = asyncio.Event()
+        self.task = None
+
+    async def cog_load(self):
+        self.store = get_store()
+        self.store.ownership_listeners.append(self.ownership_changed)
+        self.task = asyncio.create_task(self.run())
+
+    async def cog_unload(self):
+        self.store.ownership_listeners.remove(self.ownership_changed)
+        if self.task:
+            self.task.cancel()
+
+    def ownership_changed(self, user_ids, owned: bool):
+        """Pick up users handed to this process and drop the ones handed away"""
+        for user_id in user_ids:
+            if not owned:
+                self.untrack(user_id)
+                continue
+            # Handoffs only happen with leases, where the record is local
+            user = get_store().peek(user_id)
+            if user is not None:
+                self.track(user_id, ReadOnlyView(user))
+
+    def track(self, user_id: str, user: dict, biome: str = None):
+        """Schedule (or reschedule) ready notifications for a user's biomes"""
+        if not user.get("notify") or get_store().owned_elsewhere(user_id):
+            return  # Another process notifies users it owns
+        now = time.time()
+        biomes = [biome] if biome else list(user["plantings"])
+        for biome_name in biomes:
+            key = (user_id, biome_name)
+            ready_at = engine.biome_ready_time(user, biome_name, now)
+            if ready_at is None:
+                # Empty biome; any heap entry left behind is ignored as stale
+                self.scheduled.pop(key, None)
+                continue
+            if self.scheduled.get(key) == ready_at:
+                continue
+            self.scheduled[key] = ready_at
+            heapq.heappush(self.heap, (ready_at, user_id, biome_name))
+            if self.heap[0][0] == ready_at:
+                self.wakeup.set()
+
+    def untrack(self, user_id: str):
+        for key in [key for key in self.scheduled if key[0] == user_id]:
+            del self.scheduled[key]
+
+    async def rebuild(self):
+        """Schedule every opted-in user this process owns, e.g. after a restart"""
+        store = get_store()
+        for user_id, user in (await read_users()).items():
+            if user.get("notify") and store.owns(user_id):
+                self.track(user_id, user)
+
+    async def run(self):
+        await self.bot.wait_until_ready()
+        try:
+            await self.rebuild()
+        except Exception as e:
+            print(f"Error scheduling notifications: {e}")
+
+        while True:
+            timeout = max(0, self.heap[0][0] - time.time()) if self.heap else None
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+
+            try:
+                await self.deliver_due()
+            except Exception as e:
+                print(f"Error sending notifications: {e}")
+
+    async def deliver_due(self):
+        """Pop every due biome and send one message per user"""
+        now = time.time()
+        due = {}
+        while self.heap and self.heap[0][0] <= now:
+            ready_at, user_id, biome = heapq.heappop(self.heap)
+            if self.scheduled.get((user_id, biome)) != ready_at:
+                continue  # Replanted, harvested or rescheduled since
+            del self.scheduled[(user_id, biome)]
+            due.setdefault(user_id, []).append(biome)
+
+        if not due:
+            return
+
+        store = get_store()
+        sends = []
+        for user_id, biomes in due.items():
+            if store.owned_elsewhere(user_id):
+                self.untrack(user_id)
+                continue
+            user = await read_user(user_id)
+            if user is None or not user.get("notify"):
+                continue
+
+            ready = []
+            for biome in biomes:
+                # Effects may have changed since scheduling; check again
+                ready_at = engine.biome_ready_time(user, biome, now)
+                if ready_at is None:
+                    continue
+                if ready_at > now + 0.5:
+                    self.track(user_id, user, biome)
+                else:
+                    ready.append(biome)
+
+            if ready:
+                sends.append(self.send_notification(user_id, user["notify"], ready))
+
+        # Queued together, so the outbox can merge the ones going to the same channel
+        await asyncio.gather(*sends)
+
+    async def send_notification(self, user_id: str, settings: dict, biomes: list):
+        lines = "\n".join(
+            f"{get_snapshot().biomes[biome]['emoji']} {biome.title()} - `!harvest {biome}`" for biome in biomes
+        )
+        embed = success_embed(
+            "🌾 Crops Ready!",
+            f"Everything in these gardens is ready to harvest:\n{lines}"
+        )
+        try:
+            if settings.get("mode") == "channel":
+                channel = self.bot.get_channel(settings["channel_id"])
+                if channel is not None:
+                    await self.send(channel, f"<@{user_id}>", embed)
+            else:
+                target = await self.bot.user_lookup.get(user_id)
+                if target is not None:
+                    await self.send(target, None, embed)
+        except discord.HTTPException as e:
+            print(f"Error notifying user {user_id}: {e}")
+
+    async def send(self, target, content, embed):
+        # Queued behind interactive replies when the outbox is on
+        if self.bot.outbox is not None:
+            await self.bot.outbox.send(target, content, embed=embed, priority=NOTIFICATION)
+        else:
+            await target.send(content=content, embed=embed)
+
+    @commands.hybrid_command()
+    async def notify(self, ctx, mode: str = None):
+        """Get pinged when a garden is fully grown"""
+        mode = (mode or "dm").lower()
+        if mode not in ("dm", "here", "off"):
+            await ctx.send(embed=error_embed(
+                "❌ Invalid Option",
+                "**Usage:** `!notify [dm|here|off]`\n"
+                "`dm` - Get a direct message (default)\n"
+                "`here` - Get pinged in this channel\n"
+                "`off` - Stop notifications"
+            ))
+            return
+
+        user_id = str(ctx.author.id)
+        data = await load_data(user_id)
+        user = get_user_data(user_id, data)
+
+        if mode == "off":
+            user.pop("notify", None)
+            await save_data(data)
+            self.untrack(user_id)
+            await ctx.send(embed=success_embed(
+                "🔕 Notifications Off",
+                "You won't be notified about ready crops anymore."
+            ))
+            return
+
+        if mode == "here":
+            user["notify"] = {"mode": "channel", "channel_id": ctx.channel.id}
+            where = f"in {ctx.channel.mention}" if hasattr(ctx.channel, "mention") else "here"
+        else:
+            user["notify"] = {"mode": "dm"}
+            where = "by direct message"
+        await save_data(data)
+        self.track(user_id, user)
+
+        await ctx.send(embed=success_embed(
+            "🔔 Notifications On",
+            f"You'll be notified {where} when a garden is fully grown."
+        ))
+
+async def setup(bot):
+    await bot.add_cog(Notifications(bot))
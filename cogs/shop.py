@@ -1,42 +1,74 @@
 import discord
 from discord.ext import commands
-from utils.database import load_data, save_data, get_user_data
-from config import ShopConfig, BiomeConfig, GameConstants, ItemConfig
-from utils.embeds import error_embed, success_embed
+import engine
+from engine import GameError
+from utils.database import load_data, save_data, get_user_data, read_user_data
+from config import ShopConfig, GameConstants
+from config.snapshot import get_snapshot
+from utils.embeds import error_embed, success_embed, embed_cache
 
 class Shop(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    @commands.command()
+    def build_main_page(self) -> discord.Embed:
+        """Build the main shop page"""
+        embed = discord.Embed(
+            title=f"{ShopConfig.PAGES['main']['emoji']} {ShopConfig.PAGES['main']['name']}",
+            description=ShopConfig.PAGES['main']['description'],
+            color=ShopConfig.PAGES['main']['color']
+        )
+        
+        # Add category fields
+        for category, info in ShopConfig.PAGES.items():
+            if category != "main":
+                embed.add_field(
+                    name=f"{info['emoji']} {info['name']}",
+                    value=f"`!shop {category}` - {info['description']}",
+                    inline=False
+                )
+        return embed
+
+    def build_items_page(self) -> discord.Embed:
+        """Build the items shop page with an {owned} placeholder per item"""
+        embed = discord.Embed(
+            title=f"{ShopConfig.PAGES['items']['emoji']} {ShopConfig.PAGES['items']['name']}",
+            description=ShopConfig.PAGES['items']['description'],
+            color=ShopConfig.PAGES['items']['color']
+        )
+        
+        for item_id, item in get_snapshot().items.items():
+            embed.add_field(
+                name=f"{item['emoji']} {item['shop_name']} (${item['price']:,})",
+                value=(
+                    f"{item['description']}\n"
+                    f"Duration: {item['effect']['duration']}s\n"
+                    "Owned: {owned}\n"
+                    f"Buy: `!buy item {item_id}`"
+                ),
+                inline=False
+            )
+        return embed
+
+    def items_page(self, user) -> discord.Embed:
+        """The items shop page with the user's owned counts filled in"""
+        embed = embed_cache.get("shop_items", self.build_items_page)
+        for index, (field, item_id) in enumerate(zip(embed.fields, get_snapshot().items)):
+            owned = user.get("items", {}).get(item_id, 0)
+            embed.set_field_at(
+                index,
+                name=field.name,
+                value=field.value.replace("{owned}", str(owned)),
+                inline=field.inline
+            )
+        return embed
+
+    @commands.hybrid_command()
     async def shop(self, ctx, page: str = None, biome: str = None):
         """Access the shop"""
-        user_id = str(ctx.author.id)
-        data = load_data()
-        user = get_user_data(user_id, data)
-
-        # Initialize items inventory if it doesn't exist
-        if "items" not in user:
-            user["items"] = {}
-
-        # Main shop page
+        # Main shop page is the same for everyone, so it never touches storage
         if not page:
-            embed = discord.Embed(
-                title=f"{ShopConfig.PAGES['main']['emoji']} {ShopConfig.PAGES['main']['name']}",
-                description=ShopConfig.PAGES['main']['description'],
-                color=ShopConfig.PAGES['main']['color']
-            )
-            
-            # Add category fields
-            for category, info in ShopConfig.PAGES.items():
-                if category != "main":
-                    embed.add_field(
-                        name=f"{info['emoji']} {info['name']}",
-                        value=f"`!shop {category}` - {info['description']}",
-                        inline=False
-                    )
-            
-            await ctx.send(embed=embed)
+            await ctx.send(embed=embed_cache.get("shop_main", self.build_main_page))
             return
 
         # Validate page
@@ -48,28 +80,12 @@ class Shop(commands.Cog):
             ))
             return
 
-        # Items shop page
+        user = await read_user_data(str(ctx.author.id))
+        config = get_snapshot()
+
+        # Items shop page: cached template plus the user's owned counts
         if page == "items":
-            embed = discord.Embed(
-                title=f"{ShopConfig.PAGES['items']['emoji']} {ShopConfig.PAGES['items']['name']}",
-                description=ShopConfig.PAGES['items']['description'],
-                color=ShopConfig.PAGES['items']['color']
-            )
-            
-            for item_id, item in ItemConfig.ITEMS.items():
-                owned = user["items"].get(item_id, 0)
-                embed.add_field(
-                    name=f"{item['emoji']} {item['shop_name']} (${item['price']:,})",
-                    value=(
-                        f"{item['description']}\n"
-                        f"Duration: {item['effect']['duration']}s\n"
-                        f"Owned: {owned}\n"
-                        f"Buy: `!buy item {item_id}`"
-                    ),
-                    inline=False
-                )
-            
-            await ctx.send(embed=embed)
+            await ctx.send(embed=self.items_page(user))
             return
 
         # Biomes shop page
@@ -77,14 +93,14 @@ class Shop(commands.Cog):
             if biome:
                 # Show specific biome shop
                 biome = biome.lower()
-                if biome not in BiomeConfig.BIOMES:
+                if biome not in config.biomes:
                     await ctx.send(embed=error_embed(
                         "❌ Invalid Biome",
                         "That biome doesn't exist!"
                     ))
                     return
 
-                biome_data = BiomeConfig.BIOMES[biome]
+                biome_data = config.biomes[biome]
                 user_biome = user["biomes"][biome]
 
                 if not user_biome["unlocked"]:
@@ -96,10 +112,7 @@ class Shop(commands.Cog):
 
                 # Calculate next capacity upgrade cost
                 current_capacity = user_biome["capacity"]
-                base_cost = biome_data["capacity_upgrade_base_cost"]
-                multiplier = biome_data["capacity_upgrade_multiplier"]
-                upgrades_purchased = current_capacity - GameConstants.MAX_PLANTER_CAPACITY
-                next_upgrade_cost = int(base_cost * (multiplier ** upgrades_purchased))
+                next_upgrade_cost = config.capacity_upgrade_cost(biome, current_capacity, GameConstants.MAX_PLANTER_CAPACITY)
 
                 embed = discord.Embed(
                     title=f"{biome_data['emoji']} {biome.title()} Shop",
@@ -131,7 +144,7 @@ class Shop(commands.Cog):
                     color=ShopConfig.PAGES['biomes']['color']
                 )
 
-                for biome_name, biome_data in BiomeConfig.BIOMES.items():
+                for biome_name, biome_data in config.biomes.items():
                     if biome_name == "grassland":
                         status = "🔓 Unlocked"
                         value = f"`!shop biomes {biome_name}` to view upgrades"
@@ -152,17 +165,9 @@ class Shop(commands.Cog):
 
             await ctx.send(embed=embed)
 
-    @commands.command()
+    @commands.hybrid_command()
     async def buy(self, ctx, category: str = None, item: str = None):
         """Buy items and upgrades"""
-        user_id = str(ctx.author.id)
-        data = load_data()
-        user = get_user_data(user_id, data)
-
-        # Initialize items inventory if it doesn't exist
-        if "items" not in user:
-            user["items"] = {}
-
         if not category:
             await ctx.send(embed=error_embed(
                 "❌ Missing Arguments",
@@ -173,136 +178,63 @@ class Shop(commands.Cog):
             ))
             return
 
-        # Handle item purchases
-        if category.lower() == "item":
-            if not item:
-                await ctx.send(embed=error_embed(
-                    "❌ Missing Item",
-                    "Please specify which item to buy!\nUse `!shop items` to see available items."
-                ))
-                return
-
-            item = item.lower()
-            if item not in ItemConfig.ITEMS:
-                await ctx.send(embed=error_embed(
-                    "❌ Invalid Item",
-                    "That item doesn't exist!\nUse `!shop items` to see available items."
-                ))
-                return
+        if category.lower() == "item" and not item:
+            await ctx.send(embed=error_embed(
+                "❌ Missing Item",
+                "Please specify which item to buy!\nUse `!shop items` to see available items."
+            ))
+            return
 
-            item_data = ItemConfig.ITEMS[item]
-            cost = item_data["price"]
+        if category.lower() != "item" and item and item.lower() != "capacity":
+            await ctx.send(embed=error_embed(
+                "❌ Invalid Item",
+                "That item doesn't exist!"
+            ))
+            return
 
-            if user["balance"] < cost:
-                await ctx.send(embed=error_embed(
-                    "❌ Insufficient Funds",
-                    f"You need ${cost:,} to buy this item!\nYou have: ${user['balance']:,}"
-                ))
-                return
+        user_id = str(ctx.author.id)
+        data = await load_data(user_id)
+        user = get_user_data(user_id, data)
+        config = get_snapshot()
 
-            # Process purchase
-            user["balance"] -= cost
-            # Get quantity from shop name (e.g., "x5" -> 5)
-            quantity = 1
-            if "x" in item_data["shop_name"]:
-                quantity = int(item_data["shop_name"].split("x")[1].split()[0])
-            user["items"][item] = user["items"].get(item, 0) + quantity
-            save_data(data)
+        try:
+            if category.lower() == "item":
+                result = engine.buy_item(user, item, config)
+            elif item:
+                result = engine.upgrade_capacity(user, category, config)
+            else:
+                result = engine.unlock_biome(user, category, config)
+        except GameError as e:
+            await ctx.send(embed=error_embed(e.title, e.message))
+            return
+        await save_data(data)
 
+        if result.kind == "item":
+            item_data = config.items[result.target]
             await ctx.send(embed=success_embed(
                 f"{item_data['emoji']} Item Purchased!",
                 f"You bought {item_data['shop_name']}!\n\n"
-                f"**Balance:** ${user['balance']:,}\n"
+                f"**Balance:** ${result.balance:,}\n"
                 f"**Effect:** {item_data['description']}\n"
                 f"**Duration:** {item_data['effect']['duration']} seconds\n\n"
                 "Use `!use <item_name>` to use this item!"
             ))
-            return
-
-        # Handle biome purchases
-        biome = category.lower()
-        if biome not in BiomeConfig.BIOMES:
-            await ctx.send(embed=error_embed(
-                "❌ Invalid Biome",
-                "That biome doesn't exist!"
-            ))
-            return
-
-        biome_data = BiomeConfig.BIOMES[biome]
-        user_biome = user["biomes"][biome]
-
-        # Buying biome unlock
-        if not item:
-            if user_biome["unlocked"]:
-                await ctx.send(embed=error_embed(
-                    "❌ Already Unlocked",
-                    f"You've already unlocked the {biome} biome!\nUse `!shop biomes {biome}` to view upgrades."
-                ))
-                return
-
-            cost = biome_data["unlock_cost"]
-            if user["balance"] < cost:
-                await ctx.send(embed=error_embed(
-                    "❌ Insufficient Funds",
-                    f"You need ${cost:,} to unlock this biome!\nYou have: ${user['balance']:,}"
-                ))
-                return
-
-            # Process purchase
-            user["balance"] -= cost
-            user_biome["unlocked"] = True
-            save_data(data)
-
+        elif result.kind == "biome":
+            biome = result.target
             await ctx.send(embed=success_embed(
-                f"{biome_data['emoji']} Biome Unlocked!",
+                f"{config.biomes[biome]['emoji']} Biome Unlocked!",
                 f"You've unlocked the {biome} biome!\n\n" +
-                f"**Balance:** ${user['balance']:,}\n" +
+                f"**Balance:** ${result.balance:,}\n" +
                 f"**Next Steps:** Use `!shop biomes {biome}` to view upgrades"
             ))
-
-        # Buying capacity upgrade
-        elif item.lower() == "capacity":
-            if not user_biome["unlocked"]:
-                await ctx.send(embed=error_embed(
-                    "❌ Biome Locked",
-                    f"You need to unlock this biome first!\nUse `!buy {biome}` to unlock."
-                ))
-                return
-
-            # Calculate upgrade cost
-            current_capacity = user_biome["capacity"]
-            base_cost = biome_data["capacity_upgrade_base_cost"]
-            multiplier = biome_data["capacity_upgrade_multiplier"]
-            upgrades_purchased = current_capacity - GameConstants.MAX_PLANTER_CAPACITY
-            cost = int(base_cost * (multiplier ** upgrades_purchased))
-
-            if user["balance"] < cost:
-                await ctx.send(embed=error_embed(
-                    "❌ Insufficient Funds",
-                    f"You need ${cost:,} to upgrade capacity!\nYou have: ${user['balance']:,}"
-                ))
-                return
-
-            # Process purchase
-            user["balance"] -= cost
-            user_biome["capacity"] += 1
-            save_data(data)
-
-            # Calculate next upgrade cost
-            next_cost = int(base_cost * (multiplier ** (upgrades_purchased + 1)))
-
+        else:
+            biome = result.target
             await ctx.send(embed=success_embed(
-                f"{biome_data['emoji']} Capacity Upgraded!",
+                f"{config.biomes[biome]['emoji']} Capacity Upgraded!",
                 f"Your {biome} garden capacity has been increased!\n\n" +
-                f"**New Capacity:** {user_biome['capacity']} plots\n" +
-                f"**Balance:** ${user['balance']:,}\n" +
-                f"**Next Upgrade Cost:** ${next_cost:,}"
-            ))
-
-        else:
-            await ctx.send(embed=error_embed(
-                "❌ Invalid Item",
-                "That item doesn't exist!"
+                f"**New Capacity:** {result.capacity} plots\n" +
+                f"**Balance:** ${result.balance:,}\n" +
+                f"**Next Upgrade Cost:** ${result.next_cost:,}"
             ))
 
 async def setup(bot):
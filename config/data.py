@@ -14,6 +14,18 @@ class DataConfig:
     # Farm data file
     FARM_DATA_FILE = DATA_DIR / "farm_data.json"
     
+    # Shared rate limit and cooldown database (used when FARMER_SHARED_LIMITER is set)
+    LIMITER_DB_FILE = DATA_DIR / "limiter.db"
+    
+    # User ownership leases shared by processes in a sharded deployment
+    LEASE_DB_FILE = DATA_DIR / "leases.db"
+    
+    # Optional game value overrides, applied at startup and by !reloadconfig
+    GAME_CONFIG_FILE = DATA_DIR / "game_config.json"
+    
+    # Default socket of the standalone storage service
+    STORAGE_SOCKET = DATA_DIR / "storage.sock"
+    
     # Default user data structure
     @staticmethod
     def get_default_user_data():
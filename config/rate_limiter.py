@@ -1,6 +1,10 @@
+import asyncio
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import sqlite3
 import time
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 class RateLimiter:
     def __init__(self, max_commands: int = 10, time_window: int = 5, timeout_duration: int = 30):
@@ -9,8 +13,9 @@ class RateLimiter:
         self.timeout_duration = timeout_duration
         self.command_history: Dict[int, List[float]] = defaultdict(list)
         self.timeouts: Dict[int, float] = {}
+        self.cooldowns: Dict[Tuple[int, str], float] = {}
 
-    def is_rate_limited(self, user_id: int) -> bool:
+    async def is_rate_limited(self, user_id: int) -> bool:
         current_time = time.time()
         
         # Check if user is in timeout
@@ -38,8 +43,183 @@ class RateLimiter:
 
         return False
 
-    def get_timeout_remaining(self, user_id: int) -> float:
+    async def get_timeout_remaining(self, user_id: int) -> float:
         if user_id in self.timeouts:
             remaining = self.timeouts[user_id] - time.time()
             return max(0, remaining)
-        return 0 
\ No newline at end of file
+        return 0
+
+    async def check_cooldown(self, user_id: int, command: str, duration: float) -> float:
+        """Start a command cooldown if none is running.
+
+        Returns 0 when the command is allowed, otherwise the seconds remaining.
+        """
+        current_time = time.time()
+        key = (int(user_id), command)
+        until = self.cooldowns.get(key, 0)
+        if current_time < until:
+            return until - current_time
+        self.cooldowns[key] = current_time + duration
+        return 0
+
+    async def clear_cooldown(self, user_id: int, command: str):
+        """End a cooldown early, e.g. when the command it was started for failed"""
+        self.cooldowns.pop((int(user_id), command), None)
+
+class SharedRateLimiter:
+    """Rate limiter backed by a SQLite database in WAL mode.
+
+    Every bot process on the host points at the same database file, so rate
+    limits and command cooldowns stay global across shards and processes.
+    Lookups only touch the small limiter tables, never the farm data.
+
+    Queries run on a dedicated thread so waiting for another process's lock
+    never blocks the event loop. If the database stays locked past
+    BUSY_TIMEOUT the check fails open and the command is allowed.
+    """
+
+    # Sweep stale rows of idle users every this many calls
+    CLEANUP_INTERVAL = 1000
+    BUSY_TIMEOUT = 0.5
+
+    def __init__(self, db_path, max_commands: int = 10, time_window: int = 5, timeout_duration: int = 30):
+        self.max_commands = max_commands
+        self.time_window = time_window
+        self.timeout_duration = timeout_duration
+        self.calls = 0
+
+        db_path = Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode; every check runs in its own BEGIN IMMEDIATE transaction
+        self.conn = sqlite3.connect(str(db_path), timeout=self.BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+        # One thread, so queries on the shared connection never interleave
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rate-limiter")
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS command_history (
+                user_id INTEGER NOT NULL,
+                ts REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS command_history_user ON command_history (user_id, ts);
+            CREATE TABLE IF NOT EXISTS timeouts (
+                user_id INTEGER PRIMARY KEY,
+                until REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS cooldowns (
+                user_id INTEGER NOT NULL,
+                command TEXT NOT NULL,
+                until REAL NOT NULL,
+                PRIMARY KEY (user_id, command)
+            );
+        """)
+
+    async def run(self, query, *args, default):
+        """Run a query method on the limiter thread, returning `default` if the database is busy"""
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, query, *args)
+        except sqlite3.OperationalError as e:
+            print(f"Rate limiter database unavailable, allowing command: {e}")
+            return default
+
+    async def is_rate_limited(self, user_id: int) -> bool:
+        return await self.run(self._is_rate_limited, user_id, default=False)
+
+    async def get_timeout_remaining(self, user_id: int) -> float:
+        return await self.run(self._get_timeout_remaining, user_id, default=0)
+
+    async def check_cooldown(self, user_id: int, command: str, duration: float) -> float:
+        """Start a command cooldown if none is running.
+
+        Returns 0 when the command is allowed, otherwise the seconds remaining.
+        """
+        return await self.run(self._check_cooldown, user_id, command, duration, default=0)
+
+    async def clear_cooldown(self, user_id: int, command: str):
+        """End a cooldown early, e.g. when the command it was started for failed"""
+        await self.run(self._clear_cooldown, user_id, command, default=None)
+
+    def _is_rate_limited(self, user_id: int) -> bool:
+        current_time = time.time()
+        user_id = int(user_id)
+        cur = self.conn.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            # Check if user is in timeout
+            row = cur.execute("SELECT until FROM timeouts WHERE user_id = ?", (user_id,)).fetchone()
+            if row is not None:
+                if current_time < row[0]:
+                    limited = True
+                else:
+                    cur.execute("DELETE FROM timeouts WHERE user_id = ?", (user_id,))
+                    cur.execute("DELETE FROM command_history WHERE user_id = ?", (user_id,))
+                    limited = False
+            else:
+                # Clean old commands outside the time window, then add the current one
+                cur.execute(
+                    "DELETE FROM command_history WHERE user_id = ? AND ts < ?",
+                    (user_id, current_time - self.time_window)
+                )
+                cur.execute("INSERT INTO command_history (user_id, ts) VALUES (?, ?)", (user_id, current_time))
+                count = cur.execute(
+                    "SELECT COUNT(*) FROM command_history WHERE user_id = ?", (user_id,)
+                ).fetchone()[0]
+
+                # Check if user has exceeded rate limit
+                limited = count > self.max_commands
+                if limited:
+                    cur.execute(
+                        "INSERT OR REPLACE INTO timeouts (user_id, until) VALUES (?, ?)",
+                        (user_id, current_time + self.timeout_duration)
+                    )
+            cur.execute("COMMIT")
+        except Exception:
+            cur.execute("ROLLBACK")
+            raise
+
+        self.calls += 1
+        if self.calls % self.CLEANUP_INTERVAL == 0:
+            self.cleanup(current_time)
+        return limited
+
+    def _get_timeout_remaining(self, user_id: int) -> float:
+        row = self.conn.execute("SELECT until FROM timeouts WHERE user_id = ?", (int(user_id),)).fetchone()
+        if row is not None:
+            return max(0, row[0] - time.time())
+        return 0
+
+    def _check_cooldown(self, user_id: int, command: str, duration: float) -> float:
+        current_time = time.time()
+        cur = self.conn.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            row = cur.execute(
+                "SELECT until FROM cooldowns WHERE user_id = ? AND command = ?",
+                (int(user_id), command)
+            ).fetchone()
+            if row is not None and current_time < row[0]:
+                remaining = row[0] - current_time
+            else:
+                cur.execute(
+                    "INSERT OR REPLACE INTO cooldowns (user_id, command, until) VALUES (?, ?, ?)",
+                    (int(user_id), command, current_time + duration)
+                )
+                remaining = 0
+            cur.execute("COMMIT")
+        except Exception:
+            cur.execute("ROLLBACK")
+            raise
+        return remaining
+
+    def _clear_cooldown(self, user_id: int, command: str):
+        self.conn.execute("DELETE FROM cooldowns WHERE user_id = ? AND command = ?", (int(user_id), command))
+
+    def cleanup(self, now: float = None):
+        """Remove history, timeouts and cooldowns that can no longer apply"""
+        now = now or time.time()
+        try:
+            self.conn.execute("DELETE FROM command_history WHERE ts < ?", (now - self.time_window,))
+            self.conn.execute("DELETE FROM timeouts WHERE until < ?", (now,))
+            self.conn.execute("DELETE FROM cooldowns WHERE until < ?", (now,))
+        except sqlite3.Error as e:
+            print(f"Error cleaning up rate limiter: {e}")
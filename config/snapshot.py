@@ -0,0 +1,199 @@
+"""
+Game configuration snapshots for The Farmer.
+A snapshot bundles the tunable game values (prices, chances, biome costs...)
+with the lookup tables derived from them. Commands grab the current snapshot
+once and use it throughout, so a config reload never changes values under a
+command that is already running.
+"""
+
+import copy
+import json
+from bisect import bisect_left
+from .config import BiomeConfig, CropConfig, EmojiConfig, ItemConfig, MutationConfig, SeedConfig
+from .data import DataConfig
+
+# Config attributes that can be changed without a restart
+RELOADABLE = {
+    "BiomeConfig": (BiomeConfig, ["BIOMES"]),
+    "SeedConfig": (SeedConfig, ["SEEDS", "PLANT_TIMES"]),
+    "CropConfig": (CropConfig, ["CROPS", "PRICES"]),
+    "MutationConfig": (MutationConfig, ["MUTATIONS"]),
+    "ItemConfig": (ItemConfig, ["ITEMS"])
+}
+
+# Built-in values, used as the base that the override file is applied on
+DEFAULTS = {
+    name: {attr: copy.deepcopy(getattr(cls, attr)) for attr in attrs}
+    for name, (cls, attrs) in RELOADABLE.items()
+}
+
+class GameSnapshot:
+    """Immutable bundle of game values and derived lookup tables"""
+
+    def __init__(self, values: dict, version: int = 1):
+        self.version = version
+        self.values = values
+
+        self.biomes = values["BiomeConfig"]["BIOMES"]
+        self.seeds = values["SeedConfig"]["SEEDS"]
+        self.plant_times = values["SeedConfig"]["PLANT_TIMES"]
+        self.crops = values["CropConfig"]["CROPS"]
+        self.prices = values["CropConfig"]["PRICES"]
+        self.mutations = values["MutationConfig"]["MUTATIONS"]
+        self.items = values["ItemConfig"]["ITEMS"]
+
+        # Seed roll sampler: cumulative chance per tier, searched with bisect
+        self.seed_tiers = list(self.seeds)
+        self.seed_cumulative = []
+        cumulative = 0
+        for tier in self.seed_tiers:
+            cumulative += self.seeds[tier]["chance"]
+            self.seed_cumulative.append(cumulative)
+
+        # Seeds from rarest to most common, used by "plant all"
+        self.seeds_by_rarity = [
+            seed for tier in reversed(self.seed_tiers) for seed in self.seeds[tier]["seeds"]
+        ]
+
+        # Crop -> tier lookup for harvest yields
+        self.crop_tiers = {
+            crop: tier for tier, values in self.crops.items() for crop in values["crops"]
+        }
+
+        # Bundle size of each item (e.g. "x5 Watering Can" -> 5)
+        self.item_quantities = {}
+        for item_id, item in self.items.items():
+            quantity = 1
+            if "x" in item["shop_name"]:
+                quantity = int(item["shop_name"].split("x")[1].split()[0])
+            self.item_quantities[item_id] = quantity
+
+    def seed_tier_for_roll(self, roll: float) -> str:
+        """Get the seed tier for a (luck adjusted) roll between 0 and 100+"""
+        index = bisect_left(self.seed_cumulative, roll)
+        # Rolls past the last tier (due to high luck) land in the rarest tier
+        return self.seed_tiers[min(index, len(self.seed_tiers) - 1)]
+
+    def crop_tier(self, crop: str) -> str:
+        return self.crop_tiers.get(crop, "common")
+
+    def capacity_upgrade_cost(self, biome: str, current_capacity: int, base_capacity: int) -> int:
+        """Cost of the next capacity upgrade for a biome"""
+        biome_data = self.biomes[biome]
+        upgrades_purchased = current_capacity - base_capacity
+        return int(biome_data["capacity_upgrade_base_cost"] * (biome_data["capacity_upgrade_multiplier"] ** upgrades_purchased))
+
+def merge_values(base: dict, overrides: dict) -> dict:
+    """Deep merge overrides into a copy of base (lists and scalars are replaced)"""
+    merged = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_values(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+def validate_values(values: dict, current: dict = None):
+    """Check game values for mistakes, raising ValueError with every problem found.
+
+    `current` is the values in use; a reload may not add or remove biomes.
+    """
+    problems = []
+    seeds = values["SeedConfig"]["SEEDS"]
+    plant_times = values["SeedConfig"]["PLANT_TIMES"]
+    crops = values["CropConfig"]["CROPS"]
+    prices = values["CropConfig"]["PRICES"]
+
+    if not seeds:
+        problems.append("SeedConfig.SEEDS is empty")
+    total_chance = sum(tier.get("chance", 0) for tier in seeds.values())
+    if abs(total_chance - 100) > 0.001:
+        problems.append(f"Seed tier chances add up to {total_chance}, not 100")
+    for tier, tier_data in seeds.items():
+        if tier_data.get("chance", 0) < 0:
+            problems.append(f"Seed tier {tier} has a negative chance")
+        for seed in tier_data.get("seeds", []):
+            if seed not in plant_times:
+                problems.append(f"Seed {seed} has no plant time")
+            if seed not in EmojiConfig.EMOJI_MAP:
+                problems.append(f"Seed {seed} has no emoji")
+            if seed.replace("_seed", "") not in prices:
+                problems.append(f"Seed {seed} grows a crop without a price")
+    for seed, duration in plant_times.items():
+        if not isinstance(duration, (int, float)) or duration <= 0:
+            problems.append(f"Plant time of {seed} must be a positive number")
+
+    for tier, tier_data in crops.items():
+        if tier_data.get("base_yield", 0) < 0:
+            problems.append(f"Crop tier {tier} has a negative base yield")
+        for crop in tier_data.get("crops", []):
+            if crop not in prices:
+                problems.append(f"Crop {crop} has no price")
+            if crop not in EmojiConfig.EMOJI_MAP:
+                problems.append(f"Crop {crop} has no emoji")
+    for crop, price in prices.items():
+        if not isinstance(price, (int, float)) or price < 0:
+            problems.append(f"Price of {crop} must be a non-negative number")
+
+    biomes = values["BiomeConfig"]["BIOMES"]
+    if current is not None:
+        # Every user record has an entry per biome, so the set of biomes is fixed
+        old_biomes = current["BiomeConfig"]["BIOMES"]
+        for biome in biomes.keys() - old_biomes.keys():
+            problems.append(f"Biome {biome} can't be added; existing farms have no record of it")
+        for biome in old_biomes.keys() - biomes.keys():
+            problems.append(f"Biome {biome} can't be removed")
+    for biome, biome_data in biomes.items():
+        for key in ("unlock_cost", "capacity_upgrade_base_cost", "capacity"):
+            if biome_data.get(key, 0) < 0:
+                problems.append(f"Biome {biome} has a negative {key}")
+        if biome_data.get("capacity_upgrade_multiplier", 1) < 1:
+            problems.append(f"Biome {biome} capacity_upgrade_multiplier must be at least 1")
+
+    for mutation, mutation_data in values["MutationConfig"]["MUTATIONS"].items():
+        if not 0 <= mutation_data.get("chance", 0) <= 100:
+            problems.append(f"Mutation {mutation} chance must be between 0 and 100")
+
+    for item_id, item in values["ItemConfig"]["ITEMS"].items():
+        if item.get("price", 0) < 0:
+            problems.append(f"Item {item_id} has a negative price")
+        if item.get("effect", {}).get("duration", 0) <= 0:
+            problems.append(f"Item {item_id} effect duration must be positive")
+
+    if problems:
+        raise ValueError("\n".join(problems))
+
+def load_values() -> dict:
+    """Get the built-in game values with the override file applied"""
+    values = DEFAULTS
+    if DataConfig.GAME_CONFIG_FILE.exists():
+        with open(DataConfig.GAME_CONFIG_FILE, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+        unknown = [name for name in overrides if name not in RELOADABLE]
+        if unknown:
+            raise ValueError(f"Unknown config sections: {', '.join(unknown)}")
+        values = merge_values(DEFAULTS, overrides)
+    return copy.deepcopy(values)
+
+_snapshot = GameSnapshot(copy.deepcopy(DEFAULTS))
+
+def get_snapshot() -> GameSnapshot:
+    """Get the current game config snapshot"""
+    return _snapshot
+
+def reload_config() -> GameSnapshot:
+    """Reload game values from the override file and swap in a new snapshot.
+
+    Raises ValueError (leaving the current config untouched) if the new values are invalid.
+    """
+    global _snapshot
+    values = load_values()
+    validate_values(values, _snapshot.values)
+    snapshot = GameSnapshot(values, _snapshot.version + 1)
+
+    # Swap everything in one step; nothing awaits in between
+    for name, (cls, attrs) in RELOADABLE.items():
+        for attr in attrs:
+            setattr(cls, attr, values[name][attr])
+    _snapshot = snapshot
+    return snapshot
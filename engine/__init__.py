@@ -0,0 +1,127 @@
+"""
+Game engine for The Farmer.
+The game rules as plain functions over user records: rolling, planting,
+harvesting, selling, buying, using items and upgrading skills. Nothing here
+imports discord, loads or saves data or formats embeds, so the same rules
+serve the cogs, benchmarks and bulk simulations.
+
+Operations change the user record they are given and return a result object.
+When a rule stops an operation they raise GameError and leave the record as
+it was.
+"""
+
+from .errors import GameError
+from .results import (
+    RollResult,
+    PlantResult,
+    HarvestResult,
+    SaleResult,
+    PurchaseResult,
+    ItemResult,
+    UpgradeResult,
+    CompactionResult
+)
+from .effects import (
+    active_effects,
+    current_effects,
+    luck_factor,
+    growth_speed_multiplier,
+    has_active_fertilizer,
+    yield_multiplier,
+    xp_gain
+)
+from .growth import (
+    growth_timeline,
+    growth_progress
+)
+from .ripening import (
+    ripen_index,
+    ripen_times,
+    ready_count,
+    next_ready_time,
+    biome_ready_time,
+    pop_ready
+)
+from .farming import (
+    check_biome,
+    open_biomes,
+    roll_seed,
+    roll,
+    plant,
+    plant_all,
+    harvest_biome,
+    replant,
+    harvest
+)
+from .market import (
+    sale_quote,
+    apply_sale_quote,
+    sell_all,
+    sell,
+    buy_item,
+    unlock_biome,
+    upgrade_capacity,
+    upgrade_skill
+)
+from .items import use_item
+from .compaction import compact_user
+from .skills import (
+    SKILLS,
+    SKILL_SHORTCUTS,
+    resolve_skill,
+    skill_level,
+    skill_effect,
+    upgrade_cost
+)
+
+__all__ = [
+    'GameError',
+    'RollResult',
+    'PlantResult',
+    'HarvestResult',
+    'SaleResult',
+    'PurchaseResult',
+    'ItemResult',
+    'UpgradeResult',
+    'CompactionResult',
+    'active_effects',
+    'current_effects',
+    'luck_factor',
+    'growth_speed_multiplier',
+    'has_active_fertilizer',
+    'yield_multiplier',
+    'growth_timeline',
+    'growth_progress',
+    'ripen_index',
+    'ripen_times',
+    'ready_count',
+    'next_ready_time',
+    'biome_ready_time',
+    'pop_ready',
+    'xp_gain',
+    'check_biome',
+    'open_biomes',
+    'roll_seed',
+    'roll',
+    'plant',
+    'plant_all',
+    'harvest_biome',
+    'replant',
+    'harvest',
+    'sale_quote',
+    'apply_sale_quote',
+    'sell_all',
+    'sell',
+    'buy_item',
+    'unlock_biome',
+    'upgrade_capacity',
+    'use_item',
+    'compact_user',
+    'SKILLS',
+    'SKILL_SHORTCUTS',
+    'resolve_skill',
+    'skill_level',
+    'skill_effect',
+    'upgrade_cost',
+    'upgrade_skill'
+]
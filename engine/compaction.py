@@ -0,0 +1,68 @@
+"""
+Pruning stale entries from user records.
+"""
+
+import json
+from config.snapshot import get_snapshot
+from .growth import prune_timeline
+from .results import CompactionResult
+
+def entry_size(key, value) -> int:
+    """Bytes a dict entry takes in the data file"""
+    return len(json.dumps(key)) + len(json.dumps(value)) + 2
+
+def prune(entries: dict, stale) -> tuple:
+    """Delete entries for which stale(key, value) is true, returning (count, bytes)"""
+    keys = [key for key, value in entries.items() if stale(key, value)]
+    size = sum(entry_size(key, entries[key]) for key in keys)
+    for key in keys:
+        del entries[key]
+    return len(keys), size
+
+def compact_user(user: dict, now: float, config=None) -> CompactionResult:
+    """Remove expired effects, zero mutations and items and plantings of seeds that no longer exist.
+
+    Crops still stored as a bare count are converted to the current format.
+    """
+    config = config or get_snapshot()
+    removed = 0
+    normalized = 0
+    reclaimed = 0
+
+    for entries, stale in (
+        (user.get("active_effects"), lambda _, effect: now > effect["end_time"]),
+        (user.get("items"), lambda _, quantity: quantity <= 0)
+    ):
+        if entries:
+            count, size = prune(entries, stale)
+            removed += count
+            reclaimed += size
+
+    for crop, crop_data in user.get("inventory", {}).items():
+        if isinstance(crop_data, int):
+            user["inventory"][crop] = {"amount": crop_data, "mutations": {}}
+            normalized += 1
+        elif crop_data.get("mutations"):
+            count, size = prune(crop_data["mutations"], lambda _, amount: amount <= 0)
+            removed += count
+            reclaimed += size
+
+    # Plantings of removed seeds can never be harvested or shown
+    for biome, plantings in user.get("plantings", {}).items():
+        count, size = prune(plantings, lambda _, planting: planting.get("seed_type") not in config.plant_times)
+        removed += count
+        reclaimed += size
+        if count:
+            user.get("ripening", {}).pop(biome, None)  # Rebuilt on next use
+
+    # Growth segments from before the oldest planting are never read again
+    timeline = user.get("growth")
+    if timeline:
+        starts = [planting["start_time"] for plantings in user.get("plantings", {}).values() for planting in plantings.values()]
+        size = len(json.dumps(timeline))
+        count = prune_timeline(timeline, min(starts, default=now))
+        if count:
+            removed += count
+            reclaimed += size - len(json.dumps(timeline))
+
+    return CompactionResult(removed, normalized, reclaimed)
@@ -0,0 +1,62 @@
+"""
+Active effects and the multipliers derived from effects and skills.
+"""
+
+from config.snapshot import get_snapshot
+from config import GameConstants
+from .skills import skill_effect
+
+def active_effects(user: dict, now: float) -> dict:
+    """Get a user's active effects, removing expired ones"""
+    if "active_effects" not in user:
+        user["active_effects"] = {}
+
+    effects = user["active_effects"]
+    expired = [effect_id for effect_id, effect in effects.items() if now > effect["end_time"]]
+    for effect_id in expired:
+        del effects[effect_id]
+    return effects
+
+def current_effects(user: dict, now: float):
+    """Yield (effect_id, effect) for a user's unexpired effects without changing the record"""
+    for effect_id, effect in user.get("active_effects", {}).items():
+        if now <= effect["end_time"]:
+            yield effect_id, effect
+
+def luck_factor(user: dict, now: float) -> float:
+    """Roll luck from the roll_luck skill and luck boosts"""
+    factor = GameConstants.BASE_LUCK_FACTOR * (1 + skill_effect(user, "roll_luck"))
+    for _, effect in current_effects(user, now):
+        if effect["type"] == "luck_boost":
+            factor *= effect["multiplier"]
+    return factor
+
+def growth_speed_multiplier(user: dict, now: float) -> float:
+    """Growth speed from the grow_rate skill, replaced by a faster growth effect"""
+    multiplier = 1 + skill_effect(user, "grow_rate")
+    for _, effect in current_effects(user, now):
+        if effect["type"] == "growth_speed":
+            multiplier = max(multiplier, effect["multiplier"])
+            break
+    return multiplier
+
+def has_active_fertilizer(user: dict, now: float) -> bool:
+    return any(effect["type"] == "yield_boost" for _, effect in current_effects(user, now))
+
+def yield_multiplier(user: dict, now: float, is_fertilized: bool = False, config=None) -> float:
+    """Yield from the crop_yield skill, fertilizer at planting time and active yield boosts"""
+    config = config or get_snapshot()
+    multiplier = 1 + skill_effect(user, "crop_yield")
+
+    # Crops planted while fertilized keep the fertilizer bonus
+    if is_fertilized:
+        multiplier *= config.items["fertilizer"]["effect"]["multiplier"]
+
+    for _, effect in current_effects(user, now):
+        if effect["type"] == "yield_boost":
+            multiplier *= effect["multiplier"]
+    return multiplier
+
+def xp_gain(user: dict, seed_amount: int) -> float:
+    """XP for harvesting `seed_amount` planted seeds"""
+    return (1.0 + skill_effect(user, "xp_per_harvest")) * seed_amount
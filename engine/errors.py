@@ -0,0 +1,12 @@
+class GameError(Exception):
+    """A game rule stopped an operation; the user record was not changed.
+
+    `code` identifies the rule for programs, `title` and `message` are the
+    text shown to players.
+    """
+
+    def __init__(self, code: str, title: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.title = title
+        self.message = message
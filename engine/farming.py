@@ -0,0 +1,262 @@
+"""
+Rolling, planting and harvesting.
+"""
+
+import random
+from config.snapshot import get_snapshot
+from .effects import (
+    has_active_fertilizer,
+    luck_factor,
+    xp_gain,
+    yield_multiplier
+)
+from .errors import GameError
+from .results import HarvestResult, PlantResult, RollResult
+from .ripening import index_plantings, pop_ready
+
+def invalid_biome_error(config) -> GameError:
+    return GameError(
+        "invalid_biome",
+        "❌ Invalid Biome",
+        f"Available biomes:\n" +
+        "\n".join([f"{config.biomes[b]['emoji']} {b}" for b in config.biomes])
+    )
+
+def check_biome(user: dict, biome: str, config=None) -> str:
+    """Check that a biome exists and is unlocked, returning its normalized name"""
+    config = config or get_snapshot()
+    biome = biome.lower()
+    if biome not in config.biomes:
+        raise invalid_biome_error(config)
+    if not user["biomes"][biome]["unlocked"] and biome != "grassland":
+        raise GameError(
+            "biome_locked",
+            "🔒 Biome Locked",
+            f"You haven't unlocked the {biome} biome yet!\nUse `!shop biomes` to view unlock costs."
+        )
+    return biome
+
+def open_biomes(user: dict, config=None) -> list:
+    """Biomes a user can farm in"""
+    config = config or get_snapshot()
+    return [b for b in config.biomes if user["biomes"][b]["unlocked"] or b == "grassland"]
+
+def new_planting_ids(plantings: dict, now: float, count: int):
+    """Yield `count` planting IDs that aren't used in a biome yet"""
+    base = int(now * 1000)
+    index = 0
+    while count > 0:
+        planting_id = f"{base}-{index}"
+        index += 1
+        if planting_id not in plantings:
+            yield planting_id
+            count -= 1
+
+def add_plantings(user: dict, biome: str, seed_type: str, count: int, now: float, is_fertilized: bool, config):
+    plantings = user["plantings"][biome]
+    duration = config.plant_times[seed_type]
+    planting_ids = list(new_planting_ids(plantings, now, count))
+    for planting_id in planting_ids:
+        plantings[planting_id] = {
+            "seed_type": seed_type,
+            "start_time": now,
+            "duration": duration,
+            "amount": 1,
+            "is_fertilized": is_fertilized  # Mark if planted during fertilizer effect
+        }
+    index_plantings(user, biome, planting_ids, now, duration, now)
+
+def roll_seed(user: dict, now: float, config=None, rng=random):
+    """Pick a seed by rarity tier, with the user's luck raising the roll.
+
+    Returns (seed, tier).
+    """
+    config = config or get_snapshot()
+    roll = rng.uniform(0, 100) * luck_factor(user, now)
+    tier = config.seed_tier_for_roll(roll)
+    return rng.choice(config.seeds[tier]["seeds"]), tier
+
+def roll(user: dict, now: float, config=None, rng=random) -> RollResult:
+    """Roll a seed and add it to the user's seeds"""
+    seed, tier = roll_seed(user, now, config, rng)
+    user["last_rolled"] = now
+    user["seeds"][seed] = user["seeds"].get(seed, 0) + 1
+    return RollResult(seed, 1, tier)
+
+def plant(user: dict, biome: str, seed_type: str, amount: int, now: float, config=None) -> PlantResult:
+    """Plant up to `amount` seeds of one type (None = as many as fit)"""
+    config = config or get_snapshot()
+    biome = check_biome(user, biome, config)
+
+    if seed_type not in config.plant_times:
+        raise GameError(
+            "invalid_seed",
+            "❌ Invalid Seed Type",
+            f"`{seed_type.replace('_seed', '')}` isn't a plantable seed!"
+        )
+
+    available_seeds = user["seeds"].get(seed_type, 0)
+    if available_seeds <= 0:
+        raise GameError(
+            "no_seeds",
+            "❌ No Seeds Available",
+            f"You don't have any {seed_type.replace('_seed', '')} seeds!"
+        )
+
+    if amount is not None and amount <= 0:
+        raise GameError(
+            "invalid_amount",
+            "❌ Invalid Planting",
+            "Can't plant 0 or negative seeds!"
+        )
+
+    plantings = user["plantings"][biome]
+    capacity = user["biomes"][biome]["capacity"]
+    free = capacity - len(plantings)
+    plant_amount = min(available_seeds, free) if amount is None else min(amount, available_seeds, free)
+    if plant_amount <= 0:
+        raise GameError(
+            "garden_full",
+            "❌ Garden Full",
+            f"Not enough space in your {biome} garden! (Capacity: {capacity}, Used: {len(plantings)})"
+        )
+
+    is_fertilized = has_active_fertilizer(user, now)
+    add_plantings(user, biome, seed_type, plant_amount, now, is_fertilized, config)
+    user["seeds"][seed_type] -= plant_amount
+    return PlantResult(biome, {seed_type: plant_amount}, len(plantings), capacity, free, is_fertilized)
+
+def plant_all(user: dict, biome: str, now: float, config=None) -> PlantResult:
+    """Fill a biome with every seed available, rarest seeds first"""
+    config = config or get_snapshot()
+    biome = check_biome(user, biome, config)
+    plantings = user["plantings"][biome]
+    capacity = user["biomes"][biome]["capacity"]
+    free = capacity - len(plantings)
+    if free <= 0:
+        raise GameError(
+            "garden_full",
+            "❌ No Space Available",
+            f"Your {biome} planters are full! Use `!harvest {biome}` to free up space."
+        )
+
+    is_fertilized = has_active_fertilizer(user, now)
+    planted = {}
+    spaces_left = free
+    for seed_type in config.seeds_by_rarity:
+        if spaces_left <= 0:
+            break
+        plant_amount = min(user["seeds"].get(seed_type, 0), spaces_left)
+        if plant_amount > 0:
+            add_plantings(user, biome, seed_type, plant_amount, now, is_fertilized, config)
+            user["seeds"][seed_type] -= plant_amount
+            planted[seed_type] = plant_amount
+            spaces_left -= plant_amount
+
+    if not planted:
+        raise GameError(
+            "no_seeds",
+            "❌ No Seeds Available",
+            "You don't have any seeds to plant!"
+        )
+    return PlantResult(biome, planted, len(plantings), capacity, free, is_fertilized)
+
+def harvest_biome(user: dict, biome: str, now: float, config=None):
+    """Harvest every ready planting in a biome.
+
+    Returns (harvested, xp) where harvested lists {"seed", "crop", "amount", "xp"} per planting.
+    """
+    config = config or get_snapshot()
+    plantings = user["plantings"][biome]
+    harvested = []
+    total_xp_gained = 0
+
+    # Initialize inventory if it doesn't exist
+    if "inventory" not in user:
+        user["inventory"] = {}
+
+    for planting_id in pop_ready(user, biome, now):
+        planting = plantings[planting_id]
+        seed_type = planting["seed_type"]
+        crop_type = seed_type.replace("_seed", "")
+        amount = planting["amount"]
+        base_yield = config.crops[config.crop_tier(crop_type)]["base_yield"]
+        final_yield = int(base_yield * amount * yield_multiplier(user, now, planting.get("is_fertilized", False), config))
+
+        # Initialize crop in inventory if it doesn't exist
+        if crop_type not in user["inventory"]:
+            user["inventory"][crop_type] = {"amount": 0, "mutations": {}}
+        elif isinstance(user["inventory"][crop_type], int):
+            # Convert old format to new format
+            user["inventory"][crop_type] = {"amount": user["inventory"][crop_type], "mutations": {}}
+        user["inventory"][crop_type]["amount"] += final_yield
+
+        # 1 XP per seed planted, not per crop harvested
+        xp_gained = xp_gain(user, amount)
+        user["xp"] = user.get("xp", 0) + xp_gained
+        total_xp_gained += xp_gained
+
+        harvested.append({
+            "seed": seed_type,
+            "crop": crop_type,
+            "amount": final_yield,
+            "xp": xp_gained
+        })
+        del plantings[planting_id]
+
+    return harvested, total_xp_gained
+
+def replant(user: dict, biome: str, seed_counts: dict, now: float, is_fertilized: bool, config=None) -> dict:
+    """Replant harvested seed types from the seed inventory, as far as seeds and space allow"""
+    config = config or get_snapshot()
+    plantings = user["plantings"][biome]
+    free = user["biomes"][biome]["capacity"] - len(plantings)
+    planted = {}
+    for seed_type, wanted in seed_counts.items():
+        if free <= 0:
+            break
+        if seed_type not in config.plant_times:
+            continue
+        amount = min(wanted, user["seeds"].get(seed_type, 0), free)
+        if amount > 0:
+            add_plantings(user, biome, seed_type, amount, now, is_fertilized, config)
+            user["seeds"][seed_type] -= amount
+            planted[seed_type] = amount
+            free -= amount
+    return planted
+
+def harvest(user: dict, biomes: list, now: float, replant_after: bool = False, config=None) -> HarvestResult:
+    """Harvest (and optionally replant) several biomes"""
+    config = config or get_snapshot()
+    if len(biomes) == 1:
+        biomes = [check_biome(user, biomes[0], config)]
+
+    is_fertilized = has_active_fertilizer(user, now)
+    crops = {}
+    replanted = {}
+    biome_counts = {}
+    total_xp_gained = 0
+    for biome in biomes:
+        harvested, xp_gained = harvest_biome(user, biome, now, config)
+        if not harvested:
+            continue
+        total_xp_gained += xp_gained
+        biome_counts[biome] = len(harvested)
+
+        seed_counts = {}
+        for item in harvested:
+            crops[item["crop"]] = crops.get(item["crop"], 0) + item["amount"]
+            seed_counts[item["seed"]] = seed_counts.get(item["seed"], 0) + 1
+
+        if replant_after:
+            for seed_type, amount in replant(user, biome, seed_counts, now, is_fertilized, config).items():
+                replanted[seed_type] = replanted.get(seed_type, 0) + amount
+
+    if not crops:
+        where = "any of your biomes" if len(biomes) > 1 else f"the {biomes[0]} biome"
+        raise GameError(
+            "nothing_to_harvest",
+            "🌱 Nothing to Harvest",
+            f"You don't have any ready crops in {where}!"
+        )
+    return HarvestResult(biomes, crops, biome_counts, replanted, total_xp_gained)
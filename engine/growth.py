@@ -0,0 +1,118 @@
+"""
+Growth over a user's effect timeline.
+Growth speed is piecewise constant: the grow_rate skill sets a base speed and
+growth effects raise it for their duration. user["growth"] records the speed
+segments and the growth done ("work") up to the start of each one:
+
+    {"starts": [t, ...], "bases": [1.05, ...], "boosts": [0, 1.5, ...], "work": [w, ...]}
+
+A segment runs from its start to the next one's at speed max(base, boost).
+Work at any time is a binary search plus one multiplication, so a planting's
+progress doesn't depend on when it is looked at, and the time a planting
+ripens can be computed as soon as it is planted.
+
+Segments are only ever changed from the present on, so the work done before
+now never changes once recorded.
+"""
+
+from bisect import bisect_right
+from .effects import current_effects
+from .skills import skill_effect
+
+def base_speed(user: dict) -> float:
+    return 1 + skill_effect(user, "grow_rate")
+
+def speed(timeline: dict, index: int) -> float:
+    return max(timeline["bases"][index], timeline["boosts"][index])
+
+def segment(timeline: dict, time: float) -> int:
+    return max(bisect_right(timeline["starts"], time) - 1, 0)
+
+def work_at(timeline: dict, time: float) -> float:
+    """Growth done from the start of the timeline to `time`"""
+    i = segment(timeline, time)
+    return timeline["work"][i] + (time - timeline["starts"][i]) * speed(timeline, i)
+
+def time_at(timeline: dict, work: float) -> float:
+    """When the growth done reaches `work`"""
+    i = max(bisect_right(timeline["work"], work) - 1, 0)
+    return timeline["starts"][i] + (work - timeline["work"][i]) / speed(timeline, i)
+
+def split(timeline: dict, time: float) -> int:
+    """Index of the segment starting at `time`, splitting the one it falls in"""
+    i = segment(timeline, time)
+    if timeline["starts"][i] == time:
+        return i
+    work = work_at(timeline, time)
+    i += 1
+    timeline["starts"].insert(i, time)
+    timeline["bases"].insert(i, timeline["bases"][i - 1])
+    timeline["boosts"].insert(i, timeline["boosts"][i - 1])
+    timeline["work"].insert(i, work)
+    return i
+
+def update_work(timeline: dict, first: int):
+    """Recompute the prefix sums from segment `first` on"""
+    starts, work = timeline["starts"], timeline["work"]
+    for i in range(max(first, 1), len(starts)):
+        work[i] = work[i - 1] + (starts[i] - starts[i - 1]) * speed(timeline, i - 1)
+
+def set_base(timeline: dict, start: float, base: float):
+    """Change the base speed from `start` on"""
+    i = split(timeline, start)
+    for j in range(i, len(timeline["starts"])):
+        timeline["bases"][j] = base
+    update_work(timeline, i + 1)
+
+def add_boost(timeline: dict, start: float, end: float, multiplier: float):
+    """Raise the speed to at least `multiplier` between `start` and `end`"""
+    i = split(timeline, start)
+    j = split(timeline, end)
+    for k in range(i, j):
+        timeline["boosts"][k] = max(timeline["boosts"][k], multiplier)
+    update_work(timeline, i + 1)
+
+def new_timeline(user: dict, now: float) -> dict:
+    """Timeline for a user that has none yet, from their skills and current effects"""
+    timeline = {"starts": [0.0], "bases": [base_speed(user)], "boosts": [0.0], "work": [0.0]}
+    for _, effect in current_effects(user, now):
+        if effect["type"] == "growth_speed":
+            add_boost(timeline, effect.get("start_time", now), effect["end_time"], effect["multiplier"])
+    return timeline
+
+def growth_timeline(user: dict, now: float) -> dict:
+    """A user's growth timeline, created or brought up to date with their skills"""
+    timeline = user.get("growth")
+    if timeline is None:
+        timeline = new_timeline(user, now)
+    elif timeline["bases"][-1] != base_speed(user):
+        if not isinstance(timeline, dict):
+            # Read-only views (query commands) update a copy
+            timeline = {key: list(values) for key, values in timeline.items()}
+        set_base(timeline, now, base_speed(user))
+    else:
+        return timeline
+    if isinstance(user, dict):
+        user["growth"] = timeline
+    return timeline
+
+def start_growth_effect(user: dict, effect: dict, now: float):
+    """Record a growth effect that was just started"""
+    add_boost(growth_timeline(user, now), effect["start_time"], effect["end_time"], effect["multiplier"])
+
+def ripen_key(timeline: dict, planting: dict) -> float:
+    """Work at which a planting ripens"""
+    return work_at(timeline, planting["start_time"]) + planting["duration"]
+
+def growth_progress(user: dict, planting: dict, now: float) -> float:
+    """Fraction of a planting's growth done (1.0 or more is ready)"""
+    timeline = growth_timeline(user, now)
+    done = work_at(timeline, now) - work_at(timeline, planting["start_time"])
+    return done / planting["duration"]
+
+def prune_timeline(timeline: dict, before: float) -> int:
+    """Drop segments that ended before `before`, returning how many were dropped"""
+    count = segment(timeline, before)
+    for values in timeline.values():
+        del values[:count]
+    return count
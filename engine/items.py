@@ -0,0 +1,49 @@
+"""
+Using items.
+"""
+
+import uuid
+from config.snapshot import get_snapshot
+from .effects import active_effects
+from .growth import start_growth_effect
+from .errors import GameError
+from .results import ItemResult
+
+def use_item(user: dict, item_id: str, now: float, config=None, effect_id: str = None) -> ItemResult:
+    """Use one of a user's items, starting its effect"""
+    config = config or get_snapshot()
+    item_id = item_id.lower().replace(" ", "_")
+    if item_id not in config.items:
+        raise GameError(
+            "invalid_item",
+            "❌ Invalid Item",
+            f"That item doesn't exist! Use `!shop items` to see available items."
+        )
+
+    items = user.setdefault("items", {})
+    if items.get(item_id, 0) <= 0:
+        raise GameError(
+            "no_item",
+            "❌ No Item",
+            f"You don't have any {config.items[item_id]['name']}!"
+        )
+
+    item = config.items[item_id]
+    effect_id = effect_id or str(uuid.uuid4())
+    effect = {
+        "type": item["effect"]["type"],
+        "multiplier": item["effect"]["multiplier"],
+        "start_time": now,
+        "end_time": now + item["effect"]["duration"],
+        "name": item["name"],
+        "emoji": item["emoji"]
+    }
+    # Drop expired effects while the record is being written anyway
+    active_effects(user, now)[effect_id] = effect
+    if effect["type"] == "growth_speed":
+        start_growth_effect(user, effect, now)
+
+    items[item_id] -= 1
+    if items[item_id] <= 0:
+        del items[item_id]
+    return ItemResult(item_id, effect_id, effect)
@@ -0,0 +1,221 @@
+"""
+Selling crops, buying items, biomes and capacity and spending XP on skills.
+"""
+
+from config import GameConstants
+from config.snapshot import get_snapshot
+from .errors import GameError
+from .growth import growth_timeline
+from .results import PurchaseResult, SaleResult, UpgradeResult
+from .skills import SKILLS, skill_effect, upgrade_cost
+
+def sale_quote(user: dict, config=None) -> list:
+    """Price every crop in the inventory as (crop, mutation, amount, unit_price) lines"""
+    config = config or get_snapshot()
+    quote = []
+    for crop, crop_data in user["inventory"].items():
+        if crop not in config.prices:
+            continue
+
+        # Handle old inventory structure
+        if isinstance(crop_data, int):
+            if crop_data > 0:
+                quote.append((crop, None, crop_data, config.prices[crop]))
+            continue
+
+        if crop_data["amount"] > 0:
+            quote.append((crop, None, crop_data["amount"], config.prices[crop]))
+
+        for mutation, amount in crop_data.get("mutations", {}).items():
+            if amount > 0 and mutation in config.mutations:
+                mut_price = config.prices[crop] * config.mutations[mutation]["price_multiplier"]
+                quote.append((crop, mutation, amount, mut_price))
+    return quote
+
+def apply_sale_quote(user: dict, quote: list):
+    """Remove up to the quoted amounts from the user's current inventory.
+
+    Returns (total, lines) with (crop, mutation, amount, value) per line sold,
+    valued at the quoted prices. The balance is not changed.
+    """
+    total = 0
+    lines = []
+    for crop, mutation, amount, unit_price in quote:
+        crop_data = user["inventory"].get(crop)
+        if crop_data is None:
+            continue
+        if isinstance(crop_data, int):
+            sold = min(amount, crop_data)
+            user["inventory"][crop] = crop_data - sold
+        elif mutation:
+            sold = min(amount, crop_data.get("mutations", {}).get(mutation, 0))
+            if sold > 0:
+                crop_data["mutations"][mutation] -= sold
+        else:
+            sold = min(amount, crop_data["amount"])
+            crop_data["amount"] -= sold
+        if sold > 0:
+            value = sold * unit_price
+            total += value
+            lines.append((crop, mutation, sold, value))
+    return total, lines
+
+def sell_all(user: dict, quote: list) -> SaleResult:
+    """Sell what is left of a quote from the user's inventory"""
+    total, lines = apply_sale_quote(user, quote)
+    if total == 0:
+        raise GameError(
+            "nothing_to_sell",
+            "🚫 Empty Inventory",
+            "The quoted crops are no longer in your inventory."
+        )
+    user["balance"] += total
+    return SaleResult(lines, total, user["balance"])
+
+def sell(user: dict, crop: str, mutation: str = None, amount: int = None, config=None) -> SaleResult:
+    """Sell `amount` of one crop (None = all of it), optionally of one mutation"""
+    config = config or get_snapshot()
+    if mutation and mutation not in config.mutations:
+        raise GameError(
+            "invalid_mutation",
+            "❌ Invalid Mutation",
+            "That mutation type doesn't exist!"
+        )
+
+    if crop not in config.prices:
+        raise GameError(
+            "invalid_crop",
+            "❌ Invalid Crop",
+            f"That's not a sellable crop!\n\nAvailable Crops:\n{', '.join(config.prices.keys())}"
+        )
+
+    if mutation:
+        available = user["inventory"].get(crop, {}).get("mutations", {}).get(mutation, 0)
+    else:
+        available = user["inventory"].get(crop, {}).get("amount", 0)
+    if amount is None:
+        amount = available
+
+    if amount <= 0:
+        raise GameError(
+            "invalid_amount",
+            "❌ Invalid Amount",
+            "Amount must be a positive number!"
+        )
+    if available < amount:
+        raise GameError(
+            "insufficient_crops",
+            "❌ Insufficient Quantity",
+            f"You only have {available} {mutation + ' ' if mutation else ''}{crop}!"
+        )
+
+    unit_price = config.prices[crop]
+    if mutation:
+        unit_price *= config.mutations[mutation]["price_multiplier"]
+        user["inventory"][crop]["mutations"][mutation] -= amount
+    else:
+        user["inventory"][crop]["amount"] -= amount
+    value = amount * unit_price
+    user["balance"] += value
+    return SaleResult([(crop, mutation, amount, value)], value, user["balance"])
+
+def charge(user: dict, cost: int, what: str):
+    if user["balance"] < cost:
+        raise GameError(
+            "insufficient_funds",
+            "❌ Insufficient Funds",
+            f"You need ${cost:,} to {what}!\nYou have: ${user['balance']:,}"
+        )
+    user["balance"] -= cost
+
+def buy_item(user: dict, item_id: str, config=None) -> PurchaseResult:
+    """Buy one shop bundle of an item"""
+    config = config or get_snapshot()
+    item_id = item_id.lower()
+    if item_id not in config.items:
+        raise GameError(
+            "invalid_item",
+            "❌ Invalid Item",
+            "That item doesn't exist!\nUse `!shop items` to see available items."
+        )
+
+    cost = config.items[item_id]["price"]
+    charge(user, cost, "buy this item")
+    quantity = config.item_quantities[item_id]
+    user.setdefault("items", {})
+    user["items"][item_id] = user["items"].get(item_id, 0) + quantity
+    return PurchaseResult("item", item_id, cost, user["balance"], quantity=quantity)
+
+def get_biome(biome: str, config) -> str:
+    biome = biome.lower()
+    if biome not in config.biomes:
+        raise GameError(
+            "invalid_biome",
+            "❌ Invalid Biome",
+            "That biome doesn't exist!"
+        )
+    return biome
+
+def unlock_biome(user: dict, biome: str, config=None) -> PurchaseResult:
+    config = config or get_snapshot()
+    biome = get_biome(biome, config)
+    user_biome = user["biomes"][biome]
+    if user_biome["unlocked"]:
+        raise GameError(
+            "already_unlocked",
+            "❌ Already Unlocked",
+            f"You've already unlocked the {biome} biome!\nUse `!shop biomes {biome}` to view upgrades."
+        )
+
+    cost = config.biomes[biome]["unlock_cost"]
+    charge(user, cost, "unlock this biome")
+    user_biome["unlocked"] = True
+    return PurchaseResult("biome", biome, cost, user["balance"])
+
+def upgrade_capacity(user: dict, biome: str, config=None) -> PurchaseResult:
+    """Buy one more plot in a biome"""
+    config = config or get_snapshot()
+    biome = get_biome(biome, config)
+    user_biome = user["biomes"][biome]
+    if not user_biome["unlocked"]:
+        raise GameError(
+            "biome_locked",
+            "❌ Biome Locked",
+            f"You need to unlock this biome first!\nUse `!buy {biome}` to unlock."
+        )
+
+    current_capacity = user_biome["capacity"]
+    cost = config.capacity_upgrade_cost(biome, current_capacity, GameConstants.MAX_PLANTER_CAPACITY)
+    charge(user, cost, "upgrade capacity")
+    user_biome["capacity"] += 1
+    next_cost = config.capacity_upgrade_cost(biome, current_capacity + 1, GameConstants.MAX_PLANTER_CAPACITY)
+    return PurchaseResult("capacity", biome, cost, user["balance"], capacity=user_biome["capacity"], next_cost=next_cost)
+
+def upgrade_skill(user: dict, skill: str, now: float) -> UpgradeResult:
+    """Spend XP on the next level of a skill"""
+    skill_info = SKILLS[skill]
+    cost = upgrade_cost(user, skill)
+    if cost == -1:
+        raise GameError(
+            "max_level",
+            "✨ Max Level",
+            f"{skill_info['name']} is already at maximum level!"
+        )
+
+    xp = user.get("xp", 0)
+    if xp < cost:
+        raise GameError(
+            "insufficient_xp",
+            "❌ Insufficient XP",
+            f"You need {cost:.1f} XP to upgrade {skill_info['name']}.\nYou have {xp:.1f} XP."
+        )
+
+    if skill == "grow_rate":
+        # Record growth so far at the old speed; the new one applies from now on
+        growth_timeline(user, now)
+    user.setdefault("skills", {})
+    user["xp"] = xp - cost
+    user["skills"][skill] = user["skills"].get(skill, 0) + 1
+    if skill == "grow_rate":
+        growth_timeline(user, now)
+    return UpgradeResult(skill, user["skills"][skill], skill_effect(user, skill), cost)
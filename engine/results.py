@@ -0,0 +1,76 @@
+"""
+Result objects returned by engine operations.
+"""
+
+class RollResult:
+    def __init__(self, seed: str, amount: int, rarity: str):
+        self.seed = seed
+        self.amount = amount
+        self.rarity = rarity
+
+class PlantResult:
+    def __init__(self, biome: str, planted: dict, used: int, capacity: int, free: int, fertilized: bool):
+        self.biome = biome
+        self.planted = planted  # seed type -> plots planted, rarest first for "plant all"
+        self.used = used  # plots in use after planting
+        self.capacity = capacity
+        self.free = free  # plots that were free before planting
+        self.fertilized = fertilized
+
+    @property
+    def total(self) -> int:
+        return sum(self.planted.values())
+
+    def merged(self, later: "PlantResult") -> "PlantResult":
+        """Combine with a later planting in the same biome"""
+        planted = dict(self.planted)
+        for seed_type, amount in later.planted.items():
+            planted[seed_type] = planted.get(seed_type, 0) + amount
+        return PlantResult(later.biome, planted, later.used, later.capacity, self.free, self.fertilized or later.fertilized)
+
+class HarvestResult:
+    def __init__(self, biomes: list, crops: dict, biome_counts: dict, replanted: dict, xp: float):
+        self.biomes = biomes  # biomes that were asked for
+        self.crops = crops  # crop -> amount harvested
+        self.biome_counts = biome_counts  # biome -> plots harvested
+        self.replanted = replanted  # seed type -> plots replanted
+        self.xp = xp
+
+class SaleResult:
+    def __init__(self, lines: list, total, balance):
+        self.lines = lines  # (crop, mutation, amount, value); mutation is None for normal crops
+        self.total = total
+        self.balance = balance
+
+class PurchaseResult:
+    def __init__(self, kind: str, target: str, cost: int, balance, quantity: int = None, capacity: int = None, next_cost: int = None):
+        self.kind = kind  # "item", "biome" or "capacity"
+        self.target = target  # item ID or biome
+        self.cost = cost
+        self.balance = balance
+        self.quantity = quantity  # items received
+        self.capacity = capacity  # biome capacity after an upgrade
+        self.next_cost = next_cost  # cost of the following capacity upgrade
+
+class ItemResult:
+    def __init__(self, item_id: str, effect_id: str, effect: dict):
+        self.item_id = item_id
+        self.effect_id = effect_id
+        self.effect = effect
+
+class UpgradeResult:
+    def __init__(self, skill: str, level: int, effect: float, cost: float):
+        self.skill = skill
+        self.level = level
+        self.effect = effect
+        self.cost = cost
+
+class CompactionResult:
+    def __init__(self, removed: int, normalized: int, bytes_reclaimed: int):
+        self.removed = removed  # entries deleted
+        self.normalized = normalized  # entries rewritten in the current format
+        self.bytes_reclaimed = bytes_reclaimed  # approximate, in serialized JSON
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.removed or self.normalized)
@@ -0,0 +1,80 @@
+"""
+Per-biome index of when plantings ripen.
+
+user["ripening"][biome] keeps a biome's plantings sorted by the growth work at
+which they ripen (see engine.growth):
+
+    {"keys": [ripen_work, ...], "ids": [planting_id, ...]}
+
+Work only ever grows with time, so the order and the keys stay valid when
+effects start or end. Ready counts, the next ripen time and popping every
+ready planting are then binary searches and slices instead of a pass over
+the whole garden. The index is rebuilt if the number of plantings no longer
+matches.
+"""
+
+from bisect import bisect_right
+from .growth import growth_timeline, ripen_key, time_at, work_at
+
+def build_index(plantings: dict, timeline: dict) -> dict:
+    entries = sorted((ripen_key(timeline, planting), planting_id) for planting_id, planting in plantings.items())
+    return {
+        "keys": [key for key, _ in entries],
+        "ids": [planting_id for _, planting_id in entries]
+    }
+
+def ripen_index(user: dict, biome: str, now: float) -> dict:
+    """A biome's ripen index, rebuilt if it no longer matches the garden"""
+    plantings = user["plantings"].get(biome, {})
+    index = user.get("ripening", {}).get(biome)
+    if index is None or "keys" not in index or len(index["ids"]) != len(plantings):
+        index = build_index(plantings, growth_timeline(user, now))
+        if isinstance(user, dict):
+            # Read-only views (query commands) just use the fresh index
+            user.setdefault("ripening", {})[biome] = index
+    return index
+
+def index_plantings(user: dict, biome: str, planting_ids: list, start_time: float, duration: float, now: float):
+    """Add plantings that start and grow together to an up-to-date index"""
+    index = user.get("ripening", {}).get(biome)
+    if index is None or "keys" not in index or len(index["ids"]) + len(planting_ids) != len(user["plantings"][biome]):
+        return  # Rebuilt on next use
+    key = work_at(growth_timeline(user, now), start_time) + duration
+    position = bisect_right(index["keys"], key)
+    index["keys"][position:position] = [key] * len(planting_ids)
+    index["ids"][position:position] = planting_ids
+
+def ripen_times(user: dict, biome: str, now: float):
+    """Yield (planting_id, ripen time) for a biome's plantings in ripening order"""
+    timeline = growth_timeline(user, now)
+    index = ripen_index(user, biome, now)
+    for planting_id, key in zip(index["ids"], index["keys"]):
+        yield planting_id, time_at(timeline, key)
+
+def ready_count(user: dict, biome: str, now: float) -> int:
+    """Number of ready plantings, which come first in the index"""
+    index = ripen_index(user, biome, now)
+    return bisect_right(index["keys"], work_at(growth_timeline(user, now), now))
+
+def next_ready_time(user: dict, biome: str, now: float):
+    """When the next planting in a biome ripens, or None if none is growing"""
+    keys = ripen_index(user, biome, now)["keys"]
+    position = ready_count(user, biome, now)
+    return time_at(growth_timeline(user, now), keys[position]) if position < len(keys) else None
+
+def biome_ready_time(user: dict, biome: str, now: float):
+    """Time at which every planting in a biome is ready, or None if it is empty"""
+    keys = ripen_index(user, biome, now)["keys"]
+    return time_at(growth_timeline(user, now), keys[-1]) if keys else None
+
+def pop_ready(user: dict, biome: str, now: float) -> list:
+    """Remove ready plantings from the index, returning their IDs in ripening order.
+
+    The caller removes them from the garden.
+    """
+    index = ripen_index(user, biome, now)
+    count = ready_count(user, biome, now)
+    ready = index["ids"][:count]
+    del index["keys"][:count]
+    del index["ids"][:count]
+    return ready
@@ -0,0 +1,331 @@
+"""
+Monte Carlo economy simulator for The Farmer.
+Advances thousands of simulated players in lockstep with NumPy arrays through
+the roll -> plant -> harvest -> sell -> buy loop, using the game values of the
+current config snapshot and the skill table from engine.skills.
+
+Usage (from the repository root):
+    python -m engine.simulation [--players 10000] [--days 10] [--session-minutes 60]
+                                [--config data/game_config.json] [--output report.json]
+
+A simulated day is one play session; plantings left at the end of a session
+finish growing offline and are harvested when the next session starts.
+NumPy is only needed for this module: pip install numpy
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from config import DataConfig, GameConstants
+from config.snapshot import get_snapshot, reload_config
+from .skills import SKILLS
+
+try:
+    import numpy as np
+except ImportError:  # Optional; only the simulator needs it
+    np = None
+
+PERCENTILES = (10, 50, 90, 99)
+
+class EconomySimulation:
+    """State of every simulated player, one row per player"""
+
+    def __init__(self, players: int, config=None, seed: int = 0, max_upgrades: int = 15,
+                 rolls_per_minute: float = 10.0, policy: str = "greedy"):
+        if np is None:
+            raise RuntimeError("The economy simulator needs NumPy: pip install numpy")
+        self.config = config = config or get_snapshot()
+        self.rng = np.random.default_rng(seed)
+        self.players = players
+        self.policy = policy
+        self.now = 0.0
+        self.played_days = 0.0
+
+        # Seeds in tier order; planting goes through them rarest first
+        self.seed_names = [seed for tier in config.seed_tiers for seed in config.seeds[tier]["seeds"]]
+        seed_index = {seed: i for i, seed in enumerate(self.seed_names)}
+        self.rarity_order = np.array([seed_index[seed] for seed in config.seeds_by_rarity])
+        self.tier_cumulative = np.array(config.seed_cumulative, dtype=float)
+        self.tier_start = np.cumsum([0] + [len(config.seeds[t]["seeds"]) for t in config.seed_tiers])[:-1]
+        self.tier_size = np.array([len(config.seeds[t]["seeds"]) for t in config.seed_tiers])
+        self.plant_time = np.array([config.plant_times[seed] for seed in self.seed_names], dtype=float)
+        crops = [seed.replace("_seed", "") for seed in self.seed_names]
+        self.base_yield = np.array([config.crops[config.crop_tier(crop)]["base_yield"] for crop in crops], dtype=float)
+        self.price = np.array([config.prices[crop] for crop in crops], dtype=float)
+
+        self.biome_names = list(config.biomes)
+        biomes = [config.biomes[b] for b in self.biome_names]
+        self.unlock_cost = np.array([b["unlock_cost"] for b in biomes], dtype=float)
+        self.upgrade_base = np.array([b["capacity_upgrade_base_cost"] for b in biomes], dtype=float)
+        self.upgrade_multiplier = np.array([b["capacity_upgrade_multiplier"] for b in biomes], dtype=float)
+        self.base_capacity = np.array([b["capacity"] for b in biomes])
+        self.max_capacity = int(self.base_capacity.max()) + max_upgrades
+
+        self.skill_names = list(SKILLS)
+        self.skill_step = np.array([SKILLS[s]["effect_per_level"] for s in self.skill_names])
+        self.skill_max_effect = np.array([SKILLS[s]["max_effect"] for s in self.skill_names])
+        self.skill_max_level = np.array([SKILLS[s]["max_level"] for s in self.skill_names])
+        self.skill_cost = np.array([SKILLS[s]["cost_per_level"] for s in self.skill_names], dtype=float)
+
+        # Seed roll CDF for every roll_luck level, offset by the level (see roll())
+        luck_column = self.skill_names.index("roll_luck")
+        self.seed_cdf = np.concatenate([
+            level + self.seed_chances(level * self.skill_step[luck_column], config).cumsum()
+            for level in range(self.skill_max_level[luck_column] + 1)
+        ])
+
+        P, B, S = players, len(self.biome_names), len(self.seed_names)
+        self.balance = np.zeros(P)
+        self.earned = np.zeros(P)
+        self.xp = np.zeros(P)
+        self.skills = np.zeros((P, len(self.skill_names)), dtype=np.int64)
+        self.seeds = np.zeros((P, S), dtype=np.int64)
+        self.unlocked = np.zeros((P, B), dtype=bool)
+        self.unlocked[:, 0] = True
+        self.capacity = np.tile(self.base_capacity, (P, 1))
+        # Plots: seed index and the time the planting is ready (-1 and infinity when empty)
+        self.plot_seed = np.full((P, B, self.max_capacity), -1, dtype=np.int8)
+        self.plot_ready = np.full((P, B, self.max_capacity), np.inf)
+        self.unlock_day = np.full((P, B), np.nan)
+        self.unlock_day[:, 0] = 0.0
+
+        # Some players roll a lot more than others
+        self.roll_rate = rolls_per_minute / 60 * self.rng.lognormal(0, 0.5, P)
+
+    def seed_chances(self, luck_bonus: float, config):
+        """Chance of rolling each seed with the given roll_luck bonus"""
+        luck = GameConstants.BASE_LUCK_FACTOR * (1 + min(luck_bonus, SKILLS["roll_luck"]["max_effect"]))
+        # A roll lands in tier k when uniform(0, 100) * luck falls in (cumulative[k-1], cumulative[k]],
+        # and rolls past the last tier land in the rarest one
+        reached = np.minimum(1.0, self.tier_cumulative / (100 * luck))
+        reached[-1] = 1.0
+        tier_chance = np.diff(reached, prepend=0.0)
+        return np.repeat(tier_chance / self.tier_size, self.tier_size)
+
+    def skill_effect(self, skill: str):
+        column = self.skill_names.index(skill)
+        return np.minimum(self.skills[:, column] * self.skill_step[column], self.skill_max_effect[column])
+
+    def roll(self, seconds: float):
+        """Roll seeds for `seconds` of play (at most one roll per second)"""
+        rolls = np.minimum(self.rng.poisson(self.roll_rate * seconds), max(1, int(seconds)))
+        player = np.repeat(np.arange(self.players), rolls)
+
+        # Inverse CDF sampling from the seed chances of each player's luck level;
+        # level L's table is shifted by L so one sorted search covers every level
+        level = self.skills[player, self.skill_names.index("roll_luck")]
+        position = np.searchsorted(self.seed_cdf, self.rng.random(len(player)) + level, side="right")
+        seed = np.minimum(position - level * len(self.seed_names), len(self.seed_names) - 1)
+
+        S = len(self.seed_names)
+        self.seeds += np.bincount(player * S + seed, minlength=self.players * S).reshape(self.players, S)
+
+    def used_plots(self):
+        """Number of biomes and plot slots any player can use, to skip the rest of the plot arrays"""
+        biomes = int(np.nonzero(self.unlocked.any(axis=0))[0].max()) + 1
+        return biomes, int(self.capacity[:, :biomes].max())
+
+    def harvest_and_sell(self):
+        """Harvest every ready plot and sell the crops"""
+        biomes, slots = self.used_plots()
+        player, biome, slot = np.nonzero(self.plot_ready[:, :biomes, :slots] <= self.now)
+        if len(player) == 0:
+            return
+        seed = self.plot_seed[player, biome, slot]
+        yield_multiplier = 1 + self.skill_effect("crop_yield")
+        crops = np.floor(self.base_yield[seed] * yield_multiplier[player])
+        revenue = np.bincount(player, weights=crops * self.price[seed], minlength=self.players)
+        self.balance += revenue
+        self.earned += revenue
+        self.xp += np.bincount(player, minlength=self.players) * (1 + self.skill_effect("xp_per_harvest"))
+        self.plot_seed[player, biome, slot] = -1
+        self.plot_ready[player, biome, slot] = np.inf
+
+    def plant(self):
+        """Fill free plots of every unlocked biome in biome order, rarest seeds first"""
+        P = self.players
+        S = len(self.seed_names)
+        B, C = self.used_plots()
+        free = (
+            np.isinf(self.plot_ready[:, :B, :C])
+            & (np.arange(C)[None, None, :] < self.capacity[:, :B, None])
+            & self.unlocked[:, :B, None]
+        ).reshape(P, B * C)
+        rows = np.nonzero(free.any(axis=1) & (self.seeds.sum(axis=1) > 0))[0]
+        if len(rows) == 0:
+            return
+
+        # The n-th free plot of a player gets the seed at position n of their seeds in rarity order
+        free = free[rows]
+        rank = np.cumsum(free, axis=1) - 1
+        available = np.cumsum(self.seeds[rows][:, self.rarity_order], axis=1)
+        row, plot = np.nonzero(free & (rank < available[:, -1:]))
+        if len(row) == 0:
+            return
+        # One sorted search for every player: offset each row past the previous one
+        stride = available[:, -1].max() + 1
+        offsets = np.arange(len(rows)) * stride
+        position = np.searchsorted((available + offsets[:, None]).ravel(), rank[row, plot] + offsets[row], side="right") - row * S
+        seed = self.rarity_order[position]
+
+        player = rows[row]
+        biome, slot = np.divmod(plot, C)
+        growth = 1 + self.skill_effect("grow_rate")
+        self.plot_seed[player, biome, slot] = seed
+        self.plot_ready[player, biome, slot] = self.now + self.plant_time[seed] / growth[player]
+        self.seeds -= np.bincount(player * S + seed, minlength=P * S).reshape(P, S)
+
+    def buy(self):
+        """Unlock the next biome when affordable, otherwise buy the cheapest capacity upgrade"""
+        P = np.arange(self.players)
+        has_locked = ~self.unlocked.all(axis=1)
+        next_biome = np.argmin(self.unlocked, axis=1)
+        unlock_cost = self.unlock_cost[next_biome]
+        unlocking = has_locked & (self.balance >= unlock_cost)
+        self.balance[unlocking] -= unlock_cost[unlocking]
+        self.unlocked[P[unlocking], next_biome[unlocking]] = True
+        self.unlock_day[P[unlocking], next_biome[unlocking]] = self.played_days
+
+        upgrades = self.capacity - GameConstants.MAX_PLANTER_CAPACITY
+        cost = np.floor(self.upgrade_base * self.upgrade_multiplier ** upgrades)
+        cost[~self.unlocked | (self.capacity >= self.max_capacity)] = np.inf
+        cheapest = np.argmin(cost, axis=1)
+        cheapest_cost = cost[P, cheapest]
+        upgrading = ~unlocking & (self.balance >= cheapest_cost)
+        if self.policy == "biomes":
+            # Save for every biome before buying plots
+            upgrading &= ~has_locked
+        self.balance[upgrading] -= cheapest_cost[upgrading]
+        self.capacity[P[upgrading], cheapest[upgrading]] += 1
+
+    def upgrade_skills(self):
+        """Spend XP on the cheapest skill level"""
+        P = np.arange(self.players)
+        cost = self.skill_cost * (self.skills + 1)
+        cost[self.skills >= self.skill_max_level] = np.inf
+        cheapest = np.argmin(cost, axis=1)
+        cheapest_cost = cost[P, cheapest]
+        upgrading = self.xp >= cheapest_cost
+        self.xp[upgrading] -= cheapest_cost[upgrading]
+        self.skills[P[upgrading], cheapest[upgrading]] += 1
+
+    def step(self, seconds: float):
+        self.now += seconds
+        self.roll(seconds)
+        self.harvest_and_sell()
+        self.plant()
+        self.buy()
+        self.upgrade_skills()
+
+    def run_day(self, session_seconds: float, tick: float):
+        # Everything planted last session finished growing offline
+        self.plot_ready[np.isfinite(self.plot_ready)] = self.now
+        elapsed = 0.0
+        while elapsed < session_seconds:
+            seconds = min(tick, session_seconds - elapsed)
+            self.played_days += seconds / session_seconds
+            self.step(seconds)
+            elapsed += seconds
+
+    def balance_summary(self) -> dict:
+        values = np.percentile(self.balance, PERCENTILES)
+        summary = {f"p{p}": float(v) for p, v in zip(PERCENTILES, values)}
+        summary["mean"] = float(self.balance.mean())
+        summary["mean_earned"] = float(self.earned.mean())
+        return summary
+
+    def unlock_summary(self) -> dict:
+        summary = {}
+        for b, biome in enumerate(self.biome_names[1:], start=1):
+            days = self.unlock_day[:, b]
+            reached = days[~np.isnan(days)]
+            summary[biome] = {
+                "unlocked": float(len(reached) / self.players),
+                "p50_days": float(np.percentile(reached, 50)) if len(reached) else None,
+                "p90_days": float(np.percentile(reached, 90)) if len(reached) else None
+            }
+        return summary
+
+def simulate(players: int, days: int, session_minutes: float = 60, tick: float = 30, **kwargs) -> dict:
+    """Run a simulation and return the report"""
+    sim = EconomySimulation(players, **kwargs)
+    history = []
+    start = time.perf_counter()
+    for day in range(1, days + 1):
+        sim.run_day(session_minutes * 60, tick)
+        history.append({"day": day, "balance": sim.balance_summary()})
+
+    return {
+        "players": players,
+        "days": days,
+        "session_minutes": session_minutes,
+        "config_version": sim.config.version,
+        "elapsed_s": time.perf_counter() - start,
+        "balance_by_day": history,
+        "time_to_unlock": sim.unlock_summary(),
+        "mean_capacity": {
+            biome: float(sim.capacity[sim.unlocked[:, b], b].mean()) if sim.unlocked[:, b].any() else None
+            for b, biome in enumerate(sim.biome_names)
+        },
+        "mean_skill_levels": {
+            skill: float(sim.skills[:, s].mean()) for s, skill in enumerate(sim.skill_names)
+        }
+    }
+
+def print_report(report: dict):
+    print(f"Simulated {report['players']:,} players for {report['days']} days "
+          f"({report['players'] * report['days']:,} player-days) in {report['elapsed_s']:.1f}s")
+    print("\nBalance by day:")
+    print(f"{'day':>4} " + " ".join(f"{'p' + str(p):>12}" for p in PERCENTILES) + f" {'mean':>12}")
+    for entry in report["balance_by_day"]:
+        balance = entry["balance"]
+        print(f"{entry['day']:>4} " + " ".join(f"{balance['p' + str(p)]:>12,.0f}" for p in PERCENTILES) + f" {balance['mean']:>12,.0f}")
+
+    print("\nTime to unlock (played days):")
+    for biome, stats in report["time_to_unlock"].items():
+        if stats["p50_days"] is None:
+            print(f"  {biome:<10} nobody unlocked it")
+        else:
+            print(f"  {biome:<10} {stats['unlocked']:>6.1%} unlocked, p50 {stats['p50_days']:.2f}, p90 {stats['p90_days']:.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate the game economy")
+    parser.add_argument("--players", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=10, help="Play sessions per player")
+    parser.add_argument("--session-minutes", type=float, default=60, help="Length of one daily play session")
+    parser.add_argument("--tick", type=float, default=30, help="Simulation step in seconds")
+    parser.add_argument("--rolls-per-minute", type=float, default=10, help="Average rolls per active minute")
+    parser.add_argument("--max-upgrades", type=int, default=15, help="Most capacity upgrades a biome can get")
+    parser.add_argument("--policy", choices=["greedy", "biomes"], default="greedy",
+                        help="greedy buys whatever is affordable; biomes saves for every biome before buying plots")
+    parser.add_argument("--config", help="Game config override file to simulate instead of data/game_config.json")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the report JSON to this file")
+    args = parser.parse_args()
+
+    if np is None:
+        raise SystemExit("The economy simulator needs NumPy: pip install numpy")
+
+    if args.config:
+        DataConfig.GAME_CONFIG_FILE = Path(args.config)
+    config = reload_config() if DataConfig.GAME_CONFIG_FILE.exists() else get_snapshot()
+
+    report = simulate(
+        args.players,
+        args.days,
+        args.session_minutes,
+        args.tick,
+        config=config,
+        seed=args.seed,
+        max_upgrades=args.max_upgrades,
+        rolls_per_minute=args.rolls_per_minute,
+        policy=args.policy
+    )
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Skill tree rules.
+"""
+
+from .errors import GameError
+
+SKILLS = {
+    "grow_rate": {
+        "name": "Grow Rate",
+        "description": "Increase your grow rate by 0.5% per level",
+        "max_level": 20,
+        "cost_per_level": 10,
+        "effect_per_level": 0.005,  # 0.5%
+        "max_effect": 0.10  # 10%
+    },
+    "crop_yield": {
+        "name": "Crop Yield",
+        "description": "Increase your crop yield by 0.5% per level",
+        "max_level": 20,
+        "cost_per_level": 10,
+        "effect_per_level": 0.005,  # 0.5%
+        "max_effect": 0.10  # 10%
+    },
+    "roll_luck": {
+        "name": "Roll Luck",
+        "description": "Increase your roll luck by 1% per level",
+        "max_level": 20,
+        "cost_per_level": 10,
+        "effect_per_level": 0.01,  # 1%
+        "max_effect": 0.20  # 20%
+    },
+    "xp_per_harvest": {
+        "name": "XP per Harvest",
+        "description": "Increase your XP per harvest by 0.5 per level",
+        "max_level": 10,
+        "cost_per_level": 10,
+        "effect_per_level": 0.5,
+        "max_effect": 5.0
+    }
+}
+
+# Shortcuts accepted by !upgrade
+SKILL_SHORTCUTS = {
+    "gr": "grow_rate",
+    "cy": "crop_yield",
+    "rl": "roll_luck",
+    "xp": "xp_per_harvest"
+}
+
+def resolve_skill(name: str) -> str:
+    """Get the skill ID for a skill name or shortcut"""
+    skill = name.lower()
+    skill = SKILL_SHORTCUTS.get(skill, skill)
+    if skill not in SKILLS:
+        raise GameError(
+            "invalid_skill",
+            "❌ Invalid Skill",
+            f"Available skills:\n" +
+            "\n".join([f"`{s}` - {SKILLS[s]['name']}" for s in SKILLS]) +
+            "\n\nShortcuts:\n" +
+            "\n".join([f"`{shortcut}` - {SKILLS[s]['name']}" for shortcut, s in SKILL_SHORTCUTS.items()])
+        )
+    return skill
+
+def skill_level(user: dict, skill: str) -> int:
+    return user.get("skills", {}).get(skill, 0)
+
+def skill_effect(user: dict, skill: str) -> float:
+    """Current bonus of a skill (a fraction, or flat XP for xp_per_harvest)"""
+    skill_info = SKILLS[skill]
+    return min(skill_level(user, skill) * skill_info["effect_per_level"], skill_info["max_effect"])
+
+def upgrade_cost(user: dict, skill: str) -> int:
+    """XP needed for the next level, or -1 at max level"""
+    current_level = skill_level(user, skill)
+    if current_level >= SKILLS[skill]["max_level"]:
+        return -1
+    return SKILLS[skill]["cost_per_level"] * (current_level + 1)
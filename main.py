@@ -1,8 +1,27 @@
+import time
+STARTED = time.perf_counter()
+
+import asyncio
 import discord
 from discord.ext import commands
 import os
+import socket
 from dotenv import load_dotenv
-from config.rate_limiter import RateLimiter
+from config import DataConfig
+from config.snapshot import reload_config
+from config.rate_limiter import RateLimiter, SharedRateLimiter
+from utils.database import INTERACTION_CLAIM_TIMEOUT, claim_user, collect_metrics, configure_storage, get_store, maintain_leases, release_users, warm_storage
+from utils.leases import UserLeases
+from utils.storage_client import StorageClient, StorageConflict
+from utils.outbox import DiscordSink, Outbox, OutboxContext
+from utils.user_lookup import UserLookup
+from utils.compactor import Compactor
+from utils.startup import StartupTimer
+from utils import metrics
+from utils.profiling import profiler
+
+startup = StartupTimer(STARTED)
+startup.mark("imports")
 
 # Load environment variables
 load_dotenv()
@@ -11,22 +30,105 @@ load_dotenv()
 def get_token():
     try:
         with open('.env', 'r', encoding='utf-8') as f:
-            content = f.read().strip()
-            if '=' in content:
-                return content.split('=')[1].strip()
+            for line in f.read().strip().splitlines():
+                # Skip the optional FARMER_* settings that can share the file
+                if '=' in line and not line.strip().startswith('FARMER_'):
+                    return line.split('=')[1].strip()
     except Exception as e:
         print(f"Error reading token: {e}")
     return None
 
+def parse_shard_ids(value):
+    """Parse a shard list like "0-3" or "0,2,4" into a list of shard IDs"""
+    shard_ids = []
+    for part in value.split(","):
+        part = part.strip()
+        if "-" in part:
+            start, end = part.split("-", 1)
+            shard_ids.extend(range(int(start), int(end) + 1))
+        elif part:
+            shard_ids.append(int(part))
+    return shard_ids
+
 # Initialize bot with proper permissions
-intents = discord.Intents.default()
-intents.members = True
+# Set FARMER_SLASH_ONLY=1 to serve slash commands only. The bot then doesn't need the
+# privileged message content intent or guild message events; prefix commands still
+# work in DMs by mentioning the bot.
+slash_only = bool(os.getenv("FARMER_SLASH_ONLY"))
+# Set FARMER_LEAN=1 to keep only the events and caches the game needs: no member
+# list or presences, no guild chunking and a small message cache. Names are then
+# looked up on demand through bot.user_lookup.
+lean = bool(os.getenv("FARMER_LEAN"))
+intents = discord.Intents.none() if lean else discord.Intents.default()
+intents.guilds = True
+intents.members = not lean
 intents.messages = True
-intents.message_content = True
-bot = commands.Bot(command_prefix="!", intents=intents, help_command=None)
+intents.message_content = not slash_only
+intents.guild_messages = not slash_only
+command_prefix = commands.when_mentioned if slash_only else "!"
+cache_options = {}
+if lean:
+    cache_options = {
+        "member_cache_flags": discord.MemberCacheFlags.none(),
+        "chunk_guilds_at_startup": False,
+        "max_messages": int(os.getenv("FARMER_MAX_MESSAGES", "100"))
+    }
+
+# Sharding: FARMER_SHARDED=1 lets discord.py pick the shard count for one process.
+# For one process per shard range set FARMER_SHARD_COUNT and FARMER_SHARD_IDS (e.g. "0-3").
+shard_count = os.getenv("FARMER_SHARD_COUNT")
+shard_ids = os.getenv("FARMER_SHARD_IDS")
+if shard_count or shard_ids or os.getenv("FARMER_SHARDED"):
+    bot = commands.AutoShardedBot(
+        command_prefix=command_prefix,
+        intents=intents,
+        help_command=None,
+        shard_count=int(shard_count) if shard_count else None,
+        shard_ids=parse_shard_ids(shard_ids) if shard_ids else None,
+        **cache_options
+    )
+else:
+    bot = commands.Bot(command_prefix=command_prefix, intents=intents, help_command=None, **cache_options)
+bot.user_lookup = UserLookup(bot)
+
+# With a storage service every process reads and writes through it.
+# Otherwise a process serving only part of the shards shares the data file with
+# the others, so it only caches users it holds an ownership lease for.
+storage_socket = os.getenv("FARMER_STORAGE_SOCKET")
+if storage_socket:
+    socket_path = DataConfig.STORAGE_SOCKET if storage_socket == "1" else storage_socket
+    # Each user's background work (e.g. notifications) runs on the process serving
+    # their ID's shard, so every process doesn't do it for everyone
+    partition = (int(shard_count), set(parse_shard_ids(shard_ids))) if shard_count and shard_ids else None
+    configure_storage(client=StorageClient(socket_path), partition=partition)
+elif shard_ids:
+    owner = os.getenv("FARMER_WORKER_ID") or f"{socket.gethostname()}:{os.getpid()}:{shard_ids}"
+    configure_storage(UserLeases(DataConfig.LEASE_DB_FILE, owner))
+elif os.getenv("FARMER_CACHE_MB"):
+    # Keep only recently used users in memory; the rest are read from the data file on demand
+    configure_storage(budget=int(float(os.getenv("FARMER_CACHE_MB")) * 1024 * 1024))
+
+# Apply game value overrides before any command runs
+if DataConfig.GAME_CONFIG_FILE.exists():
+    reload_config()
 
 # Initialize rate limiter
-rate_limiter = RateLimiter(max_commands=10, time_window=8, timeout_duration=30)
+# Set FARMER_SHARED_LIMITER=1 to share limits and cooldowns between bot processes
+if os.getenv("FARMER_SHARED_LIMITER"):
+    rate_limiter = SharedRateLimiter(DataConfig.LIMITER_DB_FILE, max_commands=10, time_window=8, timeout_duration=30)
+else:
+    rate_limiter = RateLimiter(max_commands=10, time_window=8, timeout_duration=30)
+bot.rate_limiter = rate_limiter
+
+# Set FARMER_OUTBOX=1 to queue replies per channel, merging them under Discord's rate limits
+bot.outbox = Outbox(DiscordSink()) if os.getenv("FARMER_OUTBOX") else None
+
+@bot.event
+async def on_message(message):
+    if message.author.bot:
+        return
+    ctx = await bot.get_context(message, cls=OutboxContext)
+    await bot.invoke(ctx)
 
 @bot.event
 async def on_command_error(ctx, error):
@@ -34,30 +136,117 @@ async def on_command_error(ctx, error):
         await ctx.send(f"⏰ This command is on cooldown. Try again in {error.retry_after:.2f}s")
     elif isinstance(error, commands.CommandNotFound):
         pass  # Ignore command not found errors
+    elif isinstance(getattr(error, "original", None), StorageConflict):
+        # The transaction was rejected, so none of the command's changes were saved
+        await ctx.send("⚠️ Your farm changed on another shard while that command ran, so nothing was saved. Please try again.")
     else:
         print(f"Command error: {error}")
 
 @bot.check
 async def check_rate_limit(ctx):
-    if rate_limiter.is_rate_limited(ctx.author.id):
-        remaining = rate_limiter.get_timeout_remaining(ctx.author.id)
+    if await rate_limiter.is_rate_limited(ctx.author.id):
+        remaining = await rate_limiter.get_timeout_remaining(ctx.author.id)
         await ctx.send(f"⚠️ You are being rate limited. Please wait {int(remaining)} seconds before using commands again.")
         return False
     return True
 
+@bot.check
+async def check_user_owner(ctx):
+    # In sharded mode, take over the author's record if another process holds it
+    timeout = INTERACTION_CLAIM_TIMEOUT if ctx.interaction is not None else 5.0
+    if await claim_user(str(ctx.author.id), timeout):
+        return True
+    await ctx.send("⚠️ Your farm is busy on another shard. Please try again in a moment.")
+    return False
+
+@bot.before_invoke
+async def before_command(ctx):
+    get_store().pin(str(ctx.author.id))
+    ctx.started_at = time.perf_counter()
+    metrics.start_command(ctx.command.qualified_name)
+    profiler.start(ctx.command.qualified_name, ctx)
+
+@bot.after_invoke
+async def after_command(ctx):
+    try:
+        run = profiler.finish(ctx.command.qualified_name, ctx)
+        if run is not None and run.on_done is not None:
+            await run.on_done(run)
+    except Exception as e:
+        print(f"Error finishing profile: {e}")
+    finally:
+        # Always release the user and record the command, even if profiling failed
+        release_users()
+        get_store().unpin(str(ctx.author.id))
+        metrics.finish_command(
+            ctx.command.qualified_name,
+            time.perf_counter() - ctx.started_at,
+            failed=ctx.command_failed
+        )
+
 # Load all cogs
+async def load_cog(filename):
+    try:
+        await bot.load_extension(f"cogs.{filename[:-3]}")
+        print(f"Loaded {filename}")
+    except Exception as e:
+        print(f"Failed to load {filename}: {e}")
+
 async def load_cogs():
-    for filename in os.listdir("./cogs"):
-        if filename.endswith(".py") and not filename.startswith("__"):
-            try:
-                await bot.load_extension(f"cogs.{filename[:-3]}")
-                print(f"Loaded {filename}")
-            except Exception as e:
-                print(f"Failed to load {filename}: {e}")
+    await asyncio.gather(*(
+        load_cog(filename) for filename in sorted(os.listdir("./cogs"))
+        if filename.endswith(".py") and not filename.startswith("__")
+    ))
+
+async def setup_hook():
+    # Runs once before connecting, so commands are ready as soon as the gateway is.
+    # discord.py calls it from login() once the HTTP login is done.
+    startup.mark("login")
+    with startup.phase("cog loading"):
+        await load_cogs()
+
+    # Set FARMER_PREWARM=1 to load farm data before accepting commands
+    if os.getenv("FARMER_PREWARM"):
+        with startup.phase("data warm-up"):
+            warm_storage()
+
+    if get_store().leases is not None:
+        bot.loop.create_task(maintain_leases())
+
+    # Prune stale entries from user records a few milliseconds at a time
+    bot.loop.create_task(Compactor().run())
+
+    # Set FARMER_SYNC_COMMANDS=1 after adding or changing commands to register the slash
+    # commands with Discord. Syncing is rate limited, so it isn't done on every start.
+    if os.getenv("FARMER_SYNC_COMMANDS"):
+        synced = await bot.tree.sync()
+        print(f"Synced {len(synced)} slash commands")
+
+    # Set FARMER_PROFILE=command:count (e.g. harvest:5) to profile a command from startup
+    profile_target = os.getenv("FARMER_PROFILE")
+    if profile_target:
+        command, _, count = profile_target.partition(":")
+        async def print_profile(run):
+            path, summary = profiler.save(run)
+            print(f"Saved profile of {run.count} {run.command} runs to {path}\n{summary}")
+        profiler.arm(command, int(count or 1), print_profile)
+
+    # Set FARMER_METRICS_PORT to serve Prometheus metrics on localhost
+    metrics_port = os.getenv("FARMER_METRICS_PORT")
+    if metrics_port:
+        metrics.collectors.append(collect_metrics)
+        await metrics.start_exporter(int(metrics_port))
+        bot.loop.create_task(metrics.measure_loop_lag())
+    startup.mark("post-setup")
+
+bot.setup_hook = setup_hook
 
 @bot.event
 async def on_ready():
-    await load_cogs()
+    # on_ready fires again after every reconnect; only report the first one
+    if startup.phases[-1][0] != "gateway ready":
+        startup.mark("gateway ready")
+        print(startup.report())
     print(f'Logged in as {bot.user.name} (ID: {bot.user.id})')
     print('------')
 
@@ -67,4 +256,9 @@ if __name__ == "__main__":
     if token is None:
         print("Error: Could not read token from .env file")
     else:
-        bot.run(token) 
\ No newline at end of file
+        bot.run(token)
+        # Write changes still waiting for a flush (e.g. from the compactor), then hand
+        # our users back so other processes don't wait for the leases to expire
+        get_store().flush()
+        if get_store().leases is not None:
+            get_store().leases.release_all()
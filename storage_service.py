@@ -0,0 +1,157 @@
+"""
+Storage service for The Farmer.
+Owns the farm data and serves it to bot processes over a Unix domain socket,
+so several workers share one consistent store without racing on the data file.
+
+Usage: python storage_service.py [socket_path]
+Then start the bot processes with FARMER_STORAGE_SOCKET pointing at the same path.
+"""
+
+import asyncio
+import marshal
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from config import DataConfig
+from utils.database import read_data_file, write_data_file
+from utils.storage_client import (
+    HEADER,
+    OP_GET,
+    OP_PUT,
+    OP_TXN,
+    OP_SCAN,
+    OP_FLUSH,
+    STATUS_OK,
+    STATUS_CONFLICT,
+    STATUS_ERROR,
+    encode_frame
+)
+
+class StorageService:
+    def __init__(self, flush_interval: float = 1.0):
+        self.flush_interval = flush_interval
+        self.users = read_data_file().get("users", {})
+        self.versions = {user_id: 1 for user_id in self.users}
+        self.dirty = False
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="flush")
+
+    def get(self, user_id):
+        return self.versions.get(user_id, 0), self.users.get(user_id)
+
+    def transaction(self, writes):
+        """Apply writes atomically if every expected version still matches"""
+        conflicts = [
+            user_id for user_id, expected, _ in writes
+            if expected is not None and self.versions.get(user_id, 0) != expected
+        ]
+        if conflicts:
+            return STATUS_CONFLICT, conflicts
+
+        new_versions = {}
+        for user_id, _, record in writes:
+            if record is None:
+                self.users.pop(user_id, None)
+            else:
+                self.users[user_id] = record
+            self.versions[user_id] = self.versions.get(user_id, 0) + 1
+            new_versions[user_id] = self.versions[user_id]
+        self.dirty = True
+        return STATUS_OK, new_versions
+
+    def scan(self, fields):
+        if not fields:
+            return self.users
+        return {
+            user_id: {field: user[field] for field in fields if field in user}
+            for user_id, user in self.users.items()
+        }
+
+    def snapshot(self):
+        """The users to write if anything changed since the last flush, else None"""
+        if not self.dirty:
+            return None
+        self.dirty = False
+        # Transactions replace records rather than changing them, so a shallow copy
+        # stays consistent while the writer thread serializes it
+        return {"users": dict(self.users)}
+
+    def flush(self):
+        data = self.snapshot()
+        if data is not None:
+            write_data_file(data)
+
+    async def flush_async(self):
+        """Write the data file on the writer thread so requests keep being served"""
+        data = self.snapshot()
+        if data is not None:
+            await asyncio.get_running_loop().run_in_executor(self.executor, write_data_file, data)
+
+    def handle_request(self, op, payload):
+        if op == OP_GET:
+            return STATUS_OK, self.get(payload)
+        if op == OP_PUT:
+            user_id, expected, record = payload
+            status, result = self.transaction([(user_id, expected, record)])
+            return status, result[user_id] if status == STATUS_OK else result
+        if op == OP_TXN:
+            return self.transaction(payload)
+        if op == OP_SCAN:
+            return STATUS_OK, self.scan(payload)
+        return STATUS_ERROR, f"Unknown opcode {op}"
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                op, length = HEADER.unpack(await reader.readexactly(HEADER.size))
+                payload = marshal.loads(await reader.readexactly(length))
+                try:
+                    if op == OP_FLUSH:
+                        await self.flush_async()
+                        status, result = STATUS_OK, None
+                    else:
+                        status, result = self.handle_request(op, payload)
+                except Exception as e:
+                    status, result = STATUS_ERROR, str(e)
+                writer.write(encode_frame(status, result))
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass  # Client disconnected
+        except Exception as e:
+            print(f"Storage client error: {e}")
+        finally:
+            writer.close()
+
+    async def flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush_async()
+            except Exception as e:
+                print(f"Error flushing data: {e}")
+
+    async def serve(self, socket_path):
+        socket_path = str(socket_path)
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = await asyncio.start_unix_server(self.handle_client, path=socket_path)
+        # Only processes running as our user may talk to the store
+        os.chmod(socket_path, 0o600)
+        print(f"Storage service listening on {socket_path} ({len(self.users)} users)")
+
+        flusher = asyncio.create_task(self.flush_loop())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            flusher.cancel()
+            # Let a write in progress finish before the last one
+            self.executor.shutdown(wait=True)
+            self.flush()
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else DataConfig.STORAGE_SOCKET
+    DataConfig.DATA_DIR.mkdir(exist_ok=True)
+    try:
+        asyncio.run(StorageService().serve(path))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,20 @@
+import json
+import pytest
+from config import DataConfig
+from utils import database
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Point the data files at a temporary directory and restore the user store afterwards"""
+    monkeypatch.setattr(DataConfig, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(DataConfig, "FARM_DATA_FILE", tmp_path / "farm_data.json")
+    monkeypatch.setattr(DataConfig, "LEASE_DB_FILE", tmp_path / "leases.db")
+    monkeypatch.setattr(database, "_store", database._store)
+    monkeypatch.setattr(database, "_client", database._client)
+    return tmp_path
+
+def write_users(users: dict):
+    DataConfig.FARM_DATA_FILE.write_text(json.dumps({"users": users}))
+
+def read_users() -> dict:
+    return json.loads(DataConfig.FARM_DATA_FILE.read_text())["users"]
@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from utils.coalesce import Coalescer
+
+def test_batch_error_reaches_every_merged_caller():
+    async def main():
+        coalescer = Coalescer("test")
+        batches = []
+
+        async def handler(items, state):
+            batches.append(items)
+            await asyncio.sleep(0.01)
+            if "bad" in items:
+                raise ValueError("bad batch")
+            return (state or 0) + len(items)
+
+        first = asyncio.create_task(coalescer.submit("key", "ok", handler))
+        await asyncio.sleep(0)
+        # These arrive while the first batch runs and are merged into the next one
+        merged = [asyncio.create_task(coalescer.submit("key", item, handler)) for item in ("a", "bad")]
+        await first
+        results = await asyncio.gather(*merged, return_exceptions=True)
+        later = await coalescer.submit("key", "after", handler)
+        return batches, results, later, coalescer
+
+    batches, results, later, coalescer = asyncio.run(main())
+    assert batches == [["ok"], ["a", "bad"], ["after"]]
+    assert [str(result) for result in results] == ["bad batch", "bad batch"]
+    assert all(isinstance(result, ValueError) for result in results)
+    # A failed batch doesn't stick to the key
+    assert later is None
+    assert coalescer.running == set() and coalescer.pending == {}
+
+def test_leader_returns_after_its_own_batch():
+    async def main():
+        coalescer = Coalescer("test")
+        release = asyncio.Event()
+
+        async def handler(items, state):
+            if "first" not in items:
+                await release.wait()
+
+        first = asyncio.create_task(coalescer.submit("key", "first", handler))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(coalescer.submit("key", "second", handler))
+        # The first caller is answered even though the next batch is still running
+        await asyncio.wait_for(first, 1)
+        assert not second.done()
+        release.set()
+        await second
+
+    asyncio.run(main())
+
+def test_cancelled_leader_hands_the_run_on():
+    async def main():
+        coalescer = Coalescer("test")
+        handled = []
+
+        async def handler(items, state):
+            handled.extend(items)
+            await asyncio.sleep(0.05)
+
+        first = asyncio.create_task(coalescer.submit("key", "first", handler))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(coalescer.submit("key", "second", handler))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        await asyncio.wait_for(second, 1)
+        return handled
+
+    assert asyncio.run(main()) == ["first", "second"]
@@ -0,0 +1,23 @@
+import engine
+from config import DataConfig
+from config.snapshot import get_snapshot
+
+def test_grow_rate_upgrade_is_not_retroactive():
+    config = get_snapshot()
+    seed_type, duration = next(iter(config.plant_times.items()))
+    user = DataConfig.get_default_user_data()
+    user["seeds"][seed_type] = 1
+    user["xp"] = 1000
+    start = 1_000_000.0
+    engine.plant(user, "grassland", seed_type, 1, start, config)
+
+    # Half grown at the base speed, then upgraded
+    upgraded_at = start + duration / 2
+    engine.upgrade_skill(user, "grow_rate", upgraded_at)
+    speed = 1 + engine.skill_effect(user, "grow_rate")
+
+    expected = upgraded_at + (duration / 2) / speed
+    ready_at = engine.next_ready_time(user, "grassland", upgraded_at)
+    assert abs(ready_at - expected) < 1e-6
+    assert engine.ready_count(user, "grassland", expected - 0.01) == 0
+    assert engine.ready_count(user, "grassland", expected + 0.01) == 1
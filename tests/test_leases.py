@@ -0,0 +1,72 @@
+import asyncio
+from utils import database
+from utils.database import UserStore
+from utils.leases import UserLeases
+from conftest import write_users, read_users
+
+def split_stores(data_dir):
+    leases_a = UserLeases(data_dir / "leases.db", "a")
+    leases_b = UserLeases(data_dir / "leases.db", "b")
+    return UserStore(leases_a), UserStore(leases_b)
+
+def test_flush_merges_each_process_users(data_dir):
+    write_users({"1": {"balance": 1}, "2": {"balance": 2}, "3": {"balance": 3}})
+    store_a, store_b = split_stores(data_dir)
+    assert store_a.leases.try_acquire("1") and store_b.leases.try_acquire("2")
+    store_a["1"]["balance"] = 10
+    store_b["2"]["balance"] = 20
+
+    async def flush_both():
+        await asyncio.gather(store_a.flush_async(), store_b.flush_async())
+    asyncio.run(flush_both())
+
+    # Neither write clobbers the other's user or the unowned one
+    assert read_users() == {"1": {"balance": 10}, "2": {"balance": 20}, "3": {"balance": 3}}
+    assert store_a.touched == set() and store_b.touched == set()
+
+def test_save_data_leaves_writing_to_the_interval_flush(data_dir):
+    write_users({"1": {"balance": 1}})
+    store_a, _ = split_stores(data_dir)
+    assert store_a.leases.try_acquire("1")
+    database._store = store_a
+
+    async def command():
+        data = await database.load_data("1")
+        data["users"]["1"]["balance"] = 10
+        await database.save_data(data)
+    asyncio.run(command())
+    assert read_users()["1"]["balance"] == 1
+
+    asyncio.run(store_a.flush_async())
+    assert read_users()["1"]["balance"] == 10
+
+def test_handoff_writes_changes_before_releasing(data_dir):
+    write_users({"1": {"balance": 1}})
+    store_a, store_b = split_stores(data_dir)
+    assert store_a.leases.try_acquire("1")
+    store_a["1"]["balance"] = 10
+    assert not store_b.leases.try_acquire("1")
+
+    database._store = store_a
+    asyncio.run(database.drop_flushed(store_a.leases.wanted()))
+    assert "1" not in store_a.users
+    assert not store_a.owns("1")
+
+    # The new owner picks up the flushed record
+    database._store = store_b
+    assert asyncio.run(database.claim_user("1"))
+    assert store_b["1"]["balance"] == 10
+
+def test_handoff_waits_for_a_command_that_touched_the_user(data_dir):
+    write_users({"1": {"balance": 1}})
+    store_a, store_b = split_stores(data_dir)
+    assert store_a.leases.try_acquire("1")
+    assert not store_b.leases.try_acquire("1")
+    store_a.pin("1")
+    store_a["1"]["balance"] = 10
+
+    database._store = store_a
+    asyncio.run(database.drop_flushed(["1"]))
+    # Pinned users stay with this process until the command is done
+    assert store_a.owns("1")
+    assert read_users()["1"]["balance"] == 10
@@ -0,0 +1,83 @@
+import asyncio
+from cogs.notifications import Notifications
+from config import DataConfig
+from utils import database
+from utils.database import UserStore
+from utils.leases import UserLeases
+from conftest import write_users
+
+class Recipient:
+    def __init__(self, user_id, sent):
+        self.id = user_id
+        self.sent = sent
+
+    async def send(self, content=None, embed=None):
+        self.sent.append(self.id)
+
+class Lookup:
+    def __init__(self, sent):
+        self.sent = sent
+
+    async def get(self, user_id):
+        return Recipient(user_id, self.sent)
+
+class StubBot:
+    def __init__(self):
+        self.sent = []
+        self.outbox = None
+        self.user_lookup = Lookup(self.sent)
+
+def ready_user() -> dict:
+    user = DataConfig.get_default_user_data()
+    user["notify"] = {"mode": "dm"}
+    user["plantings"]["grassland"]["p1"] = {
+        "seed_type": "wheat_seed", "start_time": 0.0, "duration": 1, "amount": 1, "is_fertilized": False
+    }
+    return user
+
+def deliver(cog, store, rebuild=False):
+    database._store = store
+    if rebuild:
+        asyncio.run(cog.rebuild())
+    asyncio.run(cog.deliver_due())
+
+def test_split_leases_notify_each_user_once(data_dir):
+    write_users({"1": ready_user(), "2": ready_user()})
+    leases_a = UserLeases(data_dir / "leases.db", "a")
+    leases_b = UserLeases(data_dir / "leases.db", "b")
+    assert leases_a.try_acquire("1") and leases_b.try_acquire("2")
+    store_a, store_b = UserStore(leases_a), UserStore(leases_b)
+    bot_a, bot_b = StubBot(), StubBot()
+    cog_a, cog_b = Notifications(bot_a), Notifications(bot_b)
+    for store, cog in ((store_a, cog_a), (store_b, cog_b)):
+        store.ownership_listeners.append(cog.ownership_changed)
+
+    deliver(cog_a, store_a, rebuild=True)
+    deliver(cog_b, store_b, rebuild=True)
+    assert bot_a.sent == ["1"]
+    assert bot_b.sent == ["2"]
+
+def test_handoff_moves_notifications(data_dir):
+    write_users({"1": ready_user()})
+    leases_a = UserLeases(data_dir / "leases.db", "a")
+    leases_b = UserLeases(data_dir / "leases.db", "b")
+    store_a, store_b = UserStore(leases_a), UserStore(leases_b)
+    bot_a, bot_b = StubBot(), StubBot()
+    cog_a, cog_b = Notifications(bot_a), Notifications(bot_b)
+    for store, cog in ((store_a, cog_a), (store_b, cog_b)):
+        store.ownership_listeners.append(cog.ownership_changed)
+
+    # A owns user 1 and has them scheduled, then B asks for them
+    database._store = store_a
+    assert leases_a.try_acquire("1")
+    asyncio.run(cog_a.rebuild())
+    assert not leases_b.try_acquire("1")
+    store_a.drop(leases_a.wanted())
+    assert cog_a.scheduled == {}
+
+    database._store = store_b
+    assert asyncio.run(database.claim_user("1"))
+    deliver(cog_a, store_a)
+    deliver(cog_b, store_b)
+    assert bot_a.sent == []
+    assert bot_b.sent == ["1"]
@@ -0,0 +1,38 @@
+import asyncio
+import time
+from utils.outbox import Outbox, FakeHTTPSink, MAX_EMBEDS
+
+class Channel:
+    def __init__(self, channel_id=1):
+        self.id = channel_id
+
+def test_replies_queued_together_share_a_message():
+    async def main():
+        sink = FakeHTTPSink(latency=0)
+        outbox = Outbox(sink)
+        channel = Channel()
+        replies = await asyncio.gather(*(outbox.send(channel, embed=f"embed {i}") for i in range(MAX_EMBEDS + 2)))
+        return sink, replies
+
+    sink, replies = asyncio.run(main())
+    # One full message, then one for the embeds that didn't fit
+    assert [embeds for _, _, _, embeds in sink.requests] == [MAX_EMBEDS, 2]
+    assert replies[0].sent is replies[MAX_EMBEDS - 1].sent
+    assert [reply.index for reply in replies[:3]] == [0, 1, 2]
+
+def test_edits_and_deletes_wait_for_the_rate_limit():
+    async def main():
+        sink = FakeHTTPSink(latency=0, rate_window=0.2)
+        outbox = Outbox(sink, rate_limit=2, rate_window=0.2)
+        channel = Channel()
+        start = time.monotonic()
+        first = await outbox.send(channel, "first")
+        second = await outbox.send(channel, "second")
+        await first.edit(embed="edited")
+        await second.delete()
+        return sink, time.monotonic() - start
+
+    sink, elapsed = asyncio.run(main())
+    assert [method for _, method, _, _ in sink.requests] == ["send", "send", "edit", "delete"]
+    assert sink.rate_limited == 0
+    assert elapsed >= 0.2
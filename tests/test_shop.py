@@ -0,0 +1,16 @@
+from cogs.shop import Shop
+from utils.embeds import embed_cache
+
+def owned_counts(embed) -> list:
+    return [line for field in embed.fields for line in field.value.splitlines() if line.startswith("Owned:")]
+
+def test_items_page_is_filled_per_user():
+    embed_cache.clear()
+    shop = Shop(None)
+    first = shop.items_page({"items": {"watering_can": 7}})
+    second = shop.items_page({"items": {}})
+
+    assert "Owned: 7" in owned_counts(first)
+    assert owned_counts(second) == ["Owned: 0"] * len(second.fields)
+    # The cached template keeps its placeholder
+    assert all("{owned}" in field.value for field in embed_cache.embeds["shop_items"][1].fields)
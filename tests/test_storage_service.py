@@ -0,0 +1,75 @@
+import asyncio
+import pytest
+from storage_service import StorageService
+from utils import database
+from utils.storage_client import RemoteUsers, StorageClient, StorageConflict
+from conftest import write_users, read_users
+
+def run_with_service(data_dir, test):
+    """Serve a StorageService on a temporary socket while `test(client)` runs"""
+    async def main():
+        service = StorageService()
+        socket_path = str(data_dir / "storage.sock")
+        server = await asyncio.start_unix_server(service.handle_client, path=socket_path)
+        client = StorageClient(socket_path)
+        try:
+            async with server:
+                return await test(client, service)
+        finally:
+            client.close()
+    return asyncio.run(main())
+
+def test_conflicting_session_writes_nothing(data_dir):
+    write_users({"1": {"balance": 1}})
+
+    async def test(client, service):
+        first, second = RemoteUsers(client), RemoteUsers(client)
+        await first.prefetch(["1"])
+        await second.prefetch(["1"])
+        first["1"]["balance"] = 10
+        second["1"]["balance"] = 20
+        await first.flush_async()
+        with pytest.raises(StorageConflict) as conflict:
+            await second.flush_async()
+        assert conflict.value.user_ids == ["1"]
+        # The stale copy is dropped, so the next access sees the committed record
+        assert "1" not in second.users
+        await second.prefetch(["1"])
+        assert second["1"]["balance"] == 10
+
+        await service.flush_async()
+    run_with_service(data_dir, test)
+    assert read_users() == {"1": {"balance": 10}}
+
+def test_commands_in_one_process_take_turns(data_dir):
+    write_users({"1": {"balance": 0}})
+
+    async def test(client, service):
+        database._client = client
+
+        async def earn():
+            data = await database.load_data("1")
+            user = data["users"]["1"]
+            await asyncio.sleep(0)  # let the other command try to load the user meanwhile
+            user["balance"] += 5
+            await database.save_data(data)
+
+        await asyncio.gather(*(asyncio.create_task(earn()) for _ in range(5)))
+        return (await database.read_user("1"))["balance"]
+    # No command conflicts and no update is lost
+    assert run_with_service(data_dir, test) == 25
+
+def test_unanswered_request_times_out(data_dir):
+    async def main():
+        async def never_answer(reader, writer):
+            await reader.read()
+
+        socket_path = str(data_dir / "silent.sock")
+        server = await asyncio.start_unix_server(never_answer, path=socket_path)
+        client = StorageClient(socket_path, timeout=0.1)
+        async with server:
+            with pytest.raises(TimeoutError):
+                await client.run(client.get, "1")
+        # The half-read connection is dropped, not reused
+        assert client.sock is None
+    asyncio.run(main())
@@ -0,0 +1,24 @@
+from utils.database import UserStore
+from conftest import write_users, read_users
+
+def test_tiny_budget_keeps_the_returned_record(data_dir):
+    write_users({"1": {"balance": 1}, "2": {"balance": 2}})
+    # Every record is over budget, so anything but the one in use is evicted
+    store = UserStore(budget=1)
+    user = store["1"]
+    user["balance"] = 10
+    store["2"]["balance"] = 20
+    store.flush()
+    assert read_users() == {"1": {"balance": 10}, "2": {"balance": 20}}
+
+def test_evicted_changes_round_trip(data_dir):
+    write_users({"1": {"balance": 1}, "2": {"balance": 2}, "3": {"balance": 3}})
+    store = UserStore(budget=1)
+    store["1"]["balance"] = 10
+    store["2"]["balance"] = 20
+    # User 1 was spilled unsaved; reading it back brings the change with it
+    assert "1" in store.spilled
+    assert store.peek("1")["balance"] == 10
+    store.flush()
+    assert store.spilled == {}
+    assert read_users() == {"1": {"balance": 10}, "2": {"balance": 20}, "3": {"balance": 3}}
@@ -0,0 +1,86 @@
+"""
+Command coalescing for The Farmer.
+Players often fire the same command many times in a row. While one run of a
+command is in flight for a user, further calls with the same key queue up and
+are handled together as the next batch: one load, one save and one reply edit
+instead of one of each per call.
+"""
+
+import asyncio
+from utils import metrics
+
+class _Lead:
+    """Resolves a waiting caller's future to make it run the next batch"""
+
+    def __init__(self, state):
+        self.state = state
+
+class Coalescer:
+    """Runs one batch at a time per key; calls arriving meanwhile join the next batch.
+
+    Each batch is run by one of its own callers, which hands the run on to a
+    caller of the following batch when it is done, so no caller keeps working
+    for others once its own command is answered.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pending = {}  # key -> (item, future) pairs waiting for the next batch
+        self.running = set()
+
+    async def submit(self, key, item, handler):
+        """Queue an item and, unless a batch for the key is running, process its batch.
+
+        handler(items, state) handles one batch and returns the state passed to
+        the next batch of the same run (e.g. the reply message to edit).
+        Returns once the item's batch is handled, raising whatever the handler
+        raised for it, so every merged command fails like it would have alone.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.pending.setdefault(key, []).append((item, future))
+        if key in self.running:
+            # The batch running now hands over to us or finishes our item
+            metrics.coalesced_commands.inc(self.name)
+            try:
+                lead = await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled() and isinstance(future.result(), _Lead):
+                    # Cancelled just as we took over; pass the run on
+                    self._hand_off(key, future.result().state)
+                raise
+            if not isinstance(lead, _Lead):
+                return
+            state = lead.state
+        else:
+            self.running.add(key)
+            state = None
+
+        batch = self.pending.pop(key)
+        error = None
+        try:
+            state = await handler([item for item, _ in batch], state)
+        except asyncio.CancelledError:
+            for _, waiter in batch:
+                waiter.cancel()
+            self._hand_off(key, None)
+            raise
+        except Exception as e:
+            error = e
+        for _, waiter in batch:
+            if waiter is not future and not waiter.done():
+                if error is not None:
+                    waiter.set_exception(error)
+                else:
+                    waiter.set_result(None)
+        self._hand_off(key, state)
+        if error is not None:
+            raise error
+
+    def _hand_off(self, key, state):
+        """Let the first caller still waiting for the key run the next batch, or end the run"""
+        waiting = [(item, waiter) for item, waiter in self.pending.pop(key, []) if not waiter.done()]
+        if waiting:
+            self.pending[key] = waiting
+            waiting[0][1].set_result(_Lead(state))
+        else:
+            self.running.discard(key)
@@ -0,0 +1,83 @@
+"""
+Background compaction for The Farmer.
+Walks every user a little at a time, pruning expired effects, zero-count items
+and mutations and plantings of removed seeds (see engine/compaction.py). Each
+tick works for at most a few milliseconds and skips users with a command in
+flight, so commands never wait on it.
+"""
+
+import asyncio
+import time
+import engine
+from config.snapshot import get_snapshot
+from utils import metrics
+from utils.database import UserStore, get_store, load_data, lock_users, read_users, release_users, save_data
+
+# Users fetched ahead of each tick from the storage service
+PREFETCH = 64
+
+class Compactor:
+    def __init__(self, interval: float = 1.0, budget: float = 0.005):
+        self.interval = interval  # seconds between ticks
+        self.budget = budget  # seconds of work per tick
+        self.pending = []  # user IDs left in the current pass
+        self.pass_users = 0
+        self.pass_bytes = 0
+
+    async def tick(self):
+        """Compact users until the time budget runs out"""
+        if not self.pending:
+            self.pending = list(await read_users(["balance"]))
+            self.pending.reverse()  # pop() from the end walks the users in order
+        # Users another task is changing are left alone this pass
+        batch = await lock_users(self.pending[-PREFETCH:], wait=False)
+        data = await load_data(*batch)
+        users = data["users"]
+        deadline = time.perf_counter() + self.budget
+
+        now = time.time()
+        config = get_snapshot()
+        pins = get_store().pins
+        if isinstance(users, UserStore):
+            left, busy = len(self.pending), ()
+        else:
+            # Remote users past the prefetched ones would be fetched on the event loop
+            left, busy = PREFETCH, set(self.pending[-PREFETCH:]) - set(batch)
+        changed = False
+        while self.pending and left > 0 and time.perf_counter() < deadline:
+            left -= 1
+            user_id = self.pending.pop()
+            if user_id in pins or user_id in busy:
+                continue
+            user = users.get_uncached(user_id)
+            if user is None:
+                continue
+            result = engine.compact_user(user, now, config)
+            if result.changed:
+                users.put_uncached(user_id, user)
+                changed = True
+                self.pass_users += 1
+                self.pass_bytes += result.bytes_reclaimed
+                metrics.compacted_users.inc()
+                metrics.compaction_bytes.inc(amount=result.bytes_reclaimed)
+
+        # put_uncached() left the local store's changes marked for its regular flush
+        # (the next save, or maintain_leases() with leases), so the tick never writes
+        # the data file; only a storage service session has to be committed
+        if changed and not isinstance(users, UserStore):
+            await save_data(data)
+        if not self.pending and self.pass_users:
+            print(f"Compaction pass done: {self.pass_users} users cleaned up, ~{self.pass_bytes:,} bytes reclaimed")
+            self.pass_users = 0
+            self.pass_bytes = 0
+
+    async def run(self):
+        """Background task: one tick per interval"""
+        while True:
+            try:
+                await self.tick()
+            except Exception as e:
+                print(f"Error compacting user data: {e}")
+            finally:
+                release_users()
+            await asyncio.sleep(self.interval)
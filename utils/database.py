@@ -1,36 +1,712 @@
 """
 Database utilities for The Farmer.
 This module handles all database operations like loading and saving data.
+
+User records are kept in memory by a UserStore and written back to the JSON
+file on save. In a single process the store owns every user. In a sharded
+deployment each process only caches users it holds a lease for (see
+utils/leases.py) and merges just those users back into the shared file.
+With a cache budget (and no leases) only recently used users stay in memory;
+the rest are read from the file on demand through utils/user_file.py.
+With a storage service (storage_service.py) the records live in that process
+instead and every load_data() call works on its own fetched copies.
 """
 
+import asyncio
+import copy
 import json
+import os
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
 from config import DataConfig
+from utils import metrics
+from utils.readonly import ReadOnlyView
+from utils.storage_client import RemoteUsers
+from utils.user_file import SUMMARY_FIELDS, UserFile, encode
+
+try:
+    import fcntl
+except ImportError:  # Windows has no fcntl; sharded mode needs a POSIX host
+    fcntl = None
 
-def load_data():
-    """Load farming data from JSON file"""
+def read_data_file():
+    """Read the farm data file"""
     try:
         if DataConfig.FARM_DATA_FILE.exists():
-            with open(DataConfig.FARM_DATA_FILE, "r") as f:
-                return json.load(f)
+            with metrics.storage_latency.time("read_file"):
+                with open(DataConfig.FARM_DATA_FILE, "r") as f:
+                    text = f.read()
+                metrics.record_io("read", len(text))
+                return json.loads(text)
         return {"users": {}}
     except Exception as e:
         print(f"Error loading data: {e}")
         return {"users": {}}
 
-def save_data(data):
-    """Save farming data to JSON file"""
+def write_data_file(data):
+    """Write the farm data file atomically"""
     try:
         # Ensure data directory exists
         DataConfig.DATA_DIR.mkdir(exist_ok=True)
-        
-        with open(DataConfig.FARM_DATA_FILE, "w") as f:
-            json.dump(data, f, indent=2)
+
+        with metrics.storage_latency.time("write_file"):
+            text = json.dumps(data, indent=2)
+            tmp_file = DataConfig.FARM_DATA_FILE.with_suffix(".tmp")
+            with open(tmp_file, "w") as f:
+                f.write(text)
+            os.replace(tmp_file, DataConfig.FARM_DATA_FILE)
+        metrics.record_io("write", len(text))
     except Exception as e:
         print(f"Error saving data: {e}")
 
+@contextmanager
+def data_file_lock():
+    """Hold an exclusive lock on the farm data file across processes"""
+    if fcntl is None:
+        yield
+        return
+    DataConfig.DATA_DIR.mkdir(exist_ok=True)
+    with open(DataConfig.DATA_DIR / "farm_data.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def merge_into_data_file(changes: dict):
+    """Write some users (None deletes) into the latest data file, keeping everyone else's"""
+    with data_file_lock():
+        data = read_data_file()
+        for user_id, user in changes.items():
+            if user is None:
+                data["users"].pop(user_id, None)
+            else:
+                data["users"][user_id] = user
+        write_data_file(data)
+
+class UserStore(MutableMapping):
+    """In-memory user records backed by the farm data file.
+
+    Without leases the process owns every user and the whole file is cached on
+    first use. With leases only owned users are cached and written back; other
+    users are read from the file and handed out as copies. Owned users are
+    written by flush_async() on a writer thread, batched once per interval by
+    maintain_leases(), rather than on every save.
+
+    With a partition (shard_count, shard_ids), e.g. when records live in the
+    storage service, the process owns the users whose ID modulo shard_count is
+    one of its shards. Ownership decides which process runs per-user background
+    work such as notifications.
+
+    With a budget (in bytes of serialized records) and no leases, the least
+    recently used users beyond the budget are dropped from memory and read back
+    from the file when needed. Evicted users with unsaved changes are kept as
+    JSON until the next flush writes them.
+    """
+
+    def __init__(self, leases=None, budget=None, partition=None):
+        self.leases = leases
+        self.budget = budget
+        self.partition = partition
+        self.file = UserFile() if budget and leases is None else None
+        self.users = OrderedDict() if self.file is not None else {}
+        self.loaded = False
+        self.touched = set()
+        self.deleted = set()
+        self.last_access = {}
+        self.pins = {}
+        self.ownership_listeners = []  # called with (user IDs, owned) when users change hands
+        self.sizes = {}  # user id -> serialized size, with a budget
+        self.resident_bytes = 0
+        self.spilled = {}  # evicted unsaved users -> encode() output
+        self._disk = None
+        self._disk_stamp = None
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="flush") if leases is not None else None
+
+    def _disk_users(self) -> dict:
+        """Get the users stored on disk, re-reading the file only when it changed"""
+        try:
+            stat = DataConfig.FARM_DATA_FILE.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if self._disk is None or stamp != self._disk_stamp:
+            self._disk = read_data_file().get("users", {})
+            self._disk_stamp = stamp
+        return self._disk
+
+    def warm(self):
+        """Load every user this process may cache"""
+        if self.file is not None:
+            # Index the whole file but only keep what fits in the budget
+            self.loaded = True
+            try:
+                for user_id, user, size in self.file.scan():
+                    if user_id not in self.users and self.resident_bytes + size <= self.budget:
+                        self.users[user_id] = user
+                        self._resize(user_id, size)
+            except Exception as e:
+                print(f"Error loading data: {e}")
+            return
+
+        disk_users = self._disk_users()
+        self.loaded = True
+        if self.leases is None:
+            for user_id, user in disk_users.items():
+                self.users.setdefault(user_id, user)
+            # The cache is authoritative from now on
+            self._disk = None
+            return
+        for user_id in self.leases.held:
+            if user_id not in self.users and user_id in disk_users:
+                self.users[user_id] = copy.deepcopy(disk_users[user_id])
+
+    def owns(self, user_id) -> bool:
+        """Check if this process may cache and write a user"""
+        if self.leases is not None:
+            return self.leases.holds(user_id)
+        if self.partition is not None:
+            shard_count, shard_ids = self.partition
+            return int(user_id) % shard_count in shard_ids
+        return True
+
+    def owned_elsewhere(self, user_id) -> bool:
+        """Check if another process owns a user (a released lease nobody took over doesn't count)"""
+        if self.leases is not None:
+            return self.leases.owner_of(user_id) not in (None, self.leases.owner)
+        return not self.owns(user_id)
+
+    def ownership_changed(self, user_ids, owned: bool):
+        """Tell listeners this process took over (or gave up) some users"""
+        for listener in self.ownership_listeners:
+            listener(user_ids, owned)
+
+    def pin(self, user_id):
+        """Keep a user from being handed off while a command is using it"""
+        self.pins[user_id] = self.pins.get(user_id, 0) + 1
+
+    def unpin(self, user_id):
+        if self.pins.get(user_id, 0) <= 1:
+            self.pins.pop(user_id, None)
+        else:
+            self.pins[user_id] -= 1
+
+    def _resize(self, user_id, size: int):
+        self.resident_bytes += size - self.sizes.get(user_id, 0)
+        self.sizes[user_id] = size
+
+    def _load_cold(self, user_id) -> dict:
+        """Bring an evicted user back into memory (budget mode)"""
+        if user_id in self.spilled:
+            raw, _ = self.spilled.pop(user_id)
+            # Still unsaved
+            self.touched.add(user_id)
+        elif user_id in self.file.index:
+            raw = self.file.read_raw(user_id)
+        else:
+            raise KeyError(user_id)
+        user = self.users[user_id] = json.loads(raw)
+        self._resize(user_id, len(raw))
+        return user
+
+    def _read(self, user_id) -> dict:
+        """Get any user's record for reading without caching it (budget mode)"""
+        if user_id in self.users:
+            return self.users[user_id]
+        if user_id in self.spilled:
+            return json.loads(self.spilled[user_id][0])
+        return json.loads(self.file.read_raw(user_id))
+
+    def evict(self, keep=None):
+        """Drop least recently used users until the cache fits in its budget,
+        except `keep`, a record just handed to the caller"""
+        if self.file is None:
+            return
+        while self.resident_bytes > self.budget:
+            # Users with a command in flight stay
+            user_id = next((user_id for user_id in self.users if user_id not in self.pins and user_id != keep), None)
+            if user_id is None:
+                return
+            user = self.users.pop(user_id)
+            self.resident_bytes -= self.sizes.pop(user_id, 0)
+            self.last_access.pop(user_id, None)
+            if user_id in self.touched:
+                self.spilled[user_id] = encode(user)
+                self.touched.discard(user_id)
+            metrics.evicted_users.inc()
+
+    def __getitem__(self, user_id):
+        if not self.loaded:
+            self.warm()
+        if user_id in self.users:
+            metrics.cache_requests.inc("hit")
+            if self.file is not None:
+                self.users.move_to_end(user_id)
+        else:
+            metrics.cache_requests.inc("miss")
+            if user_id in self.deleted:
+                raise KeyError(user_id)
+            if self.file is not None:
+                self._load_cold(user_id)
+            elif self.leases is None:
+                raise KeyError(user_id)
+            else:
+                disk_user = self._disk_users()[user_id]
+                if not self.owns(user_id):
+                    # Read-only copy; the owning process holds the live record
+                    return copy.deepcopy(disk_user)
+                self.users[user_id] = copy.deepcopy(disk_user)
+        self.touched.add(user_id)
+        self.last_access[user_id] = time.time()
+        user = self.users[user_id]
+        # Evicting the record being returned would lose the caller's changes to it
+        self.evict(keep=user_id)
+        return user
+
+    def peek(self, user_id):
+        """Get a user's record for reading only, or None; it is neither copied nor marked for saving"""
+        if not self.loaded:
+            self.warm()
+        if user_id in self.users:
+            metrics.cache_requests.inc("hit")
+            if self.file is not None:
+                self.users.move_to_end(user_id)
+            return self.users[user_id]
+        metrics.cache_requests.inc("miss")
+        if user_id in self.deleted:
+            return None
+        if self.file is not None:
+            if user_id not in self.spilled and user_id not in self.file.index:
+                return None
+            user = self._load_cold(user_id)
+            self.evict(keep=user_id)
+            return user
+        if self.leases is None:
+            return None
+        return self._disk_users().get(user_id)
+
+    def get_uncached(self, user_id):
+        """Get a cached or (with a budget) stored record without loading it into the cache
+        or marking it touched, or None. Assign it back to save changes."""
+        if not self.loaded:
+            self.warm()
+        if user_id in self.deleted:
+            return None
+        if user_id in self.users:
+            return self.users[user_id]
+        if self.file is not None and user_id in self:
+            return self._read(user_id)
+        return None
+
+    def put_uncached(self, user_id, user):
+        """Save a record from get_uncached() on the next flush without caching it
+        or making it recently used, so background jobs leave the LRU order alone"""
+        if not self.owns(user_id):
+            raise RuntimeError(f"User {user_id} is owned by another process")
+        if user_id in self.users:
+            self.users[user_id] = user
+            self.touched.add(user_id)
+            if self.file is not None:
+                self._resize(user_id, len(encode(user)[0]))
+        elif self.file is not None:
+            # Cold user: kept as JSON until the next flush writes it
+            self.spilled[user_id] = encode(user)
+        else:
+            self[user_id] = user
+
+    def readable(self) -> dict:
+        """Every user for reading only, without copying records"""
+        if not self.loaded:
+            self.warm()
+        if self.leases is None and self.file is None:
+            return self.users
+        return dict(self.items())
+
+    def scan(self, fields) -> dict:
+        """Selected fields of every user, like the storage service's scan"""
+        if not self.loaded:
+            self.warm()
+        if self.file is not None and all(field in SUMMARY_FIELDS for field in fields):
+            # Cold users' values come from the file index
+            users = (
+                (user_id, self.users[user_id] if user_id in self.users else
+                 self.spilled[user_id][1] if user_id in self.spilled else
+                 self.file.index[user_id][2])
+                for user_id in self._keys()
+            )
+        else:
+            users = self.items()
+        return {
+            user_id: {field: user[field] for field in fields if field in user}
+            for user_id, user in users
+        }
+
+    def __setitem__(self, user_id, user):
+        if not self.owns(user_id):
+            raise RuntimeError(f"User {user_id} is owned by another process")
+        self.users[user_id] = user
+        self.deleted.discard(user_id)
+        self.touched.add(user_id)
+        self.last_access[user_id] = time.time()
+        if self.file is not None:
+            self.users.move_to_end(user_id)
+            self.spilled.pop(user_id, None)
+            self._resize(user_id, len(encode(user)[0]))
+            self.evict(keep=user_id)
+
+    def __delitem__(self, user_id):
+        if not self.owns(user_id):
+            raise RuntimeError(f"User {user_id} is owned by another process")
+        if user_id not in self:
+            raise KeyError(user_id)
+        self.users.pop(user_id, None)
+        self.last_access.pop(user_id, None)
+        self.spilled.pop(user_id, None)
+        self.resident_bytes -= self.sizes.pop(user_id, 0)
+        self.deleted.add(user_id)
+        self.touched.add(user_id)
+
+    def __contains__(self, user_id):
+        if not self.loaded:
+            self.warm()
+        if user_id in self.users:
+            return True
+        if user_id in self.deleted:
+            return False
+        if self.file is not None:
+            return user_id in self.spilled or user_id in self.file.index
+        if self.leases is None:
+            return False
+        return user_id in self._disk_users()
+
+    def _keys(self):
+        if not self.loaded:
+            self.warm()
+        if self.file is not None:
+            keys = dict.fromkeys(self.file.index)
+            keys.update(dict.fromkeys(self.spilled))
+            keys.update(dict.fromkeys(self.users))
+            return [user_id for user_id in keys if user_id not in self.deleted]
+        if self.leases is None:
+            return list(self.users)
+        keys = dict.fromkeys(self._disk_users())
+        keys.update(dict.fromkeys(self.users))
+        return [user_id for user_id in keys if user_id not in self.deleted]
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self):
+        return len(self._keys())
+
+    def items(self):
+        """Iterate over all users for reading, without marking them as touched"""
+        if self.file is not None:
+            # Cold users are read one at a time and not cached
+            return ((user_id, self._read(user_id)) for user_id in self._keys())
+        disk_users = self._disk_users() if self.leases is not None else {}
+        return [
+            (user_id, self.users[user_id] if user_id in self.users else disk_users[user_id])
+            for user_id in self._keys()
+        ]
+
+    def values(self):
+        return [user for _, user in self.items()]
+
+    def flush(self, user_ids=None):
+        """Write touched (or the given) owned users back to the data file"""
+        if user_ids is None:
+            user_ids = self.touched
+        user_ids = [user_id for user_id in user_ids if self.owns(user_id)]
+        self.touched.difference_update(user_ids)
+        if self.file is not None:
+            self._flush_file(user_ids)
+            return
+        if not user_ids:
+            return
+
+        if self.leases is None:
+            with data_file_lock():
+                write_data_file({"users": self.users})
+        else:
+            merge_into_data_file({
+                user_id: None if user_id in self.deleted else self.users[user_id]
+                for user_id in user_ids if user_id in self.deleted or user_id in self.users
+            })
+        self.deleted.difference_update(user_ids)
+
+    async def flush_async(self, user_ids=None):
+        """Lease mode: merge touched (or just the given touched) users into the data file
+        on the writer thread, so the event loop never reads or writes the whole file"""
+        loop = asyncio.get_running_loop()
+        user_ids = [
+            user_id for user_id in (self.touched if user_ids is None else user_ids)
+            if user_id in self.touched and self.owns(user_id)
+        ]
+        if not user_ids:
+            # A write queued earlier may still hold these users; wait for it so the
+            # file is up to date before a caller hands them over
+            await loop.run_in_executor(self.writer, lambda: None)
+            return
+        self.touched.difference_update(user_ids)
+        # Copy on the loop; commands keep changing the live records during the write
+        changes = {
+            user_id: None if user_id in self.deleted else copy.deepcopy(self.users[user_id])
+            for user_id in user_ids if user_id in self.deleted or user_id in self.users
+        }
+        try:
+            await loop.run_in_executor(self.writer, merge_into_data_file, changes)
+        except Exception:
+            # Written again by the next flush
+            self.touched.update(user_ids)
+            raise
+        self.deleted.difference_update(user_id for user_id, user in changes.items() if user is None)
+
+    def _flush_file(self, user_ids):
+        """Budget mode: rewrite the file with changed and spilled users"""
+        if not user_ids and not self.spilled:
+            return
+        changed = dict(self.spilled)
+        for user_id in user_ids:
+            if user_id in self.users:
+                changed[user_id] = encode(self.users[user_id])
+                self._resize(user_id, len(changed[user_id][0]))
+        with data_file_lock():
+            self.file.write(changed, self.deleted)
+        self.spilled.clear()
+        self.deleted.clear()
+        self.evict()
+
+    def drop(self, user_ids, handoff: bool = True):
+        """Flush users, remove them from the cache and release their leases.
+
+        Idle users (handoff=False) stay with this process until someone else takes them.
+        """
+        user_ids = list(user_ids)
+        self.flush([user_id for user_id in user_ids if user_id in self.touched])
+        for user_id in user_ids:
+            self.users.pop(user_id, None)
+            self.last_access.pop(user_id, None)
+            self.touched.discard(user_id)
+        if self.leases is not None:
+            self.leases.release(user_ids)
+            if handoff:
+                self.ownership_changed(user_ids, False)
+
+    def forget(self, user_ids):
+        """Drop cached users without writing them (their lease was lost)"""
+        for user_id in user_ids:
+            self.users.pop(user_id, None)
+            self.last_access.pop(user_id, None)
+            self.touched.discard(user_id)
+
+_store = UserStore()
+_client = None
+_user_locks = weakref.WeakValueDictionary()  # user id -> asyncio.Lock, with the storage service
+_held_locks = {}  # task -> {user id: lock} it loaded for writing
+
+def configure_storage(leases=None, client=None, budget=None, partition=None):
+    """Set up the user store, optionally partitioned by ownership leases or by shard,
+    limited to a memory budget in bytes or backed by the storage service"""
+    global _store, _client
+    _store = UserStore(leases, budget, partition)
+    _client = client
+    return _store
+
+def get_store():
+    """Get the active user store"""
+    return _store
+
+def warm_storage():
+    """Load farm data into memory ahead of the first command"""
+    if _client is not None:
+        _client.connect()
+    else:
+        _store.warm()
+
+async def lock_users(user_ids, wait: bool = True) -> list:
+    """Keep other tasks in this process from loading users until release_users().
+
+    Only the storage service needs this; the local store is shared by every task.
+    Without waiting, users locked by another task are skipped. Returns the users
+    the current task holds.
+    """
+    if _client is None:
+        return list(user_ids)
+    held = _held_locks.setdefault(asyncio.current_task(), {})
+    for user_id in sorted(set(user_ids) - set(held)):
+        lock = _user_locks.get(user_id)
+        if lock is None:
+            lock = _user_locks[user_id] = asyncio.Lock()
+        if not wait and lock.locked():
+            continue
+        await lock.acquire()
+        held[user_id] = lock
+    return [user_id for user_id in user_ids if user_id in held]
+
+def release_users():
+    """Release the users the current task loaded; called once a command is done"""
+    for lock in _held_locks.pop(asyncio.current_task(), {}).values():
+        lock.release()
+
+async def load_data(*user_ids):
+    """Load farming data, fetching the given users ahead of time.
+
+    With the storage service other users are fetched on first access, which
+    blocks, so commands name every user they will change. Those users stay
+    locked to this task until save_data() or the end of the command, so two
+    commands in one process never race each other into a conflict.
+    """
+    with metrics.storage_latency.time("load"):
+        if _client is not None:
+            await lock_users(user_ids)
+            users = RemoteUsers(_client)
+            await users.prefetch(user_ids)
+            return {"users": users}
+        return {"users": _store}
+
+async def save_data(data):
+    """Save farming data"""
+    users = data.get("users")
+    with metrics.storage_latency.time("save"):
+        if isinstance(users, RemoteUsers):
+            try:
+                await users.flush_async()
+            finally:
+                release_users()
+        elif isinstance(users, UserStore):
+            if users.leases is None:
+                users.flush()
+            # With leases, maintain_leases() writes changed users once per interval
+        else:
+            # Plain dicts (e.g. from old scripts) replace the stored users wholesale
+            for user_id, user in users.items():
+                _store[user_id] = user
+            _store.flush()
+
+async def read_user(user_id):
+    """Get a read-only view of a user's record, or None if they haven't farmed yet.
+
+    Nothing is loaded for writing or saved, so query commands can use it freely.
+    """
+    with metrics.storage_latency.time("read"):
+        if _client is not None:
+            _, record = await _client.run(_client.get, user_id)
+        else:
+            record = _store.peek(user_id)
+    return None if record is None else ReadOnlyView(record)
+
+async def read_user_data(user_id):
+    """Read-only get_user_data: new users get a default record that isn't saved"""
+    return await read_user(user_id) or ReadOnlyView(DataConfig.get_default_user_data())
+
+async def read_users(fields=None):
+    """Read-only view of every user's record, or just the given fields of it"""
+    with metrics.storage_latency.time("read"):
+        if _client is not None:
+            return ReadOnlyView(await _client.run(_client.scan, fields))
+        if fields:
+            return ReadOnlyView(_store.scan(fields))
+        return ReadOnlyView(_store.readable())
+
+def collect_metrics():
+    """Update the user cache gauges; registered as a metrics collector"""
+    metrics.cached_users.set(value=len(_store.users))
+    metrics.cached_user_bytes.set(value=_store.resident_bytes)
+    hits = metrics.cache_requests.get("hit")
+    lookups = hits + metrics.cache_requests.get("miss")
+    if lookups:
+        metrics.user_cache_hit_ratio.set(value=hits / lookups)
+
 def get_user_data(user_id, data):
-    """Get user data, creating default structure if needed"""
+    """Get user data, creating default structure if needed (saved with the command's save_data)"""
     if user_id not in data["users"]:
         data["users"][user_id] = DataConfig.get_default_user_data()
-        save_data(data)
-    return data["users"][user_id] 
\ No newline at end of file
+    return data["users"][user_id]
+
+# Slash commands must be answered within 3 seconds, including the "busy" reply
+INTERACTION_CLAIM_TIMEOUT = 2.0
+
+async def claim_user(user_id: str, timeout: float = 5.0) -> bool:
+    """Make sure this process owns a user, waiting for a handoff if needed"""
+    leases = _store.leases
+    if leases is None or leases.holds(user_id):
+        return True
+
+    deadline = time.time() + timeout
+    while True:
+        if leases.try_acquire(user_id):
+            # Drop any stale copy and pick up what the previous owner flushed
+            _store.forget([user_id])
+            _store.ownership_changed([user_id], True)
+            return True
+        if time.time() >= deadline:
+            return False
+        await asyncio.sleep(0.1)
+
+@asynccontextmanager
+async def unpinned(user_id: str):
+    """Let a command's user be handed off while it waits on the player.
+
+    Afterwards the user is pinned again, but this process may no longer own
+    them, so call claim_user() before changing their record (and load it again).
+    """
+    release_users()
+    _store.unpin(user_id)
+    try:
+        yield
+    finally:
+        _store.pin(user_id)
+
+async def drop_flushed(user_ids, handoff: bool = True):
+    """Write users on the writer thread, then drop the ones still idle"""
+    await _store.flush_async(user_ids)
+    # Users a command picked up (and maybe changed) during the write wait for the next round
+    user_ids = [user_id for user_id in user_ids if user_id not in _store.pins and user_id not in _store.touched]
+    if user_ids:
+        _store.drop(user_ids, handoff)
+
+async def maintain_leases(interval: float = 0.5, renew_every: float = 10.0, idle_release: float = 600.0,
+                          flush_every: float = 1.0):
+    """Background task: save changed users, hand over wanted users, renew leases and release idle users"""
+    leases = _store.leases
+    if leases is None:
+        return
+
+    last_renew = 0
+    last_flush = 0
+    while True:
+        try:
+            now = time.time()
+            if now - last_flush >= flush_every:
+                last_flush = now
+                await _store.flush_async()
+
+            # Users with a command in flight are handed over once it finishes
+            wanted = [user_id for user_id in leases.wanted() if user_id not in _store.pins]
+            if wanted:
+                await drop_flushed(wanted)
+
+            now = time.time()
+            if now - last_renew >= renew_every:
+                last_renew = now
+                lost = leases.renew()
+                if lost:
+                    print(f"Lost ownership of {len(lost)} users")
+                    _store.forget(lost)
+                    _store.ownership_changed(lost, False)
+
+                idle = [
+                    user_id for user_id, accessed in list(_store.last_access.items())
+                    if now - accessed > idle_release and user_id not in _store.pins
+                ]
+                if idle:
+                    await drop_flushed(idle, handoff=False)
+        except Exception as e:
+            print(f"Error maintaining user leases: {e}")
+
+        await asyncio.sleep(interval)
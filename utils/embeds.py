@@ -1,5 +1,29 @@
+import copy
 from discord import Embed
 from config import Colors
+from config.snapshot import get_snapshot
+
+class EmbedCache:
+    """Prebuilt embeds for static pages, rebuilt when the game config version changes"""
+
+    def __init__(self):
+        self.embeds = {}
+
+    def get(self, key: str, builder) -> Embed:
+        """Get a copy of a cached embed, building it with builder() if needed"""
+        version = get_snapshot().version
+        cached = self.embeds.get(key)
+        if cached is None or cached[0] != version:
+            cached = (version, builder())
+            self.embeds[key] = cached
+        # Callers may add per-user details, so never hand out the template itself.
+        # Embed.copy() shares the field dicts, so copy those too.
+        return Embed.from_dict(copy.deepcopy(cached[1].to_dict()))
+
+    def clear(self):
+        self.embeds.clear()
+
+embed_cache = EmbedCache()
 
 def error_embed(title: str, description: str) -> Embed:
     """Create an error embed"""
@@ -42,7 +66,7 @@ def confirmation_embed(title: str, description: str, value: int = None) -> Embed
     
     embed.add_field(
         name="Confirmation",
-        value="React with ✅ to confirm\nReact with ❌ to cancel",
+        value="Click the ✅ button to confirm\nClick the ❌ button to cancel",
         inline=True
     )
     
@@ -0,0 +1,95 @@
+"""
+Garden rendering for The Farmer.
+Groups plantings by seed and readiness bucket so a garden page stays small
+no matter how many plots a biome has.
+"""
+
+from config import EmojiConfig
+
+# Upper bound (seconds) and label of each "still growing" bucket
+READINESS_BUCKETS = [
+    (30, "≤30s"),
+    (60, "≤1m"),
+    (300, "≤5m"),
+    (900, "≤15m"),
+    (3600, "≤1h")
+]
+LATER_LABEL = ">1h"
+
+# Discord allows 4096 characters per embed description; leave room for headers
+MAX_PAGE_CHARS = 3500
+MAX_PAGE_LINES = 12
+
+class GardenSummary:
+    """Planting counts per seed and readiness bucket, filled in one pass"""
+
+    def __init__(self):
+        self.seeds = {}
+        self.total = 0
+        self.ready = 0
+        self.next_ready = None
+
+    def add(self, seed_type: str, remaining: float, amount: int = 1):
+        """Count a planting that needs `remaining` more seconds (0 or less = ready)"""
+        # counts[0] is ready, then one slot per bucket, then the "later" slot
+        entry = self.seeds.get(seed_type)
+        if entry is None:
+            entry = self.seeds[seed_type] = {"counts": [0] * (len(READINESS_BUCKETS) + 2), "next": None}
+
+        self.total += amount
+        if remaining <= 0:
+            entry["counts"][0] += amount
+            self.ready += amount
+            return
+
+        slot = len(READINESS_BUCKETS) + 1
+        for index, (limit, _) in enumerate(READINESS_BUCKETS, start=1):
+            if remaining <= limit:
+                slot = index
+                break
+        entry["counts"][slot] += amount
+        if entry["next"] is None or remaining < entry["next"]:
+            entry["next"] = remaining
+        if self.next_ready is None or remaining < self.next_ready:
+            self.next_ready = remaining
+
+    def header(self) -> str:
+        text = f"✅ {self.ready}/{self.total} ready"
+        if self.next_ready is not None:
+            text += f" • next in {int(self.next_ready) + 1}s"
+        return text
+
+    def lines(self) -> list:
+        """One line per seed, seeds with the most ready crops first"""
+        labels = [label for _, label in READINESS_BUCKETS] + [LATER_LABEL]
+        lines = []
+        for seed_type, entry in sorted(self.seeds.items(), key=lambda x: (-x[1]["counts"][0], x[0])):
+            crop_name = seed_type.replace("_seed", "")
+            counts = entry["counts"]
+            parts = []
+            if counts[0]:
+                parts.append(f"×{counts[0]} ready")
+            for count, label in zip(counts[1:], labels):
+                if count:
+                    parts.append(f"×{count} in {label}")
+            if entry["next"] is not None:
+                parts.append(f"next {int(entry['next']) + 1}s")
+            emoji = EmojiConfig.EMOJI_MAP.get(crop_name, "🌱")
+            lines.append(f"{emoji} **{crop_name.replace('_', ' ').title()}** {', '.join(parts)}")
+        return lines
+
+    def pages(self) -> list:
+        """Split the lines into description-sized pages"""
+        pages = []
+        current = []
+        size = 0
+        for line in self.lines():
+            if current and (len(current) >= MAX_PAGE_LINES or size + len(line) + 1 > MAX_PAGE_CHARS):
+                pages.append("\n".join(current))
+                current = []
+                size = 0
+            current.append(line)
+            size += len(line) + 1
+        if current:
+            pages.append("\n".join(current))
+        return pages
@@ -0,0 +1,111 @@
+"""
+User ownership leases for The Farmer.
+This module lets several bot processes agree on which one owns (and caches) each user record.
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+
+class UserLeases:
+    """Cross-process ownership of user records, kept in a shared SQLite database.
+
+    A process may only cache and write back users it holds a lease for. When a
+    user shows up on a shard served by another process, the newcomer marks the
+    lease as wanted; the owner flushes the user, releases the lease and the
+    newcomer takes it over. Leases of crashed processes simply expire.
+    """
+
+    def __init__(self, db_path, owner: str, ttl: float = 60):
+        self.owner = owner
+        self.ttl = ttl
+        self.held = set()
+
+        db_path = Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(db_path), timeout=5, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS leases (
+                user_id TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires REAL NOT NULL,
+                wanted_by TEXT
+            )
+        """)
+
+    def holds(self, user_id: str) -> bool:
+        """Check if this process currently owns a user"""
+        return user_id in self.held
+
+    def try_acquire(self, user_id: str) -> bool:
+        """Take the lease for a user if it is free, expired or already ours.
+
+        If another process holds it, ask that process to hand it over and return False.
+        """
+        now = time.time()
+        cur = self.conn.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            row = cur.execute("SELECT owner, expires FROM leases WHERE user_id = ?", (user_id,)).fetchone()
+            if row is None or row[0] == self.owner or row[1] < now:
+                cur.execute(
+                    "INSERT OR REPLACE INTO leases (user_id, owner, expires, wanted_by) VALUES (?, ?, ?, NULL)",
+                    (user_id, self.owner, now + self.ttl)
+                )
+                acquired = True
+            else:
+                cur.execute("UPDATE leases SET wanted_by = ? WHERE user_id = ?", (self.owner, user_id))
+                acquired = False
+            cur.execute("COMMIT")
+        except Exception:
+            cur.execute("ROLLBACK")
+            raise
+
+        if acquired:
+            self.held.add(user_id)
+        return acquired
+
+    def owner_of(self, user_id: str):
+        """The process holding a user's lease, or None if nobody does"""
+        row = self.conn.execute("SELECT owner, expires FROM leases WHERE user_id = ?", (user_id,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row[0]
+
+    def wanted(self) -> list:
+        """Get users we own that another process is waiting for"""
+        rows = self.conn.execute(
+            "SELECT user_id FROM leases WHERE owner = ? AND wanted_by IS NOT NULL",
+            (self.owner,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def renew(self) -> set:
+        """Extend all of our leases and return the users whose lease we lost"""
+        self.conn.execute(
+            "UPDATE leases SET expires = ? WHERE owner = ?",
+            (time.time() + self.ttl, self.owner)
+        )
+        rows = self.conn.execute("SELECT user_id FROM leases WHERE owner = ?", (self.owner,)).fetchall()
+        still_held = {row[0] for row in rows}
+        lost = self.held - still_held
+        self.held &= still_held
+        return lost
+
+    def release(self, user_ids):
+        """Give up the leases for some users"""
+        user_ids = [user_id for user_id in user_ids if user_id in self.held]
+        if not user_ids:
+            return
+        self.conn.executemany(
+            "DELETE FROM leases WHERE user_id = ? AND owner = ?",
+            [(user_id, self.owner) for user_id in user_ids]
+        )
+        self.held.difference_update(user_ids)
+
+    def release_all(self):
+        """Give up every lease this process holds"""
+        self.conn.execute("DELETE FROM leases WHERE owner = ?", (self.owner,))
+        self.held.clear()
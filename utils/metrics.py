@@ -0,0 +1,210 @@
+"""
+Metrics for The Farmer.
+Counters, gauges and histograms kept in process memory and served in the
+Prometheus text format on a local HTTP endpoint.
+"""
+
+import asyncio
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Name of the command running in the current task, used to attribute storage I/O
+current_command = ContextVar("current_command", default="none")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+def format_labels(label_names, label_values) -> str:
+    if not label_names:
+        return ""
+    pairs = []
+    for name, value in zip(label_names, label_values):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.values = {}
+
+    def inc(self, *label_values, amount: float = 1):
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def get(self, *label_values) -> float:
+        return self.values.get(label_values, 0)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{format_labels(self.labels, label_values)} {value}")
+        return lines
+
+class Gauge(Counter):
+    def set(self, *label_values, value: float):
+        self.values[label_values] = value
+
+    def render(self) -> list:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self.series = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, *label_values, value: float):
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [0] * (len(self.buckets) + 2)
+        # Counts are stored per bucket and made cumulative when rendering
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    @contextmanager
+    def time(self, *label_values):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(*label_values, value=time.perf_counter() - start)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        bucket_labels = self.labels + ("le",)
+        for label_values, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{format_labels(bucket_labels, label_values + (bound,))} {cumulative}")
+            lines.append(f"{self.name}_bucket{format_labels(bucket_labels, label_values + ('+Inf',))} {series[-1]}")
+            lines.append(f"{self.name}_sum{format_labels(self.labels, label_values)} {series[-2]}")
+            lines.append(f"{self.name}_count{format_labels(self.labels, label_values)} {series[-1]}")
+        return lines
+
+command_latency = Histogram("farmer_command_latency_seconds", "Time spent running each command", ["command"])
+command_errors = Counter("farmer_command_errors_total", "Commands that raised an error", ["command"])
+storage_latency = Histogram("farmer_storage_seconds", "Time spent loading and saving farm data", ["operation"])
+storage_bytes = Counter("farmer_storage_bytes_total", "Bytes of farm data read and written per command", ["command", "direction"])
+command_bytes = Histogram("farmer_command_storage_bytes", "Bytes of farm data read and written by one command", ["command", "direction"], BYTES_BUCKETS)
+cache_requests = Counter("farmer_user_cache_requests_total", "User record lookups by cache result", ["result"])
+coalesced_commands = Counter("farmer_coalesced_commands_total", "Commands merged into a batch already running for the same user", ["command"])
+outbound_requests = Counter("farmer_outbound_requests_total", "Messages sent, edited and deleted through the outbox", ["method"])
+merged_replies = Counter("farmer_outbox_merged_total", "Replies merged into another queued message or edit", ["method"])
+cached_users = Gauge("farmer_cached_users", "User records held in memory")
+cached_user_bytes = Gauge("farmer_cached_user_bytes", "Serialized size of the user records held in memory (with a cache budget)")
+user_cache_hit_ratio = Gauge("farmer_user_cache_hit_ratio", "Share of user record lookups served from memory")
+compacted_users = Counter("farmer_compacted_users_total", "Users the background compactor changed")
+compaction_bytes = Counter("farmer_compaction_bytes_reclaimed_total", "Approximate bytes of farm data removed by the background compactor")
+evicted_users = Counter("farmer_evicted_users_total", "Users dropped from memory to stay within the cache budget")
+loop_lag = Histogram("farmer_event_loop_lag_seconds", "How late the event loop woke up a sleeping task")
+loop_lag_last = Gauge("farmer_event_loop_lag_last_seconds", "Most recent event loop lag measurement")
+
+REGISTRY = [
+    command_latency,
+    command_errors,
+    storage_latency,
+    storage_bytes,
+    command_bytes,
+    cache_requests,
+    coalesced_commands,
+    outbound_requests,
+    merged_replies,
+    cached_users,
+    cached_user_bytes,
+    user_cache_hit_ratio,
+    evicted_users,
+    compacted_users,
+    compaction_bytes,
+    loop_lag,
+    loop_lag_last
+]
+
+# Bytes moved by the running command, reset by the command hooks
+_command_io = ContextVar("command_io", default=None)
+
+def start_command(name: str):
+    """Mark the start of a command in the current task"""
+    current_command.set(name)
+    _command_io.set({"read": 0, "write": 0})
+
+def finish_command(name: str, seconds: float, failed: bool = False):
+    """Record a finished command's latency and storage I/O"""
+    command_latency.observe(name, value=seconds)
+    if failed:
+        command_errors.inc(name)
+    io = _command_io.get()
+    if io is not None:
+        command_bytes.observe(name, "read", value=io["read"])
+        command_bytes.observe(name, "write", value=io["write"])
+        _command_io.set(None)
+    current_command.set("none")
+
+def record_io(direction: str, size: int):
+    """Count farm data bytes read or written by the current command"""
+    storage_bytes.inc(current_command.get(), direction, amount=size)
+    io = _command_io.get()
+    if io is not None:
+        io[direction] += size
+
+# Callables run before rendering, e.g. to refresh gauges
+collectors = []
+
+def render() -> str:
+    for collect in collectors:
+        try:
+            collect()
+        except Exception as e:
+            print(f"Error collecting metrics: {e}")
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+async def measure_loop_lag(interval: float = 0.5):
+    """Background task: measure how late asyncio.sleep() wakes up"""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = max(0.0, time.perf_counter() - start - interval)
+        loop_lag.observe(value=lag)
+        loop_lag_last.set(value=lag)
+
+async def handle_http(reader, writer):
+    try:
+        request = await reader.readuntil(b"\r\n\r\n")
+        path = request.split(b" ", 2)[1] if request.count(b" ") >= 2 else b"/"
+        if path == b"/metrics":
+            body = render().encode()
+            status = b"200 OK"
+        else:
+            body = b"Not found\n"
+            status = b"404 Not Found"
+        writer.write(
+            b"HTTP/1.1 " + status + b"\r\n"
+            b"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+            b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+            b"Connection: close\r\n\r\n" + body
+        )
+        await writer.drain()
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+async def start_exporter(port: int, host: str = "127.0.0.1"):
+    """Serve /metrics on a local port"""
+    server = await asyncio.start_server(handle_http, host, port)
+    print(f"Metrics available on http://{host}:{port}/metrics")
+    return server
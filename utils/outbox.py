@@ -0,0 +1,263 @@
+"""
+Outbound message queue for The Farmer.
+Replies go through one queue per channel instead of straight to Discord. A
+channel sends at most RATE_LIMIT messages per RATE_WINDOW seconds, and replies
+queued while it waits are merged into one message of up to 10 embeds. Edits of
+a reply that is still waiting to be edited are folded into that edit. Edits and
+deletes share the channel's rate limit. Interactive replies are sent before
+notifications.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from discord.ext import commands
+from utils import metrics
+
+INTERACTIVE = 0
+NOTIFICATION = 1
+
+MAX_EMBEDS = 10
+RATE_LIMIT = 5  # Discord allows about 5 messages per 5 seconds per channel
+RATE_WINDOW = 5.0
+
+class SentMessage:
+    """A message the outbox sends, shared by every reply merged into it"""
+
+    def __init__(self, channel, content, embeds: list):
+        self.channel = channel
+        self.content = content
+        self.embeds = embeds
+        self.message = None
+        self.pending_edit = None  # Future of a queued edit not sent yet
+
+class Reply:
+    """What ctx.send returns: one reply's embed within a possibly shared message"""
+
+    def __init__(self, outbox, sent: SentMessage, index: int):
+        self.outbox = outbox
+        self.sent = sent
+        self.index = index
+
+    def __getattr__(self, name):
+        # id, jump_url etc. come from the real message
+        return getattr(self.sent.message, name)
+
+    async def edit(self, *, content=None, embed=None, **kwargs):
+        if kwargs:
+            # Views, attachments etc. aren't merged; edit the message directly
+            await self.outbox.flush_edit(self.sent)
+            return await self.sent.message.edit(content=content, embed=embed, **kwargs)
+        if content is not None:
+            self.sent.content = content
+        if embed is not None and self.index < len(self.sent.embeds):
+            self.sent.embeds[self.index] = embed
+        elif embed is not None:
+            self.sent.embeds.append(embed)
+        await self.outbox.edit(self.sent)
+        return self
+
+    async def delete(self):
+        if self.index < len(self.sent.embeds):
+            self.sent.embeds[self.index] = None
+        if self.index == 0:
+            # Merged replies are embed-only, so the content is the first reply's
+            self.sent.content = None
+        if self.sent.content is None and not any(self.sent.embeds):
+            # Deletes count against the channel's rate limit like any other request
+            await self.outbox.queue(self.sent.channel, INTERACTIVE, "delete", self.sent)
+        else:
+            await self.outbox.edit(self.sent)
+
+class Outbox:
+    """Per-channel send queues with rate limiting and merging"""
+
+    def __init__(self, sink, rate_limit: int = RATE_LIMIT, rate_window: float = RATE_WINDOW):
+        self.sink = sink
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.queues = {}  # channel id -> heap of (priority, seq, kind, sent, future)
+        self.history = {}  # channel id -> times of recent requests
+        self.workers = {}  # channel id -> task draining its queue
+        self.counter = itertools.count()
+
+    async def send(self, channel, content=None, *, embed=None, embeds=None, priority: int = INTERACTIVE) -> Reply:
+        """Queue a message and wait until it (or the message it was merged into) is sent"""
+        embeds = list(embeds or ([embed] if embed is not None else []))
+        sent = SentMessage(channel, content, embeds)
+        return await self.queue(channel, priority, "send", sent)
+
+    async def edit(self, sent: SentMessage):
+        """Queue an edit of a sent message, joining one already queued for it"""
+        if sent.message is None:
+            return  # Not sent yet; it goes out with the new embeds
+        if sent.pending_edit is None:
+            sent.pending_edit = self.queue(sent.channel, INTERACTIVE, "edit", sent)
+        else:
+            metrics.merged_replies.inc("edit")
+        await sent.pending_edit
+
+    async def flush_edit(self, sent: SentMessage):
+        if sent.pending_edit is not None:
+            await sent.pending_edit
+
+    def queue(self, channel, priority: int, kind: str, sent: SentMessage) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        queue = self.queues.setdefault(channel.id, [])
+        heapq.heappush(queue, (priority, next(self.counter), kind, sent, future))
+        if channel.id not in self.workers:
+            self.workers[channel.id] = asyncio.create_task(self.drain(channel.id))
+        return future
+
+    async def wait_for_slot(self, channel_id):
+        history = self.history.setdefault(channel_id, deque())
+        while True:
+            now = time.monotonic()
+            while history and now - history[0] >= self.rate_window:
+                history.popleft()
+            if len(history) < self.rate_limit:
+                history.append(now)
+                return
+            await asyncio.sleep(self.rate_window - (now - history[0]))
+
+    def take_batch(self, queue: list) -> list:
+        """Pop the next entry plus the embed-only sends that fit in the same message"""
+        batch = [heapq.heappop(queue)]
+        _, _, kind, sent, _ = batch[0]
+        if kind != "send":
+            return batch
+        embed_count = len(sent.embeds)
+        while queue:
+            _, _, next_kind, next_sent, _ = queue[0]
+            if next_kind != "send" or next_sent.content is not None:
+                break
+            if embed_count + len(next_sent.embeds) > MAX_EMBEDS:
+                break
+            embed_count += len(next_sent.embeds)
+            batch.append(heapq.heappop(queue))
+        return batch
+
+    async def drain(self, channel_id):
+        queue = self.queues[channel_id]
+        try:
+            while queue:
+                # Replies queued while waiting for the rate limit join this batch
+                await self.wait_for_slot(channel_id)
+                batch = self.take_batch(queue)
+                try:
+                    await self.flush(batch)
+                except Exception as e:
+                    for entry in batch:
+                        if not entry[4].done():
+                            entry[4].set_exception(e)
+        finally:
+            del self.workers[channel_id]
+            if not queue:
+                del self.queues[channel_id]
+
+    async def flush(self, batch: list):
+        _, _, kind, sent, future = batch[0]
+        if kind == "delete":
+            await self.sink.delete(sent.message)
+            metrics.outbound_requests.inc("delete")
+            future.set_result(None)
+            return
+        if kind == "edit":
+            sent.pending_edit = None
+            await self.sink.edit(sent.message, sent.content, [embed for embed in sent.embeds if embed is not None])
+            metrics.outbound_requests.inc("edit")
+            future.set_result(None)
+            return
+
+        # Merge every reply in the batch into the first one's message
+        replies = []
+        for _, _, _, other, _ in batch[1:]:
+            offset = len(sent.embeds)
+            sent.embeds.extend(other.embeds)
+            replies.append(offset)
+        sent.message = await self.sink.send(sent.channel, sent.content, sent.embeds)
+        metrics.outbound_requests.inc("send")
+        future.set_result(Reply(self, sent, 0))
+        for (_, _, _, _, other_future), offset in zip(batch[1:], replies):
+            metrics.merged_replies.inc("send")
+            other_future.set_result(Reply(self, sent, offset))
+
+class DiscordSink:
+    """Sends through discord.py"""
+
+    async def send(self, channel, content, embeds: list):
+        return await channel.send(content=content, embeds=embeds)
+
+    async def edit(self, message, content, embeds: list):
+        await message.edit(content=content, embeds=embeds)
+
+    async def delete(self, message):
+        await message.delete()
+
+class FakeMessage:
+    def __init__(self, message_id: int, channel, content, embeds: list):
+        self.id = message_id
+        self.channel = channel
+        self.content = content
+        self.embeds = list(embeds)
+
+class FakeHTTPSink:
+    """Stands in for Discord's HTTP API when testing offline.
+
+    Takes `latency` seconds per request, records every request and counts the
+    ones that would have hit Discord's per-channel rate limit.
+    """
+
+    def __init__(self, latency: float = 0.05, rate_limit: int = RATE_LIMIT, rate_window: float = RATE_WINDOW):
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.requests = []  # (time, method, channel id, embed count)
+        self.history = {}
+        self.rate_limited = 0
+        self.message_ids = itertools.count(1)
+
+    def record(self, method: str, channel_id, embed_count: int):
+        now = time.monotonic()
+        history = self.history.setdefault(channel_id, deque())
+        while history and now - history[0] >= self.rate_window:
+            history.popleft()
+        if len(history) >= self.rate_limit:
+            self.rate_limited += 1
+        history.append(now)
+        self.requests.append((now, method, channel_id, embed_count))
+
+    async def send(self, channel, content, embeds: list):
+        if len(embeds) > MAX_EMBEDS:
+            raise ValueError(f"Too many embeds: {len(embeds)}")
+        self.record("send", channel.id, len(embeds))
+        await asyncio.sleep(self.latency)
+        return FakeMessage(next(self.message_ids), channel, content, embeds)
+
+    async def edit(self, message, content, embeds: list):
+        self.record("edit", message.channel.id, len(embeds))
+        await asyncio.sleep(self.latency)
+        message.content = content
+        message.embeds = list(embeds)
+
+    async def delete(self, message):
+        self.record("delete", message.channel.id, 0)
+        await asyncio.sleep(self.latency)
+
+    def summary(self) -> dict:
+        methods = {}
+        for _, method, _, _ in self.requests:
+            methods[method] = methods.get(method, 0) + 1
+        return {"requests": len(self.requests), "by_method": methods, "rate_limited": self.rate_limited}
+
+class OutboxContext(commands.Context):
+    """Context whose plain replies go through the bot's outbox"""
+
+    async def send(self, content=None, *, embed=None, embeds=None, **kwargs):
+        outbox = getattr(self.bot, "outbox", None)
+        if outbox is None or kwargs:
+            # Views, files, references etc. need the message right away
+            return await super().send(content, embed=embed, embeds=embeds, **kwargs)
+        return await outbox.send(self.channel, content, embed=embed, embeds=embeds)
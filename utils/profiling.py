@@ -0,0 +1,82 @@
+"""
+On-demand command profiling for The Farmer.
+Wraps the next few runs of a named command in cProfile and saves the result.
+Nothing is profiled (and the command hooks return right away) unless a
+command has been armed.
+"""
+
+import cProfile
+import io
+import pstats
+import time
+from config import DataConfig
+
+PROFILE_DIR = DataConfig.DATA_DIR / "profiles"
+
+class ProfileRun:
+    def __init__(self, command: str, count: int, on_done=None):
+        self.command = command
+        self.remaining = count
+        self.count = count
+        self.on_done = on_done
+        self.profile = cProfile.Profile()
+        self.running = None  # context of the invocation being profiled
+
+class CommandProfiler:
+    def __init__(self):
+        self.runs = {}
+
+    def arm(self, command: str, count: int, on_done=None) -> ProfileRun:
+        """Profile the next `count` invocations of a command"""
+        run = ProfileRun(command, count, on_done)
+        self.runs[command] = run
+        return run
+
+    def disarm(self, command: str) -> bool:
+        run = self.runs.pop(command, None)
+        if run is None:
+            return False
+        if run.running is not None:
+            run.profile.disable()
+        return True
+
+    def start(self, command: str, ctx):
+        if not self.runs:
+            return
+        run = self.runs.get(command)
+        # cProfile hooks the whole thread, so only one invocation is profiled at a time
+        if run is None or run.running is not None or self.active():
+            return
+        run.running = ctx
+        run.profile.enable()
+
+    def active(self) -> bool:
+        return any(run.running is not None for run in self.runs.values())
+
+    def finish(self, command: str, ctx):
+        """Stop profiling an invocation; returns the finished run once all invocations are done"""
+        if not self.runs:
+            return None
+        run = self.runs.get(command)
+        if run is None or run.running is not ctx:
+            return None
+        run.profile.disable()
+        run.running = None
+        run.remaining -= 1
+        if run.remaining > 0:
+            return None
+        del self.runs[command]
+        return run
+
+    def save(self, run: ProfileRun):
+        """Write a run to a .prof file and return (path, top 20 summary)"""
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        path = PROFILE_DIR / f"{run.command}-{time.strftime('%Y%m%d-%H%M%S')}.prof"
+        run.profile.dump_stats(str(path))
+
+        output = io.StringIO()
+        stats = pstats.Stats(run.profile, stream=output)
+        stats.strip_dirs().sort_stats("cumulative").print_stats(20)
+        return path, output.getvalue()
+
+profiler = CommandProfiler()
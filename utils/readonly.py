@@ -0,0 +1,58 @@
+"""
+Read-only views of user records.
+Query commands read the live records in the user store through these views
+instead of copies. Nested dicts and lists are wrapped as they are accessed, so
+a view costs nothing up front and any attempt to change it raises TypeError.
+"""
+
+from collections.abc import Mapping, Sequence
+
+def freeze(value):
+    """Wrap dicts and lists in read-only views; other values are returned as is"""
+    if isinstance(value, dict):
+        return ReadOnlyView(value)
+    if isinstance(value, list):
+        return ReadOnlyList(value)
+    return value
+
+class ReadOnlyView(Mapping):
+    """Immutable view of a dict"""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getitem__(self, key):
+        return freeze(self._data[key])
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f"ReadOnlyView({self._data!r})"
+
+class ReadOnlyList(Sequence):
+    """Immutable view of a list"""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ReadOnlyList(self._data[index])
+        return freeze(self._data[index])
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f"ReadOnlyList({self._data!r})"
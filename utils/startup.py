@@ -0,0 +1,37 @@
+"""
+Startup timing for The Farmer.
+Records how long each startup phase takes and prints a short report.
+"""
+
+import time
+from contextlib import contextmanager
+
+class StartupTimer:
+    def __init__(self, started: float = None):
+        self.started = started if started is not None else time.perf_counter()
+        self.last = self.started
+        self.phases = []
+
+    def mark(self, phase: str):
+        """Record the time since the previous mark as a phase"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    @contextmanager
+    def phase(self, phase: str):
+        """Time a block as a phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self.phases.append((phase, now - start))
+            self.last = now
+
+    def report(self) -> str:
+        lines = ["Startup timing:"]
+        for phase, seconds in self.phases:
+            lines.append(f"  {phase:<16} {seconds * 1000:8.1f} ms")
+        lines.append(f"  {'total':<16} {(time.perf_counter() - self.started) * 1000:8.1f} ms")
+        return "\n".join(lines)
@@ -0,0 +1,270 @@
+"""
+Storage service client for The Farmer.
+This module implements the wire protocol spoken with storage_service.py and a
+client that bot processes use in place of the local data file.
+
+Every message is a 5 byte header (1 byte opcode or status, 4 byte big-endian
+payload length) followed by a marshal-encoded payload. Records carry a version
+number; writes name the version they were based on and fail with a conflict
+if another worker changed the user in between.
+"""
+
+import asyncio
+import marshal
+import socket
+import struct
+import threading
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor
+from utils import metrics
+
+HEADER = struct.Struct("!BI")
+
+# Request opcodes
+OP_GET = 1
+OP_PUT = 2
+OP_TXN = 3
+OP_SCAN = 4
+OP_FLUSH = 5
+
+# Response status codes
+STATUS_OK = 0
+STATUS_CONFLICT = 1
+STATUS_ERROR = 2
+
+# Seconds to wait on the service before giving up on a request
+REQUEST_TIMEOUT = 5.0
+
+def encode_frame(code: int, payload) -> bytes:
+    """Build a protocol frame"""
+    body = marshal.dumps(payload)
+    return HEADER.pack(code, len(body)) + body
+
+def decode_payload(body: bytes):
+    """Decode a frame payload"""
+    return marshal.loads(body)
+
+class StorageConflict(Exception):
+    """Raised when a write was based on an outdated version of a user"""
+
+    def __init__(self, user_ids):
+        super().__init__(f"Conflicting update for users: {', '.join(user_ids)}")
+        self.user_ids = user_ids
+
+class StorageClient:
+    """Blocking connection to the storage service.
+
+    Coroutines should go through run(), which makes the request on a worker
+    thread so a slow service never stalls the event loop.
+    """
+
+    def __init__(self, socket_path, timeout: float = REQUEST_TIMEOUT):
+        self.socket_path = str(socket_path)
+        self.timeout = timeout
+        self.sock = None
+        self.lock = threading.Lock()  # one request on the connection at a time
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage")
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def _recv_exactly(self, size: int) -> bytes:
+        chunks = []
+        while size > 0:
+            chunk = self.sock.recv(size)
+            if not chunk:
+                raise ConnectionError("Storage service closed the connection")
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def request(self, op: int, payload=None):
+        """Send one request and return the decoded response payload"""
+        with self.lock:
+            if self.sock is None:
+                self.connect()
+            try:
+                frame = encode_frame(op, payload)
+                self.sock.sendall(frame)
+                status, length = HEADER.unpack(self._recv_exactly(HEADER.size))
+                result = decode_payload(self._recv_exactly(length))
+                metrics.record_io("write", len(frame))
+                metrics.record_io("read", HEADER.size + length)
+            except (OSError, ConnectionError):
+                # Timed out or disconnected mid-frame; reconnect on the next request
+                self.close()
+                raise
+
+        if status == STATUS_CONFLICT:
+            raise StorageConflict(result)
+        if status == STATUS_ERROR:
+            raise RuntimeError(f"Storage service error: {result}")
+        return result
+
+    async def run(self, method, *args):
+        """Call a client method on the worker thread"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, method, *args)
+
+    def get_many(self, user_ids) -> dict:
+        """Get (version, record) for several users"""
+        return {user_id: self.get(user_id) for user_id in user_ids}
+
+    def get(self, user_id: str):
+        """Get (version, record) for a user; record is None if the user doesn't exist"""
+        return self.request(OP_GET, user_id)
+
+    def put(self, user_id: str, record, expected_version: int = None) -> int:
+        """Store a user record and return its new version"""
+        return self.request(OP_PUT, (user_id, expected_version, record))
+
+    def transaction(self, writes) -> dict:
+        """Apply (user_id, expected_version, record) writes atomically.
+
+        A record of None deletes the user. Returns the new version of every user.
+        """
+        return self.request(OP_TXN, list(writes))
+
+    def scan(self, fields=None) -> dict:
+        """Get every user, optionally projected to some top-level fields"""
+        return self.request(OP_SCAN, list(fields) if fields else None)
+
+    def flush(self):
+        """Ask the service to write its data file now"""
+        return self.request(OP_FLUSH)
+
+class RemoteUsers(MutableMapping):
+    """User records of one load_data() call, fetched from the storage service.
+
+    Records are fetched on first access (or ahead of time by prefetch()) and
+    written back by flush() in a single transaction, only if they changed.
+    """
+
+    def __init__(self, client: StorageClient):
+        self.client = client
+        self.users = {}
+        self.versions = {}
+        self.originals = {}
+        self.deleted = set()
+
+    def _fetched(self, user_id, version, record):
+        self.versions[user_id] = version
+        if record is not None:
+            self.users[user_id] = record
+            self.originals[user_id] = marshal.dumps(record)
+        return record
+
+    def _fetch(self, user_id):
+        if user_id in self.users:
+            return self.users[user_id]
+        if user_id in self.deleted or user_id in self.versions:
+            return None
+        return self._fetched(user_id, *self.client.get(user_id))
+
+    async def prefetch(self, user_ids):
+        """Fetch users off the event loop so later access doesn't block"""
+        missing = [user_id for user_id in user_ids if user_id not in self.versions]
+        if missing:
+            for user_id, (version, record) in (await self.client.run(self.client.get_many, missing)).items():
+                self._fetched(user_id, version, record)
+
+    def __getitem__(self, user_id):
+        record = self._fetch(user_id)
+        if record is None:
+            raise KeyError(user_id)
+        return record
+
+    def __setitem__(self, user_id, record):
+        if user_id not in self.versions:
+            self._fetch(user_id)
+        self.users[user_id] = record
+        self.deleted.discard(user_id)
+
+    def __delitem__(self, user_id):
+        if self._fetch(user_id) is None:
+            raise KeyError(user_id)
+        del self.users[user_id]
+        self.deleted.add(user_id)
+
+    def __contains__(self, user_id):
+        return self._fetch(user_id) is not None
+
+    def __iter__(self):
+        return iter(self.client.scan(fields=["balance"]))
+
+    def __len__(self):
+        return len(self.client.scan(fields=["balance"]))
+
+    def get_uncached(self, user_id):
+        """Get a user's record, or None (fetched records only live as long as this object)"""
+        return self._fetch(user_id)
+
+    def put_uncached(self, user_id, record):
+        """Save a record from get_uncached() on the next flush"""
+        self[user_id] = record
+
+    def items(self):
+        """Iterate over all users for reading"""
+        users = self.client.scan()
+        users.update(self.users)
+        return [(user_id, user) for user_id, user in users.items() if user_id not in self.deleted]
+
+    def values(self):
+        return [user for _, user in self.items()]
+
+    def _writes(self) -> list:
+        writes = []
+        for user_id, record in self.users.items():
+            if marshal.dumps(record) != self.originals.get(user_id):
+                writes.append((user_id, self.versions.get(user_id, 0), record))
+        for user_id in self.deleted:
+            writes.append((user_id, self.versions.get(user_id, 0), None))
+        return writes
+
+    def _conflicted(self, user_ids):
+        # Another worker changed these users; drop our copies so the next access
+        # is fresh and let the caller know nothing was written
+        for user_id in user_ids:
+            self.users.pop(user_id, None)
+            self.versions.pop(user_id, None)
+            self.originals.pop(user_id, None)
+            self.deleted.discard(user_id)
+
+    def _committed(self, writes, versions):
+        self.versions.update(versions)
+        for user_id, _, record in writes:
+            if record is not None:
+                self.originals[user_id] = marshal.dumps(record)
+        self.deleted.clear()
+
+    def flush(self):
+        """Write changed users back in one transaction"""
+        writes = self._writes()
+        if not writes:
+            return
+        try:
+            versions = self.client.transaction(writes)
+        except StorageConflict as e:
+            self._conflicted(e.user_ids)
+            raise
+        self._committed(writes, versions)
+
+    async def flush_async(self):
+        """flush() with the transaction made off the event loop"""
+        writes = self._writes()
+        if not writes:
+            return
+        # The records are encoded on the loop, before the worker thread sees them
+        payload = marshal.loads(marshal.dumps(writes))
+        try:
+            versions = await self.client.run(self.client.transaction, payload)
+        except StorageConflict as e:
+            self._conflicted(e.user_ids)
+            raise
+        self._committed(payload, versions)
@@ -0,0 +1,137 @@
+"""
+Random access to user records in the farm data file.
+With a cache budget the UserStore only keeps recently used users in memory.
+UserFile remembers where each user's record sits in farm_data.json so cold users
+can be read back one at a time, and rewrites the file by copying unchanged
+records byte for byte, so saving never needs every user in memory.
+"""
+
+import json
+import os
+import re
+from config import DataConfig
+from utils import metrics
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Fields kept in the index so scans (e.g. the leaderboard) don't read cold users
+SUMMARY_FIELDS = ("balance",)
+
+def summarize(user: dict) -> dict:
+    return {field: user[field] for field in SUMMARY_FIELDS if field in user}
+
+def encode(user: dict):
+    """Serialize a user record for the file, returning (raw bytes, summary)"""
+    return json.dumps(user, separators=(",", ":")).encode("ascii"), summarize(user)
+
+def skip(text: str, pos: int) -> int:
+    return WHITESPACE.match(text, pos).end()
+
+class UserFile:
+    """Index of user records in the farm data file"""
+
+    def __init__(self):
+        self.index = {}  # user id -> (offset, length, summary)
+
+    def scan(self):
+        """Index the file, yielding (user_id, user, size) for every user in it"""
+        self.index = {}
+        path = DataConfig.FARM_DATA_FILE
+        if not path.exists():
+            return
+        with metrics.storage_latency.time("read_file"):
+            with open(path, "rb") as f:
+                raw = f.read()
+        metrics.record_io("read", len(raw))
+        if not raw.isascii():
+            # Offsets below count characters, so they need one byte per character
+            users = json.loads(raw).get("users", {})
+            self.write({user_id: encode(user) for user_id, user in users.items()}, set())
+            yield from ((user_id, user, self.index[user_id][1]) for user_id, user in users.items())
+            return
+
+        text = raw.decode("ascii")
+        del raw
+        decoder = json.JSONDecoder()
+        pos = skip(text, 0)
+        if text[pos] != "{":
+            raise ValueError("farm data file is not a JSON object")
+        pos = skip(text, pos + 1)
+        while text[pos] != "}":
+            key, pos = decoder.raw_decode(text, pos)
+            pos = skip(text, skip(text, pos) + 1)  # past the ":"
+            if key == "users":
+                pos = yield from self._scan_users(decoder, text, pos)
+            else:
+                _, pos = decoder.raw_decode(text, pos)
+            pos = skip(text, pos)
+            if text[pos] == ",":
+                pos = skip(text, pos + 1)
+
+    def _scan_users(self, decoder, text: str, pos: int):
+        pos = skip(text, pos + 1)  # past the "{"
+        while text[pos] != "}":
+            user_id, pos = decoder.raw_decode(text, pos)
+            pos = skip(text, skip(text, pos) + 1)
+            user, end = decoder.raw_decode(text, pos)
+            self.index[user_id] = (pos, end - pos, summarize(user))
+            yield user_id, user, end - pos
+            pos = skip(text, end)
+            if text[pos] == ",":
+                pos = skip(text, pos + 1)
+        return pos + 1
+
+    def read_raw(self, user_id) -> bytes:
+        offset, length, _ = self.index[user_id]
+        with open(DataConfig.FARM_DATA_FILE, "rb") as f:
+            f.seek(offset)
+            raw = f.read(length)
+        metrics.record_io("read", length)
+        return raw
+
+    def write(self, changed: dict, deleted: set):
+        """Rewrite the file atomically.
+
+        `changed` maps user IDs to (raw bytes, summary) from encode(); every
+        other indexed user that isn't deleted is copied from the current file.
+        """
+        DataConfig.DATA_DIR.mkdir(exist_ok=True)
+        path = DataConfig.FARM_DATA_FILE
+        tmp_file = path.with_suffix(".tmp")
+        index = {}
+        pos = 0
+
+        with metrics.storage_latency.time("write_file"):
+            old = open(path, "rb") if self.index and path.exists() else None
+            try:
+                with open(tmp_file, "wb") as out:
+                    def put(user_id, raw, summary):
+                        nonlocal pos
+                        head = ("" if not index else ",\n") + json.dumps(user_id) + ": "
+                        out.write(head.encode("ascii"))
+                        pos += len(head)
+                        index[user_id] = (pos, len(raw), summary)
+                        out.write(raw)
+                        pos += len(raw)
+
+                    out.write(b'{"users": {\n')
+                    pos = out.tell()
+                    for user_id, (offset, length, summary) in self.index.items():
+                        if user_id in deleted:
+                            continue
+                        if user_id in changed:
+                            put(user_id, *changed[user_id])
+                        else:
+                            old.seek(offset)
+                            put(user_id, old.read(length), summary)
+                    for user_id, (raw, summary) in changed.items():
+                        if user_id not in index and user_id not in deleted:
+                            put(user_id, raw, summary)
+                    out.write(b"\n}}\n")
+                    pos += 4
+            finally:
+                if old is not None:
+                    old.close()
+            os.replace(tmp_file, path)
+        metrics.record_io("write", pos)
+        self.index = index
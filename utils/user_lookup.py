@@ -0,0 +1,41 @@
+"""
+On-demand user lookups for The Farmer.
+In lean mode discord.py keeps no member cache, so names for the leaderboard and
+notifications are fetched when needed and kept in a small LRU cache.
+"""
+
+import time
+from collections import OrderedDict
+import discord
+
+class UserLookup:
+    """Bounded, expiring cache of discord.User objects by ID"""
+
+    def __init__(self, bot, max_size: int = 5000, ttl: float = 3600):
+        self.bot = bot
+        self.max_size = max_size
+        self.ttl = ttl
+        self.users = OrderedDict()  # user id -> (user, fetched at)
+
+    async def get(self, user_id: int):
+        """The user with this ID, or None if Discord doesn't know them"""
+        user_id = int(user_id)
+        cached = self.users.get(user_id)
+        if cached is not None and time.monotonic() - cached[1] < self.ttl:
+            self.users.move_to_end(user_id)
+            return cached[0]
+
+        user = self.bot.get_user(user_id)
+        if user is None:
+            try:
+                user = await self.bot.fetch_user(user_id)
+            except discord.NotFound:
+                return None
+        self.remember(user)
+        return user
+
+    def remember(self, user):
+        self.users[user.id] = (user, time.monotonic())
+        self.users.move_to_end(user.id)
+        while len(self.users) > self.max_size:
+            self.users.popitem(last=False)
@@ -1,3 +1,4 @@
+import asyncio
 import discord
 from discord.ui import View, Button
 
@@ -54,21 +55,90 @@ class LeaderboardView(View):
             color=0xf1c40f
         )
         
-        for idx, (user_id, stats) in enumerate(page_users, start=start_idx + 1):
-            try:
-                user = await bot.fetch_user(int(user_id))
-                total = stats.get("balance", 0)
-                embed.add_field(
-                    name=f"{idx}. {user.name}",
-                    value=f"${total:,}",
-                    inline=False
-                )
-            except Exception as e:
-                print(f"Error processing user {user_id}: {e}")
+        # Look up the whole page at once; names are cached between pages
+        users = await asyncio.gather(
+            *(bot.user_lookup.get(user_id) for user_id, _ in page_users),
+            return_exceptions=True
+        )
+        for idx, ((user_id, stats), user) in enumerate(zip(page_users, users), start=start_idx + 1):
+            if user is None or isinstance(user, Exception):
+                print(f"Error processing user {user_id}: {user or 'unknown user'}")
                 continue
+            total = stats.get("balance", 0)
+            embed.add_field(
+                name=f"{idx}. {user.name}",
+                value=f"${total:,}",
+                inline=False
+            )
         
         if not embed.fields:
             embed.description = "No farmers yet! Start with `!farm`"
         
         embed.set_footer(text="Keep farming to climb the ranks!")
-        return embed 
\ No newline at end of file
+        return embed 
+class PageView(View):
+    def __init__(self, embeds, timeout=60):
+        super().__init__(timeout=timeout)
+        self.embeds = embeds
+        self.page = 0
+        self.message = None
+
+        self.previous = Button(label="◀", style=discord.ButtonStyle.primary, custom_id="previous", disabled=True)
+        self.next = Button(label="▶", style=discord.ButtonStyle.primary, custom_id="next")
+        self.previous.callback = self.previous_button
+        self.next.callback = self.next_button
+        self.add_item(self.previous)
+        self.add_item(self.next)
+
+    async def previous_button(self, interaction: discord.Interaction):
+        self.page = max(0, self.page - 1)
+        await self.update_message(interaction)
+
+    async def next_button(self, interaction: discord.Interaction):
+        self.page = min(len(self.embeds) - 1, self.page + 1)
+        await self.update_message(interaction)
+
+    async def update_message(self, interaction: discord.Interaction):
+        self.previous.disabled = self.page == 0
+        self.next.disabled = self.page >= len(self.embeds) - 1
+        await interaction.response.edit_message(embed=self.embeds[self.page], view=self)
+
+    async def on_timeout(self):
+        if self.message:
+            await self.message.edit(view=None)
+
+class ConfirmView(View):
+    def __init__(self, author_id, timeout=30):
+        super().__init__(timeout=timeout)
+        self.author_id = author_id
+        self.confirmed = None
+        self.message = None
+
+        confirm = Button(emoji="✅", style=discord.ButtonStyle.success, custom_id="confirm")
+        cancel = Button(emoji="❌", style=discord.ButtonStyle.danger, custom_id="cancel")
+        confirm.callback = self.confirm_button
+        cancel.callback = self.cancel_button
+        self.add_item(confirm)
+        self.add_item(cancel)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # Only the user who asked can answer
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("This confirmation isn't for you.", ephemeral=True)
+            return False
+        return True
+
+    async def confirm_button(self, interaction: discord.Interaction):
+        await self.finish(interaction, True)
+
+    async def cancel_button(self, interaction: discord.Interaction):
+        await self.finish(interaction, False)
+
+    async def finish(self, interaction: discord.Interaction, confirmed: bool):
+        self.confirmed = confirmed
+        await interaction.response.edit_message(view=None)
+        self.stop()
+
+    async def on_timeout(self):
+        if self.message:
+            await self.message.edit(view=None)